@@ -0,0 +1,116 @@
+import sys
+import json
+import argparse
+import subprocess
+from tabulate import tabulate
+
+# Modules whose import time is budgeted; scripts are imported as modules, without running them
+DEFAULT_MODULES = (
+    'config.teradata',
+    'config.snowflake',
+    'config.sql_server',
+    'config.connection_pool',
+    'operations.teradata_operations',
+    'operations.snowflake_operations',
+    'operations.sql_server_operations',
+    'operations.teradata_extract',
+    'operations.snowflake_load',
+    'operations.arrow_batches',
+    'scripts.migration_table',
+    'scripts.migrate_database',
+    'scripts.sync_table',
+    'scripts.validate_table',
+)
+
+# Heavy packages that must only be imported when a connection or Arrow batch is first needed
+HEAVY_MODULES = ('teradatasql', 'snowflake.connector', 'snowflake.snowpark', 'pyodbc', 'pyarrow', 'pandas')
+
+# Default import time budget per module in milliseconds
+DEFAULT_BUDGET_MS = 300
+
+# Imports the module first so its time includes every dependency it pulls in
+PROBE = """
+import {module}
+import sys, json
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]))
+"""
+
+
+def measure_import(module, heavy_modules=HEAVY_MODULES):
+    """
+    Import module in a fresh interpreter with -X importtime.
+    Returns (milliseconds including its dependencies, heavy modules it loaded).
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module, heavy=tuple(heavy_modules))],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    cumulative = None
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    return (cumulative or 0) / 1000, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_import_benchmark(modules=DEFAULT_MODULES, budget_ms=DEFAULT_BUDGET_MS, repeat=3):
+    """
+    Measure the best of repeat cold import times of each module and check it
+    against budget_ms and against eager imports of HEAVY_MODULES.
+    Returns one result dict per module.
+    """
+    results = []
+    for module in modules:
+        error = None
+        timings = []
+        loaded = []
+        try:
+            for _ in range(repeat):
+                milliseconds, loaded = measure_import(module)
+                timings.append(milliseconds)
+        except RuntimeError as e:
+            error = str(e)
+
+        best = min(timings) if timings else None
+        problems = []
+        if error:
+            problems.append(error)
+        if best is not None and best > budget_ms:
+            problems.append(f"over the {budget_ms} ms budget")
+        if loaded:
+            problems.append(f"imports {', '.join(loaded)} eagerly")
+        results.append({'module': module, 'milliseconds': best, 'heavy_modules': loaded, 'problems': problems})
+    return results
+
+
+def parse_args():
+    """
+    Parse command line arguments for the import time benchmark
+    """
+    parser = argparse.ArgumentParser(description="Check module import times against a startup budget")
+    parser.add_argument('modules', nargs='*', default=list(DEFAULT_MODULES))
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--repeat', type=int, default=3)
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    import_results = run_import_benchmark(args.modules, args.budget_ms, args.repeat)
+    print(tabulate(
+        [
+            [
+                result['module'],
+                f"{result['milliseconds']:.1f}" if result['milliseconds'] is not None else "-",
+                '; '.join(result['problems']) or "ok"
+            ]
+            for result in import_results
+        ],
+        headers=["Module", "Import ms", "Status"], tablefmt="grid"
+    ))
+    sys.exit(1 if any(result['problems'] for result in import_results) else 0)
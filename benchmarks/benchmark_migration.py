@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import zlib
+import shutil
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from tabulate import tabulate
+from benchmarks.local_databases import (
+    create_synthetic_table, local_teradata_connection, local_snowflake_connection, COLUMN_TYPES
+)
+
+# migrate_table_in_batches options of each benchmarked mode
+MODES = {
+    'insert': {'load_mode': 'insert'},
+    'insert-arrow': {'load_mode': 'insert', 'data_format': 'arrow'},
+    'copy-csv': {'load_mode': 'copy', 'stage_format': 'csv'},
+    'copy-parquet': {'load_mode': 'copy', 'stage_format': 'parquet'},
+    'pipeline-copy-csv': {'load_mode': 'copy', 'stage_format': 'csv', 'pipeline': True},
+    'fastexport-copy-csv': {'load_mode': 'copy', 'stage_format': 'csv', 'extract_mode': 'fastexport'},
+}
+
+DEFAULT_TYPE_MIX = 'int:2,decimal:2,float:1,varchar:3,category:1,date:1,timestamp:1'
+
+BENCHMARK_TABLE = 'BENCH_TABLE'
+
+
+def peak_rss_bytes():
+    """
+    Return the peak resident set size of the current process in bytes, or None if unknown.
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows: peak working set through psutil when available
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(case):
+    """
+    Migrate the synthetic table into a fresh copy of the empty target with one
+    batch size and mode. Runs in its own process so peak RSS covers one case only.
+    """
+    if not case['verbose']:
+        logging.disable(logging.INFO)
+
+    import scripts.migration_table as migration_table
+    from logs.migration_table_logs import setup_logger
+
+    run_dir = case['run_dir']
+    os.makedirs(run_dir, exist_ok=True)
+    target_path = os.path.join(run_dir, 'target.db')
+    shutil.copy(case['target_template'], target_path)
+    get_snowflake_connection = local_snowflake_connection(target_path, os.path.join(run_dir, 'stage'))
+
+    # The migration resolves its connections and its log file through these module
+    # globals; the log, checkpoints and batch size hints all stay in run_dir
+    migration_table.get_teradata_connection = local_teradata_connection(case['source_path'])
+    migration_table.get_snowflake_connection = get_snowflake_connection
+    migration_table.setup_logger = lambda path, name: setup_logger(os.path.join(run_dir, os.path.basename(path)), name)
+
+    baseline_rss = peak_rss_bytes()
+    result = migration_table.migrate_table_in_batches(
+        source_table=BENCHMARK_TABLE,
+        target_table=BENCHMARK_TABLE,
+        batch_size=case['batch_size'],
+        sort_column='ID',
+        jobs=case['jobs'],
+        checkpoint_path=os.path.join(run_dir, 'checkpoints.db'),
+        hints_path=os.path.join(run_dir, 'batch_size_hints.json'),
+        **MODES[case['mode']]
+    )
+    result['peak_rss'] = peak_rss_bytes()
+    result['baseline_rss'] = baseline_rss
+
+    with get_snowflake_connection() as snowflake_conn:
+        cursor = snowflake_conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {BENCHMARK_TABLE}")
+        result['target_rows'] = cursor.fetchone()[0]
+        cursor.close()
+
+    shutil.rmtree(run_dir, ignore_errors=True)
+    return result
+
+
+def prepare_table(work_dir, rows, width, type_mix, varchar_length, null_fraction, seed):
+    """
+    Create the synthetic source table and empty target for a table shape, or
+    reuse them from a previous benchmark with the same shape.
+    Returns (source_path, target_template, table_bytes).
+    """
+    shape = repr((rows, width, type_mix, varchar_length, null_fraction, seed))
+    name = f"{rows}x{width}_{zlib.crc32(shape.encode()):08x}"
+    source_path = os.path.join(work_dir, f"{name}_source.db")
+    target_template = os.path.join(work_dir, f"{name}_target.db")
+
+    if not (os.path.exists(source_path) and os.path.exists(target_template)):
+        print(f"Generating {rows} rows x {width} columns ({type_mix}) in {work_dir}")
+        create_synthetic_table(
+            source_path, target_template, BENCHMARK_TABLE, rows, width, type_mix,
+            varchar_length, null_fraction, seed
+        )
+
+    with local_teradata_connection(source_path)() as teradata_conn:
+        cursor = teradata_conn.cursor()
+        cursor.execute("SELECT CurrentPerm FROM DBC.TableSizeV WHERE TableName = ?", [BENCHMARK_TABLE])
+        table_bytes = cursor.fetchone()[0]
+        cursor.close()
+    return source_path, target_template, table_bytes
+
+
+def run_benchmarks(
+        rows=100000,
+        width=10,
+        type_mix=DEFAULT_TYPE_MIX,
+        varchar_length=40,
+        null_fraction=0.05,
+        seed=42,
+        batch_sizes=(1000, 10000, 50000),
+        modes=('insert', 'copy-csv', 'copy-parquet'),
+        jobs=1,
+        work_dir=None,
+        verbose=False
+):
+    """
+    Benchmark migrate_table_in_batches on a synthetic table against local
+    SQLite stand-ins for Teradata and Snowflake, once per batch size and mode.
+
+    Each case runs in a fresh process and reports rows/s, bytes/s (estimated
+    in-memory bytes of the source rows, the measure used for max_batch_bytes)
+    and the peak RSS of that process. The absolute numbers describe this
+    machine and SQLite, not Teradata or Snowflake; they are meant for
+    comparing batch sizes, modes and code changes with each other.
+
+    Returns one result dict per case.
+    """
+    for mode in modes:
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'; choose from {', '.join(MODES)}")
+
+    work_dir = work_dir or os.path.join(tempfile.gettempdir(), 'terasnow_benchmarks')
+    os.makedirs(work_dir, exist_ok=True)
+    source_path, target_template, table_bytes = prepare_table(
+        work_dir, rows, width, type_mix, varchar_length, null_fraction, seed
+    )
+
+    results = []
+    spawn = multiprocessing.get_context('spawn')
+    for batch_size in batch_sizes:
+        for mode in modes:
+            case = {
+                'mode': mode,
+                'batch_size': batch_size,
+                'jobs': jobs,
+                'source_path': source_path,
+                'target_template': target_template,
+                'run_dir': os.path.join(work_dir, f"run_{os.getpid()}_{mode}_{batch_size}"),
+                'verbose': verbose
+            }
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                result = executor.submit(run_case, case).result()
+
+            error = result['error']
+            if not error and result['target_rows'] != rows:
+                error = f"{result['target_rows']} target rows, expected {rows}"
+            seconds = result['seconds']
+            results.append({
+                'mode': mode,
+                'batch_size': batch_size,
+                'jobs': jobs,
+                'rows': result['rows'],
+                'width': width,
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(result['rows'] / seconds) if seconds else None,
+                'bytes_per_second': round(table_bytes * result['rows'] / rows / seconds) if seconds and rows else None,
+                'peak_rss_bytes': result['peak_rss'],
+                'baseline_rss_bytes': result['baseline_rss'],
+                'error': error
+            })
+            print(f"{mode} / batch size {batch_size}: {result['rows']} rows in {seconds:.2f} s"
+                  f"{f' - {error}' if error else ''}")
+    return results
+
+
+def format_report(results):
+    """
+    Format benchmark results as a table.
+    """
+    def megabytes(value):
+        return f"{value / (1024 * 1024):.1f}" if value is not None else "-"
+
+    rows = [
+        [
+            result['mode'],
+            result['batch_size'],
+            result['rows'],
+            f"{result['seconds']:.2f}",
+            result['rows_per_second'] or "-",
+            megabytes(result['bytes_per_second']),
+            megabytes(result['peak_rss_bytes']),
+            megabytes(result['baseline_rss_bytes']),
+            result['error'] or ""
+        ]
+        for result in results
+    ]
+    headers = ["Mode", "Batch size", "Rows", "Seconds", "Rows/s", "MB/s", "Peak RSS MB", "Start RSS MB", "Error"]
+    return tabulate(rows, headers=headers, tablefmt="grid")
+
+
+def batch_size_list(value):
+    return [item if item == 'auto' else int(item) for item in value.split(',')]
+
+
+def parse_args():
+    """
+    Parse command line arguments for the migration benchmark
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark table migration throughput against local SQLite stand-ins"
+    )
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--width', type=int, default=10, help="Columns besides the ID key")
+    parser.add_argument('--type-mix', default=DEFAULT_TYPE_MIX,
+                        help=f"Comma separated type:weight pairs of {', '.join(COLUMN_TYPES)}")
+    parser.add_argument('--varchar-length', type=int, default=40)
+    parser.add_argument('--null-fraction', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-sizes', type=batch_size_list, default=[1000, 10000, 50000],
+                        help="Comma separated batch sizes; 'auto' benchmarks adaptive sizing")
+    parser.add_argument('--modes', default='insert,copy-csv,copy-parquet',
+                        help=f"Comma separated modes of {', '.join(MODES)}")
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--work-dir', help="Where synthetic tables are kept between runs (default: temp dir)")
+    parser.add_argument('--output', help="Append the results to this file as JSON lines")
+    parser.add_argument('--verbose', action='store_true', help="Show the migration logs of every case")
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    benchmark_results = run_benchmarks(
+        rows=args.rows,
+        width=args.width,
+        type_mix=args.type_mix,
+        varchar_length=args.varchar_length,
+        null_fraction=args.null_fraction,
+        seed=args.seed,
+        batch_sizes=args.batch_sizes,
+        modes=[mode.strip() for mode in args.modes.split(',')],
+        jobs=args.jobs,
+        work_dir=args.work_dir,
+        verbose=args.verbose
+    )
+    print(format_report(benchmark_results))
+
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as output_file:
+            for benchmark_result in benchmark_results:
+                output_file.write(json.dumps(benchmark_result) + '\n')
@@ -0,0 +1,385 @@
+import os
+import re
+import csv
+import glob
+import gzip
+import zlib
+import random
+import shutil
+import sqlite3
+import string
+import hashlib
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+from operations.teradata_extract import estimate_row_bytes, FASTEXPORT_ESCAPE
+
+# Database name returned by the Teradata stand-in for DATABASE (the session's default database)
+DEFAULT_DATABASE = 'BENCH'
+
+# Seconds a stand-in connection waits for another writer, e.g. concurrent COPY loads
+BUSY_TIMEOUT = 120
+
+# Synthetic column types: DDL type and value generator taking (rng, varchar_length)
+COLUMN_TYPES = {
+    'int': ('INTEGER', lambda rng, length: rng.randint(-2 ** 31, 2 ** 31 - 1)),
+    'decimal': ('DECIMAL(18,2)', lambda rng, length: Decimal(rng.randint(-10 ** 9, 10 ** 9)).scaleb(-2)),
+    'float': ('FLOAT', lambda rng, length: rng.uniform(-1e6, 1e6)),
+    'varchar': ('VARCHAR({length})', lambda rng, length: ''.join(
+        rng.choices(string.ascii_letters + string.digits, k=rng.randint(length // 2, length))
+    )),
+    'category': ('VARCHAR(16)', lambda rng, length: rng.choice(('NORTH', 'SOUTH', 'EAST', 'WEST', 'CENTRAL'))),
+    'date': ('DATE', lambda rng, length: date(2000, 1, 1) + timedelta(days=rng.randint(0, 9000))),
+    'timestamp': ('TIMESTAMP', lambda rng, length: datetime(2000, 1, 1) + timedelta(seconds=rng.randint(0, 10 ** 9))),
+}
+
+# SQLite stores DECIMAL, DATE and TIMESTAMP as text; convert them back like the real drivers do
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+
+def hash_row(*values):
+    return zlib.crc32(repr(values).encode())
+
+
+def hash_bucket(row_hash):
+    return row_hash % 1048576
+
+
+def stored_datetime(value):
+    # TIMESTAMP values reach SQL functions as the text SQLite stores
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def to_char(value, format_model):
+    """
+    Teradata TO_CHAR of a timestamp, for the J (Julian day), SSSSS (seconds
+    past midnight) and FF6 (microseconds) format elements.
+    """
+    if value is None:
+        return None
+    value = stored_datetime(value)
+    if format_model == 'J':
+        return str(value.toordinal() + 1721425)
+    if format_model == 'SSSSS':
+        return str(value.hour * 3600 + value.minute * 60 + value.second)
+    if format_model == 'FF6':
+        return f"{value.microsecond:06d}"
+    raise ValueError(f"Unsupported TO_CHAR format: {format_model}")
+
+
+def date_part(part, value):
+    """
+    Snowflake DATE_PART of a timestamp, for EPOCH_MICROSECOND.
+    """
+    if value is None:
+        return None
+    if part.upper() != 'EPOCH_MICROSECOND':
+        raise ValueError(f"Unsupported DATE_PART: {part}")
+    delta = stored_datetime(value) - datetime(1970, 1, 1)
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def md5_hex(value):
+    if value is None:
+        return None
+    return hashlib.md5(value if isinstance(value, bytes) else str(value).encode('utf-8')).hexdigest()
+
+
+def upper_hex(value):
+    return None if value is None else bytes(value).hex().upper()
+
+
+def to_number(value, format_model):
+    """
+    TO_NUMBER of both systems, for hexadecimal format models like 'XXXXXXXX'.
+    """
+    if value is None:
+        return None
+    if set(format_model) != {'X'}:
+        raise ValueError(f"Unsupported TO_NUMBER format: {format_model}")
+    return int(value, 16)
+
+
+class LocalCursor:
+    """
+    DB-API cursor of a stand-in connection. Queries are rewritten from the
+    Teradata or Snowflake dialect used by the migration scripts to SQLite, and
+    on the Snowflake stand-in PUT and COPY INTO are emulated with a local
+    directory as the stage.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.db.cursor()
+        self.arraysize = 1000
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def _translate(self, query):
+        if self.connection.dialect == 'snowflake':
+            return query.replace('%s', '?')
+
+        query = query.replace(FASTEXPORT_ESCAPE, '')
+        top = re.search(r'\bSELECT\s+TOP\s+(\d+)\s+', query)
+        if top:
+            query = f"{query[:top.start()]}SELECT {query[top.end():].rstrip()} LIMIT {top.group(1)}"
+        query = re.sub(r'\bMOD\b', '%', query)
+        return re.sub(r'(?<![.\w])DATABASE\b', f"'{self.connection.database}'", query)
+
+    def execute(self, query, params=None):
+        statement = query.strip()
+        if self.connection.dialect == 'snowflake':
+            if statement.upper().startswith('PUT '):
+                return self._put(statement)
+            if statement.upper().startswith('COPY INTO '):
+                return self._copy(statement)
+        self.cursor.execute(self._translate(query), params or [])
+        return self
+
+    def executemany(self, query, rows):
+        self.cursor.executemany(self._translate(query), rows)
+        return self
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self.cursor.fetchmany(size or self.arraysize)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _stage_dir(self, stage_path):
+        # @%TABLE/prefix/ or @DB.SCHEMA.%TABLE/prefix/ -> <stage_dir>/prefix
+        prefix = stage_path.split('/', 1)[1] if '/' in stage_path else ''
+        return os.path.join(self.connection.stage_dir, prefix.strip('/'))
+
+    def _put(self, statement):
+        match = re.match(r"PUT\s+'file://([^']+)'\s+(\S+)", statement, re.IGNORECASE)
+        stage_dir = self._stage_dir(match.group(2))
+        os.makedirs(stage_dir, exist_ok=True)
+        for path in glob.glob(match.group(1)):
+            shutil.copy(path, stage_dir)
+        return self
+
+    def _copy(self, statement):
+        match = re.match(r"COPY INTO\s+(\S+)(?:\s*\(([^)]*)\))?\s+FROM\s+(\S+)", statement, re.IGNORECASE)
+        table, columns, stage_path = match.groups()
+        stage_dir = self._stage_dir(stage_path)
+        files = re.findall(r"'([^']+)'", re.search(r"FILES\s*=\s*\(([^)]*)\)", statement).group(1))
+
+        for file_name in files:
+            path = os.path.join(stage_dir, file_name)
+            if file_name.endswith('.parquet'):
+                import pyarrow.parquet as pq
+                data = pq.read_table(path)
+                file_columns = data.column_names
+                rows = list(zip(*(column.to_pylist() for column in data.columns)))
+            else:
+                file_columns = [column.strip() for column in columns.split(',')]
+                with gzip.open(path, 'rt', newline='', encoding='utf-8') as staged_file:
+                    rows = [
+                        tuple(None if value == '\\N' else value for value in row)
+                        for row in csv.reader(staged_file)
+                    ]
+            if rows:
+                self.cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(file_columns)}) "
+                    f"VALUES ({', '.join('?' * len(file_columns))})",
+                    rows
+                )
+            # PURGE = TRUE
+            os.remove(path)
+        return self
+
+
+class LocalConnection:
+    """
+    SQLite database standing in for a Teradata or Snowflake connection.
+    Statements autocommit, as in the Teradata and Snowflake sessions of the
+    migration scripts, and a connection may be used from any thread.
+    """
+
+    def __init__(self, path, dialect, stage_dir=None, database=DEFAULT_DATABASE):
+        self.dialect = dialect
+        self.stage_dir = stage_dir
+        self.database = database
+        self.db = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        self.db.execute('PRAGMA journal_mode = WAL')
+        if dialect == 'teradata':
+            self.db.create_function('HASHROW', -1, hash_row, deterministic=True)
+            self.db.create_function('HASHBUCKET', 1, hash_bucket, deterministic=True)
+            self.db.create_function('TO_CHAR', 2, to_char, deterministic=True)
+            self.db.create_function('HASH_MD5', 1, md5_hex, deterministic=True)
+            self.db.create_function('FROM_BYTES', 2, lambda value, encoding: upper_hex(value), deterministic=True)
+            catalog_path = f"{os.path.splitext(path)[0]}_dbc.db"
+            if os.path.exists(catalog_path):
+                self.db.execute('ATTACH DATABASE ? AS DBC', [catalog_path])
+        else:
+            self.db.create_function('DATE_PART', 2, date_part, deterministic=True)
+            self.db.create_function('MD5', 1, md5_hex, deterministic=True)
+            self.db.create_function('HEX_ENCODE', 1, upper_hex, deterministic=True)
+        self.db.create_function('TO_NUMBER', 2, to_number, deterministic=True)
+
+    def cursor(self):
+        return LocalCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def local_teradata_connection(path, database=DEFAULT_DATABASE):
+    """
+    Return a get_teradata_connection() replacement backed by the SQLite file at path.
+    A <path>_dbc.db file next to it, written by create_synthetic_table(),
+    provides the DBC views used for row count estimates.
+    """
+    def get_teradata_connection():
+        return LocalConnection(path, 'teradata', database=database)
+    return get_teradata_connection
+
+
+def local_snowflake_connection(path, stage_dir):
+    """
+    Return a get_snowflake_connection() replacement backed by the SQLite file
+    at path, with stage_dir as the table stage of PUT and COPY INTO.
+    """
+    def get_snowflake_connection():
+        return LocalConnection(path, 'snowflake', stage_dir=stage_dir)
+    return get_snowflake_connection
+
+
+def parse_type_mix(type_mix):
+    """
+    Parse a type mix like 'int:2,varchar:3,date:1' into {type: weight}.
+    """
+    weights = {}
+    for item in type_mix.split(','):
+        name, _, weight = item.strip().partition(':')
+        if name not in COLUMN_TYPES:
+            raise ValueError(f"Unknown column type '{name}'; choose from {', '.join(COLUMN_TYPES)}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def build_columns(width, type_mix):
+    """
+    Spread width columns over the types of type_mix in proportion to their weights.
+    Returns [(column_name, column_type)], after the ID key column.
+    """
+    weights = parse_type_mix(type_mix) if isinstance(type_mix, str) else dict(type_mix)
+    total = sum(weights.values())
+    counts = {name: width * weight // total for name, weight in weights.items()}
+    # Hand the rounding remainder to the heaviest types
+    for name in sorted(weights, key=weights.get, reverse=True)[:width - sum(counts.values())]:
+        counts[name] += 1
+
+    columns = []
+    for name, count in counts.items():
+        columns.extend((f"{name}_{index + 1}", name) for index in range(count))
+    return columns
+
+
+def create_synthetic_table(
+        source_path,
+        target_path,
+        table_name,
+        rows,
+        width,
+        type_mix,
+        varchar_length=40,
+        null_fraction=0.05,
+        seed=42
+):
+    """
+    Create a synthetic table of rows rows in the source database and an empty
+    copy in the target database. The table has an INTEGER ID key followed by
+    width columns of the type mix, filled with seeded random values and
+    null_fraction NULLs. A DBC catalog next to the source holds the table's
+    statistics and size, so the migration estimates the row count as it would
+    on Teradata.
+    Returns the estimated in-memory size of the table's rows in bytes.
+    """
+    columns = build_columns(width, type_mix)
+    definitions = ['ID INTEGER NOT NULL PRIMARY KEY'] + [
+        f"{column} {COLUMN_TYPES[column_type][0].format(length=varchar_length)}"
+        for column, column_type in columns
+    ]
+    create_sql = f"CREATE TABLE {table_name} ({', '.join(definitions)})"
+
+    for path in (source_path, target_path):
+        if os.path.exists(path):
+            os.remove(path)
+    with sqlite3.connect(target_path) as target_db:
+        target_db.execute(create_sql)
+
+    rng = random.Random(seed)
+    generators = [COLUMN_TYPES[column_type][1] for _, column_type in columns]
+    insert_sql = f"INSERT INTO {table_name} VALUES ({', '.join('?' * (len(columns) + 1))})"
+    table_bytes = 0
+
+    with sqlite3.connect(source_path) as source_db:
+        source_db.execute(create_sql)
+        for start in range(0, rows, 10000):
+            chunk = []
+            for row_id in range(start + 1, min(rows, start + 10000) + 1):
+                row = (row_id,) + tuple(
+                    None if rng.random() < null_fraction else generate(rng, varchar_length)
+                    for generate in generators
+                )
+                table_bytes += estimate_row_bytes(row)
+                chunk.append(row)
+            source_db.executemany(insert_sql, chunk)
+
+    catalog_path = f"{os.path.splitext(source_path)[0]}_dbc.db"
+    if os.path.exists(catalog_path):
+        os.remove(catalog_path)
+    with sqlite3.connect(catalog_path) as catalog_db:
+        catalog_db.execute(
+            "CREATE TABLE StatsV (DatabaseName TEXT, TableName TEXT, RowCount INTEGER, LastCollectTimeStamp TEXT)"
+        )
+        catalog_db.execute("CREATE TABLE TableSizeV (DatabaseName TEXT, TableName TEXT, CurrentPerm INTEGER)")
+        catalog_db.execute(
+            "CREATE TABLE ColumnsV (DatabaseName TEXT, TableName TEXT, ColumnName TEXT, "
+            "ColumnType TEXT, ColumnLength INTEGER)"
+        )
+        catalog_db.execute(
+            "INSERT INTO StatsV VALUES (?, ?, ?, ?)",
+            [DEFAULT_DATABASE, table_name, rows, datetime.now().isoformat(' ')]
+        )
+        catalog_db.execute("INSERT INTO TableSizeV VALUES (?, ?, ?)", [DEFAULT_DATABASE, table_name, table_bytes])
+    return table_bytes
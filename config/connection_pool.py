@@ -0,0 +1,260 @@
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+# Connections a pool opens at most unless a caller asks for more (see ensure_max_size)
+DEFAULT_MAX_SIZE = 16
+
+# Idle connections are closed after this many seconds, down to the pool's min_size
+DEFAULT_IDLE_TIMEOUT = 300
+
+# Connections idle for longer than this are health checked on checkout
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+
+# Seconds a checkout waits for a connection when the pool is at max_size
+DEFAULT_CHECKOUT_TIMEOUT = 300
+
+# Query used to check that a connection is still usable; valid on Teradata, Snowflake and SQL Server
+HEALTH_CHECK_QUERY = "SELECT 1"
+
+
+class PooledConnection:
+    """
+    A connection owned by a pool, with its bookkeeping.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.time()
+        self.suspect = False
+        self.checkouts = 0
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of connections opened by factory (e.g. get_teradata_connection).
+
+    acquire() hands out an idle connection or opens a new one while fewer than
+    max_size are open, and otherwise waits for a release. Checkouts are per
+    thread: a thread that already holds a connection of the pool gets the same
+    one back, and it returns to the pool when the thread's last checkout is
+    released. Connections idle for more than health_check_interval seconds,
+    or released after an error, are checked with HEALTH_CHECK_QUERY before
+    being handed out and replaced if the check fails. Connections idle for
+    more than idle_timeout seconds are closed, keeping min_size open.
+    """
+
+    def __init__(
+            self,
+            factory,
+            min_size=0,
+            max_size=DEFAULT_MAX_SIZE,
+            idle_timeout=DEFAULT_IDLE_TIMEOUT,
+            health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+            checkout_timeout=DEFAULT_CHECKOUT_TIMEOUT
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self.idle = []
+        self.in_use = {}
+        self.opening = 0
+        self.closed = False
+        self.local = threading.local()
+        self.condition = threading.Condition()
+
+        for _ in range(min_size):
+            self.idle.append(PooledConnection(factory()))
+
+    @property
+    def size(self):
+        return len(self.idle) + len(self.in_use) + self.opening
+
+    def ensure_max_size(self, size):
+        """
+        Raise max_size to at least size, e.g. to the number of workers of a run.
+        """
+        with self.condition:
+            if size > self.max_size:
+                self.max_size = size
+                self.condition.notify_all()
+
+    def acquire(self):
+        """
+        Check out a connection for the calling thread.
+        """
+        held = getattr(self.local, 'held', None)
+        if held is not None:
+            held.checkouts += 1
+            return held.connection
+
+        deadline = time.time() + self.checkout_timeout
+        while True:
+            pooled = None
+            with self.condition:
+                if self.closed:
+                    raise ValueError("The connection pool is closed.")
+                self._close_expired()
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No connection available after {self.checkout_timeout} seconds "
+                            f"({self.max_size} in use)"
+                        )
+                    self.condition.wait(remaining)
+                if self.idle:
+                    # Most recently used first, so surplus connections age out
+                    pooled = self.idle.pop()
+                    self.in_use[id(pooled.connection)] = pooled
+                else:
+                    self.opening += 1
+
+            if pooled is None:
+                pooled = self._open()
+            elif not self._is_healthy(pooled):
+                self._discard(pooled)
+                continue
+
+            pooled.checkouts = 1
+            self.local.held = pooled
+            return pooled.connection
+
+    def release(self, connection, broken=False):
+        """
+        Return a connection checked out by the calling thread. broken=True
+        (e.g. after an error) has it health checked before its next checkout.
+        """
+        held = getattr(self.local, 'held', None)
+        if held is None or held.connection is not connection:
+            raise ValueError("The connection was not checked out from this pool by this thread.")
+        held.suspect = held.suspect or broken
+        held.checkouts -= 1
+        if held.checkouts > 0:
+            return
+
+        self.local.held = None
+        held.last_used = time.time()
+        with self.condition:
+            self.in_use.pop(id(connection), None)
+            if self.closed:
+                close_quietly(connection)
+            else:
+                self.idle.append(held)
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of a with block.
+        """
+        connection = self.acquire()
+        broken = True
+        try:
+            yield connection
+            broken = False
+        finally:
+            # Also reached when a generator holding the connection is closed early
+            self.release(connection, broken=broken)
+
+    def close(self):
+        """
+        Close the idle connections; connections in use are closed when released.
+        """
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.condition.notify_all()
+        for pooled in idle:
+            close_quietly(pooled.connection)
+
+    def _open(self):
+        try:
+            pooled = PooledConnection(self.factory())
+        except Exception:
+            with self.condition:
+                self.opening -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.opening -= 1
+            self.in_use[id(pooled.connection)] = pooled
+        return pooled
+
+    def _is_healthy(self, pooled):
+        if not pooled.suspect and time.time() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = pooled.connection.cursor()
+            try:
+                cursor.execute(HEALTH_CHECK_QUERY)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        pooled.suspect = False
+        return True
+
+    def _discard(self, pooled):
+        with self.condition:
+            self.in_use.pop(id(pooled.connection), None)
+            self.condition.notify()
+        close_quietly(pooled.connection)
+
+    def _close_expired(self):
+        # Called with the condition held; idle is ordered from least to most recently used
+        now = time.time()
+        while len(self.idle) + len(self.in_use) > self.min_size and self.idle \
+                and now - self.idle[0].last_used > self.idle_timeout:
+            close_quietly(self.idle.pop(0).connection)
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+# Shared pools by connection factory
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(factory, **options):
+    """
+    Return the shared pool of connections opened by factory, creating it with
+    options (see ConnectionPool) on first use. Callers pass the connection
+    function they would otherwise call, e.g. get_pool(get_teradata_connection).
+    """
+    with _pools_lock:
+        pool = _pools.get(factory)
+        if pool is None or pool.closed:
+            pool = _pools[factory] = ConnectionPool(factory, **options)
+        return pool
+
+
+def pooled_connection(factory):
+    """
+    Check out a connection of factory's shared pool for a with block:
+
+        with pooled_connection(get_teradata_connection) as conn:
+            ...
+    """
+    return get_pool(factory).connection()
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
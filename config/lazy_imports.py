@@ -0,0 +1,68 @@
+import sys
+import importlib
+import importlib.util
+import threading
+
+
+class LazyModule:
+    """
+    Stand-in for a module that imports it on first attribute access.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Return a module that is only imported when one of its attributes is first
+    used, or None when it is not installed.
+
+    Database drivers, Snowpark and pyarrow take from a fraction of a second to
+    seconds to import, and a driver's native libraries may be missing on
+    machines that never use it, so config and operations modules bind them
+    with this instead of importing them at the top.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        # The parent package of a dotted name is missing
+        spec = None
+    if spec is None:
+        return None
+    return LazyModule(name)
+
+
+class MissingModuleError(Exception):
+    """
+    Never raised: the exception class driver_error() returns for a module that
+    is not installed or not imported.
+    """
+
+
+def driver_error(module, name='Error'):
+    """
+    Return the exception class `name` of a module bound with lazy_import(),
+    for except clauses. A module that is not installed (None) or not imported
+    yet cannot have raised anything, so MissingModuleError is returned instead
+    of importing it there, and the error being handled propagates unchanged.
+    """
+    if module is None or module._name not in sys.modules:
+        return MissingModuleError
+    return getattr(module, name)
@@ -1,44 +1,106 @@
 import os
-import snowflake
+import threading
 from dotenv import load_dotenv
-from snowflake.snowpark import Session
+from config.connection_pool import get_pool
+from config.lazy_imports import lazy_import
+
+# Loaded on first connection; Snowpark alone takes about a second to import
+snowflake_connector = lazy_import('snowflake.connector')
+snowpark = lazy_import('snowflake.snowpark')
 
 # Load environment variables from the .env file
 load_dotenv()
 
-def create_snowflake_session():
-    # Define Snowflake connection parameters from environment variables
+# Pooled connections of the open sessions of create_snowflake_session(), by id(session)
+_session_connections = {}
+_session_connections_lock = threading.Lock()
+
+# Client options of every Snowflake login:
+# - keep-alive heartbeats stop idle pooled sessions from expiring between batches
+# - SSO ID tokens and MFA tokens are cached in the OS keyring (or ~/.cache/snowflake
+#   on Linux), so later processes log in without another browser or MFA round trip
+SNOWFLAKE_CLIENT_OPTIONS = {
+    "client_session_keep_alive": True,
+    "client_store_temporary_credential": True,
+    "client_request_mfa_token": True
+}
+
+
+def get_snowflake_connection_params():
+    """
+    Build the Snowflake login parameters shared by the connector and Snowpark.
+    SNOWFLAKE_AUTHENTICATOR selects e.g. externalbrowser (SSO) or username_password_mfa;
+    SNOWFLAKE_KEEP_ALIVE_SECONDS sets the keep-alive heartbeat interval.
+    """
     snowflake_conn_params = {
         "user": os.getenv("SNOWFLAKE_USER"),
         "password": os.getenv("SNOWFLAKE_PASSWORD"),
         "account": os.getenv("SNOWFLAKE_ACCOUNT"),
         "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
         "database": os.getenv("SNOWFLAKE_DATABASE"),
-        "schema": os.getenv("SNOWFLAKE_SCHEMA")
+        "schema": os.getenv("SNOWFLAKE_SCHEMA"),
+        "authenticator": os.getenv("SNOWFLAKE_AUTHENTICATOR")
     }
+    # Unset values are left to the connector defaults (no password with SSO)
+    snowflake_conn_params = {key: value for key, value in snowflake_conn_params.items() if value}
+    snowflake_conn_params.update(SNOWFLAKE_CLIENT_OPTIONS)
 
-    # Create and return a Snowflake session
-    session = Session.builder.configs(snowflake_conn_params).create()
-    return session
+    heartbeat = os.getenv("SNOWFLAKE_KEEP_ALIVE_SECONDS")
+    if heartbeat:
+        snowflake_conn_params["client_session_keep_alive_heartbeat_frequency"] = int(heartbeat)
+    return snowflake_conn_params
 
 
 # Create and return a Snowflake connector connection for administrative queries
 def get_snowflake_connection():
-    # Define Snowflake connection parameters from environment variables
-    snowflake_conn_params = {
-        "user": os.getenv("SNOWFLAKE_USER"),
-        "password": os.getenv("SNOWFLAKE_PASSWORD"),
-        "account": os.getenv("SNOWFLAKE_ACCOUNT"),
-        "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
-        "database": os.getenv("SNOWFLAKE_DATABASE"),
-        "schema": os.getenv("SNOWFLAKE_SCHEMA")
-    }
+    if snowflake_connector is None:
+        raise ValueError("Snowflake connections require the snowflake-connector-python package.")
+    return snowflake_connector.connect(**get_snowflake_connection_params())
+
+
+def create_snowflake_session(connection=None):
+    """
+    Create a Snowpark session on top of a connector connection instead of a separate login.
+    By default the calling thread's pooled connection is checked out and kept
+    for the session, so connector cursors from pooled_connection() on this
+    thread and the Snowpark session share one authenticated Snowflake session.
+    The connection stays checked out until close_snowflake_session(), so no
+    other session is created on it while this one is alive. A connection
+    passed in is used as is and never returned to the pool.
+    """
+    if snowpark is None:
+        raise ValueError("Snowpark sessions require the snowflake-snowpark-python package.")
+    if connection is not None:
+        return snowpark.Session.builder.configs({"connection": connection}).create()
+
+    pool = get_pool(get_snowflake_connection)
+    connection = pool.acquire()
+    try:
+        session = snowpark.Session.builder.configs({"connection": connection}).create()
+    except Exception:
+        pool.release(connection, broken=True)
+        raise
+    with _session_connections_lock:
+        _session_connections[id(session)] = connection
+    return session
+
 
-    # Create and return a Snowflake connector connection
-    connection = snowflake.connector.connect(**snowflake_conn_params)
-    return connection
+def close_snowflake_session(session):
+    """
+    Close a session from create_snowflake_session() on the thread that created
+    it. Session.close() also closes the connector connection, so a pooled
+    connection goes back to the pool as broken and is replaced on its next
+    checkout. Closing a session twice releases its connection once.
+    """
+    with _session_connections_lock:
+        connection = _session_connections.pop(id(session), None)
+    try:
+        session.close()
+    finally:
+        if connection is not None:
+            get_pool(get_snowflake_connection).release(connection, broken=True)
 
-# # Initialize the Snowflake session for use in other files
+# # Create a Snowpark session sharing the pooled connector session
 # session = create_snowflake_session()
 #
 # Optionally initialize the Snowflake connector connection for administrative tasks
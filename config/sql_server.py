@@ -1,17 +1,28 @@
 import os
-import pyodbc
+import threading
+from functools import partial
 from dotenv import load_dotenv
+from config.lazy_imports import lazy_import, driver_error
+
+# Loaded on first connection
+pyodbc = lazy_import('pyodbc')
 
 # Load environment variables from the .env file
 load_dotenv()
 
-def get_sql_server_connection():
+# Connection functions of sql_server_database_connection(), one per database
+_database_connections = {}
+_database_connections_lock = threading.Lock()
+
+
+def get_sql_server_connection(database_name=None):
     """
-    Creates and returns a SQL Server connection using environment variables.
+    Creates and returns a SQL Server connection using environment variables,
+    to database_name instead of SQL_SERVER_DATABASE when given.
     """
     connection_params = {
         'server': os.getenv('SQL_SERVER_HOST'),  # Fetch server from env
-        'database': os.getenv('SQL_SERVER_DATABASE'),  # Fetch database from env
+        'database': database_name or os.getenv('SQL_SERVER_DATABASE'),  # Fetch database from env
         'user': os.getenv('SQL_SERVER_USER'),  # Fetch user from env
         'password': os.getenv('SQL_SERVER_PASSWORD')  # Fetch password from env
     }
@@ -29,10 +40,26 @@ def get_sql_server_connection():
         f"PWD={connection_params['password']};"
     )
 
+    if pyodbc is None:
+        raise ValueError("SQL Server connections require the pyodbc package.")
+
     # Establish and return the connection
     return pyodbc.connect(conn_str)
 
 
+def sql_server_database_connection(database_name):
+    """
+    Returns a function opening connections to database_name. It is the same
+    function on every call, so get_pool() keeps one pool per database and
+    queries of a database never need USE on a shared connection.
+    """
+    with _database_connections_lock:
+        factory = _database_connections.get(database_name)
+        if factory is None:
+            factory = _database_connections[database_name] = partial(get_sql_server_connection, database_name)
+        return factory
+
+
 def show_tables():
     """
     Connects to SQL Server and shows the list of tables in the current database.
@@ -57,7 +84,7 @@ def show_tables():
                 else:
                     print("No tables found in the current database.")
 
-    except pyodbc.Error as e:
+    except driver_error(pyodbc) as e:
         print("Error accessing SQL Server:", e)
 
 
@@ -1,6 +1,9 @@
 import os
-import teradatasql
 from dotenv import load_dotenv
+from config.lazy_imports import lazy_import, driver_error
+
+# Loaded on first connection
+teradatasql = lazy_import('teradatasql')
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -20,6 +23,9 @@ def get_teradata_connection():
     if not all(connection_params.values()):
         raise ValueError("One or more connection parameters are missing. Check your environment variables.")
 
+    if teradatasql is None:
+        raise ValueError("Teradata connections require the teradatasql package.")
+
     # Establish and return the connection
     return teradatasql.connect(**connection_params)
 
@@ -48,7 +54,7 @@ def show_tables(database_name):
                 else:
                     print(f"No tables found in database '{database_name}'.")
 
-    except teradatasql.Error as e:
+    except driver_error(teradatasql) as e:
         print("Error accessing Teradata:", e)
 
 
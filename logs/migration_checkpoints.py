@@ -0,0 +1,259 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, date, time
+from decimal import Decimal
+
+# Checkpoint database kept next to the migration logs
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migration_checkpoints.db')
+
+
+def encode_value(value):
+    """
+    Encode a key value as JSON, tagging types JSON cannot represent natively.
+    """
+    if isinstance(value, datetime):
+        return {'__type__': 'datetime', 'value': value.isoformat()}
+    if isinstance(value, date):
+        return {'__type__': 'date', 'value': value.isoformat()}
+    if isinstance(value, time):
+        return {'__type__': 'time', 'value': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__type__': 'decimal', 'value': str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'__type__': 'bytes', 'value': bytes(value).hex()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    return value
+
+
+def decode_value(value):
+    """
+    Reverse encode_value().
+    """
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    if isinstance(value, dict):
+        value_type = value.get('__type__')
+        if value_type == 'datetime':
+            return datetime.fromisoformat(value['value'])
+        if value_type == 'date':
+            return date.fromisoformat(value['value'])
+        if value_type == 'time':
+            return time.fromisoformat(value['value'])
+        if value_type == 'decimal':
+            return Decimal(value['value'])
+        if value_type == 'bytes':
+            return bytes.fromhex(value['value'])
+        return {key: decode_value(item) for key, item in value.items()}
+    return value
+
+
+class CheckpointStore:
+    """
+    Durable per-table, per-partition high-water keys for resumable migrations,
+    and the watermarks of incremental syncs.
+
+    A run stores its partition plan once, then every committed batch updates
+    the last key loaded for its partition. The SQLite file is shared by all
+    worker threads of a process, so access is serialized with a lock.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        # Concurrent table migrations share the file, so wait for locks instead of failing
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS migration_plans (
+            source_table TEXT NOT NULL,
+            target_table TEXT NOT NULL,
+            plan TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (source_table, target_table)
+        )
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS migration_checkpoints (
+            source_table TEXT NOT NULL,
+            target_table TEXT NOT NULL,
+            partition_index INTEGER NOT NULL,
+            last_key TEXT,
+            migrated_rows INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (source_table, target_table, partition_index)
+        )
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_watermarks (
+            source_table TEXT NOT NULL,
+            target_table TEXT NOT NULL,
+            watermark_column TEXT NOT NULL,
+            watermark TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (source_table, target_table)
+        )
+        """)
+        self.conn.commit()
+
+    def start_run(self, source_table, target_table, plan):
+        """
+        Record the partition plan of a new run, discarding older checkpoints for the table.
+        """
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM migration_checkpoints WHERE source_table = ? AND target_table = ?",
+                (source_table, target_table)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO migration_plans VALUES (?, ?, ?, ?)",
+                (source_table, target_table, json.dumps(encode_value(plan)), datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def load_plan(self, source_table, target_table):
+        """
+        Return the stored partition plan of the last run, or None.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT plan FROM migration_plans WHERE source_table = ? AND target_table = ?",
+                (source_table, target_table)
+            ).fetchone()
+        return decode_value(json.loads(row[0])) if row else None
+
+    def save_checkpoint(self, source_table, target_table, partition_index, last_key, migrated_rows):
+        """
+        Record the high-water key of a partition after a batch is committed in Snowflake.
+        """
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT INTO migration_checkpoints VALUES (?, ?, ?, ?, ?, 0, ?)
+                ON CONFLICT (source_table, target_table, partition_index) DO UPDATE SET
+                    last_key = excluded.last_key,
+                    migrated_rows = excluded.migrated_rows,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    source_table, target_table, partition_index,
+                    json.dumps(encode_value(list(last_key))), migrated_rows, datetime.now().isoformat()
+                )
+            )
+            self.conn.commit()
+
+    def mark_completed(self, source_table, target_table, partition_index):
+        """
+        Mark a partition as fully migrated.
+        """
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT INTO migration_checkpoints VALUES (?, ?, ?, NULL, 0, 1, ?)
+                ON CONFLICT (source_table, target_table, partition_index) DO UPDATE SET
+                    completed = 1,
+                    updated_at = excluded.updated_at
+                """,
+                (source_table, target_table, partition_index, datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def get_checkpoints(self, source_table, target_table):
+        """
+        Return {partition_index: {'last_key', 'migrated_rows', 'completed'}} for a table.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT partition_index, last_key, migrated_rows, completed
+                FROM migration_checkpoints
+                WHERE source_table = ? AND target_table = ?
+                """,
+                (source_table, target_table)
+            ).fetchall()
+
+        checkpoints = {}
+        for partition_index, last_key, migrated_rows, completed in rows:
+            checkpoints[partition_index] = {
+                'last_key': tuple(decode_value(json.loads(last_key))) if last_key else None,
+                'migrated_rows': migrated_rows,
+                'completed': bool(completed)
+            }
+        return checkpoints
+
+    def unfinished_runs(self):
+        """
+        Return [(source_table, target_table)] of the runs that left partitions
+        not completed, e.g. because the process crashed mid-table.
+        """
+        with self.lock:
+            plans = self.conn.execute("SELECT source_table, target_table, plan FROM migration_plans").fetchall()
+            completed = set(self.conn.execute(
+                "SELECT source_table, target_table, partition_index FROM migration_checkpoints WHERE completed = 1"
+            ).fetchall())
+
+        return [
+            (source_table, target_table)
+            for source_table, target_table, plan in plans
+            if any(
+                (source_table, target_table, partition['index']) not in completed
+                for partition in json.loads(plan)['partitions']
+            )
+        ]
+
+    def clear(self, source_table, target_table):
+        """
+        Forget the plan and checkpoints of a table, e.g. after a successful migration.
+        """
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM migration_checkpoints WHERE source_table = ? AND target_table = ?",
+                (source_table, target_table)
+            )
+            self.conn.execute(
+                "DELETE FROM migration_plans WHERE source_table = ? AND target_table = ?",
+                (source_table, target_table)
+            )
+            self.conn.commit()
+
+    def get_watermark(self, source_table, target_table, watermark_column):
+        """
+        Return the watermark of the last incremental sync of a table, or None.
+        A watermark stored for another column is ignored.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                """
+                SELECT watermark_column, watermark FROM sync_watermarks
+                WHERE source_table = ? AND target_table = ?
+                """,
+                (source_table, target_table)
+            ).fetchone()
+        if not row or row[0].lower() != watermark_column.lower():
+            return None
+        return decode_value(json.loads(row[1]))
+
+    def save_watermark(self, source_table, target_table, watermark_column, watermark):
+        """
+        Record the watermark up to which changes were applied to the target.
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_watermarks VALUES (?, ?, ?, ?, ?)",
+                (
+                    source_table, target_table, watermark_column,
+                    json.dumps(encode_value(watermark)), datetime.now().isoformat()
+                )
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
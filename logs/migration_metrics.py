@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from tabulate import tabulate
+
+# Metric files are kept next to the migration logs
+DEFAULT_METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'metrics')
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Minimum seconds between two rewrites of a Prometheus textfile
+PROMETHEUS_WRITE_INTERVAL = 15
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed buckets, as exposed by Prometheus.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Yield (upper bound, observations at or below it), ending with +Inf.
+        """
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound if bound != float('inf') else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class StageMetrics:
+    """
+    Totals and histograms of one stage (e.g. fetch, convert, load).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.seconds = Histogram(buckets)
+        self.wait_seconds = Histogram(buckets)
+        self.batches = 0
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+
+
+class MigrationMetrics:
+    """
+    Per-batch stage metrics shared by the migration scripts.
+
+    Every observation updates the stage's latency and wait histograms and its
+    row, byte and batch counters. A JSON-lines sink also receives each
+    observation as one event; a Prometheus sink rewrites a textfile (for the
+    node_exporter textfile collector) at most every PROMETHEUS_WRITE_INTERVAL
+    seconds and on close. log_summary() logs one line per stage.
+    """
+
+    def __init__(self, job, sink=None, buckets=DEFAULT_BUCKETS):
+        self.job = job
+        self.sink = sink
+        self.buckets = buckets
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds=0.0, rows=0, bytes=0, wait=None, error=False, **labels):
+        """
+        Record one batch (or statement) of a stage.
+        """
+        with self.lock:
+            metrics = self.stages.get(stage)
+            if metrics is None:
+                metrics = self.stages[stage] = StageMetrics(self.buckets)
+            metrics.seconds.observe(seconds)
+            if wait is not None:
+                metrics.wait_seconds.observe(wait)
+            metrics.batches += 1
+            metrics.rows += rows
+            metrics.bytes += bytes
+            if error:
+                metrics.errors += 1
+
+        if self.sink:
+            event = {
+                'time': datetime.now().isoformat(),
+                'job': self.job,
+                'stage': stage,
+                'seconds': round(seconds, 6),
+                'rows': rows,
+                'bytes': bytes,
+                'wait': round(wait, 6) if wait is not None else None,
+                'error': error
+            }
+            event.update(labels)
+            self.sink.record(self, event)
+
+    @contextmanager
+    def timer(self, stage, rows=0, bytes=0, **labels):
+        """
+        Time a block as one observation of a stage; failures are counted as errors.
+        """
+        start = time.time()
+        try:
+            yield
+        except Exception:
+            self.observe(stage, time.time() - start, rows, bytes, error=True, **labels)
+            raise
+        self.observe(stage, time.time() - start, rows, bytes, **labels)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                stage: {
+                    'seconds': list(metrics.seconds.cumulative()),
+                    'seconds_sum': metrics.seconds.sum,
+                    'seconds_count': metrics.seconds.count,
+                    'wait': list(metrics.wait_seconds.cumulative()),
+                    'wait_sum': metrics.wait_seconds.sum,
+                    'wait_count': metrics.wait_seconds.count,
+                    'batches': metrics.batches,
+                    'rows': metrics.rows,
+                    'bytes': metrics.bytes,
+                    'errors': metrics.errors
+                }
+                for stage, metrics in self.stages.items()
+            }
+
+    def log_summary(self, logger):
+        """
+        Log throughput and latency percentiles per stage.
+        """
+        rows = []
+        with self.lock:
+            for stage, metrics in self.stages.items():
+                busy = metrics.seconds.sum
+                rows.append([
+                    stage,
+                    metrics.batches,
+                    metrics.rows,
+                    f"{metrics.bytes / (1024 * 1024):.1f}",
+                    f"{busy:.2f}",
+                    f"{metrics.rows / busy:.0f}" if busy else "-",
+                    f"{metrics.seconds.quantile(0.5)}",
+                    f"{metrics.seconds.quantile(0.95)}",
+                    f"{metrics.seconds.quantile(0.99)}",
+                    f"{metrics.wait_seconds.sum:.2f}",
+                    metrics.errors
+                ])
+        if not rows:
+            return
+        headers = ["Stage", "Batches", "Rows", "MB", "Busy s", "Rows/s", "p50 s", "p95 s", "p99 s", "Wait s", "Errors"]
+        logger.info(f"Stage metrics for {self.job}:\n" + tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def close(self):
+        if self.sink:
+            self.sink.close(self)
+
+
+class JsonLinesSink:
+    """
+    Appends every observation to a file as one JSON object per line.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def record(self, metrics, event):
+        line = json.dumps(event, default=str)
+        with self.lock:
+            self.file.write(line + '\n')
+
+    def close(self, metrics):
+        with self.lock:
+            self.file.close()
+
+
+class PrometheusTextfileSink:
+    """
+    Writes the aggregated metrics in the Prometheus text exposition format.
+    The file is replaced atomically so a scraper never reads a partial file.
+    """
+
+    def __init__(self, path, interval=PROMETHEUS_WRITE_INTERVAL):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.interval = interval
+        self.last_write = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, metrics, event):
+        if time.time() - self.last_write >= self.interval:
+            self.write(metrics)
+
+    def close(self, metrics):
+        self.write(metrics)
+
+    def write(self, metrics):
+        with self.lock:
+            self.last_write = time.time()
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+                metrics_file.write(format_prometheus(metrics.job, metrics.snapshot()))
+            os.replace(temp_path, self.path)
+
+
+def format_prometheus(job, snapshot):
+    """
+    Render a metrics snapshot in the Prometheus text exposition format.
+    """
+    lines = []
+
+    def histogram(name, help_text, key):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, values in snapshot.items():
+            labels = f'job="{job}",stage="{stage}"'
+            for bound, count in values[key]:
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {values[key + '_sum']}")
+            lines.append(f"{name}_count{{{labels}}} {values[key + '_count']}")
+
+    def counter(name, help_text, key):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for stage, values in snapshot.items():
+            lines.append(f'{name}{{job="{job}",stage="{stage}"}} {values[key]}')
+
+    histogram('migration_stage_seconds', 'Time spent per batch in a migration stage.', 'seconds')
+    histogram('migration_stage_wait_seconds', 'Time a stage waited on its neighbours per batch.', 'wait')
+    counter('migration_stage_batches_total', 'Batches processed by a migration stage.', 'batches')
+    counter('migration_stage_rows_total', 'Rows processed by a migration stage.', 'rows')
+    counter('migration_stage_bytes_total', 'Estimated bytes processed by a migration stage.', 'bytes')
+    counter('migration_stage_errors_total', 'Failed batches of a migration stage.', 'errors')
+    return '\n'.join(lines) + '\n'
+
+
+def create_metrics(job, metrics_format=None, metrics_path=None):
+    """
+    Create the metrics of a run with an optional sink: 'prometheus' writes
+    <job>.prom and 'jsonl' appends to <job>.jsonl in logs/metrics unless
+    metrics_path is given. Without a format metrics are only logged.
+    """
+    sink = None
+    if metrics_format == 'prometheus':
+        sink = PrometheusTextfileSink(metrics_path or os.path.join(DEFAULT_METRICS_DIR, f"{job}.prom"))
+    elif metrics_format == 'jsonl':
+        sink = JsonLinesSink(metrics_path or os.path.join(DEFAULT_METRICS_DIR, f"{job}.jsonl"))
+    elif metrics_format:
+        raise ValueError(f"Unknown metrics format: {metrics_format}")
+    return MigrationMetrics(job, sink)
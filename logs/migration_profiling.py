@@ -0,0 +1,199 @@
+import io
+import os
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+# Every Nth block of a stage is measured with tracemalloc snapshots, which are costly
+DEFAULT_SNAPSHOT_EVERY = 20
+
+# Frames kept per traced allocation
+DEFAULT_TRACE_FRAMES = 10
+
+# tracemalloc is process-wide: it is stopped only when the last profiler using it stops
+_tracemalloc_users = 0
+_tracemalloc_started = False
+_tracemalloc_lock = threading.Lock()
+
+
+class MigrationProfiler:
+    """
+    CPU and allocation profiles of a migration run, per stage.
+
+    Code run inside stage(name) is profiled with cProfile on the calling
+    thread, so stages running concurrently on worker threads get separate
+    profiles that are merged per stage at the end. For allocations,
+    tracemalloc snapshots are taken around every snapshot_every-th block of a
+    stage and the memory still allocated when the block exits is attributed
+    to that stage. Results are written next to the run's log file as
+    <prefix>.<stage>.prof (pstats), <prefix>.prof (all stages) and
+    <prefix>.<stage>.tracemalloc (last snapshot), and summarized by report().
+
+    Python 3.12+ allows only one active profiler at a time, so blocks that
+    overlap with a block profiled on another thread are skipped there.
+    """
+
+    def __init__(
+            self,
+            output_prefix,
+            top_n=20,
+            snapshot_every=DEFAULT_SNAPSHOT_EVERY,
+            trace_frames=DEFAULT_TRACE_FRAMES
+    ):
+        self.output_prefix = output_prefix
+        self.top_n = top_n
+        self.snapshot_every = snapshot_every
+        self.trace_frames = trace_frames
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.profiles = {}
+        self.blocks = {}
+        self.allocations = {}
+        self.snapshots = {}
+        self.skipped = 0
+        self.started = False
+
+    def start(self):
+        global _tracemalloc_users, _tracemalloc_started
+        with _tracemalloc_lock:
+            if self.started:
+                return
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.trace_frames)
+                _tracemalloc_started = True
+            _tracemalloc_users += 1
+            self.started = True
+
+    def _thread_profile(self, stage):
+        profiles = getattr(self.local, 'profiles', None)
+        if profiles is None:
+            profiles = self.local.profiles = {}
+        profile = profiles.get(stage)
+        if profile is None:
+            profile = profiles[stage] = cProfile.Profile()
+            with self.lock:
+                self.profiles.setdefault(stage, []).append(profile)
+        return profile
+
+    @contextmanager
+    def stage(self, stage):
+        """
+        Profile a block as part of a stage.
+        """
+        with self.lock:
+            block = self.blocks.get(stage, 0)
+            self.blocks[stage] = block + 1
+        before = take_snapshot() if block % self.snapshot_every == 0 and tracemalloc.is_tracing() else None
+
+        profile = self._thread_profile(stage)
+        try:
+            profile.enable()
+            enabled = True
+        except ValueError:
+            # Another thread's profiler is active (Python 3.12+)
+            enabled = False
+            with self.lock:
+                self.skipped += 1
+        try:
+            yield
+        finally:
+            if enabled:
+                profile.disable()
+            if before is not None and tracemalloc.is_tracing():
+                after = take_snapshot()
+                self._record_allocations(stage, after.compare_to(before, 'lineno'), after)
+
+    def _record_allocations(self, stage, differences, snapshot):
+        with self.lock:
+            totals = self.allocations.setdefault(stage, {})
+            for difference in differences:
+                if difference.size_diff <= 0:
+                    continue
+                frame = difference.traceback[0]
+                key = f"{frame.filename}:{frame.lineno}"
+                size, count = totals.get(key, (0, 0))
+                totals[key] = (size + difference.size_diff, count + difference.count_diff)
+            self.snapshots[stage] = snapshot
+
+    def stop(self):
+        global _tracemalloc_users, _tracemalloc_started
+        with _tracemalloc_lock:
+            if not self.started:
+                return
+            self.started = False
+            _tracemalloc_users -= 1
+            # Only stop tracing started here, and only once no other profiler uses it
+            if _tracemalloc_users == 0 and _tracemalloc_started:
+                tracemalloc.stop()
+                _tracemalloc_started = False
+
+    def report(self, logger):
+        """
+        Write the profiles next to the log file and log the top functions and allocation sites.
+        """
+        self.stop()
+        combined = None
+        for stage, profiles in sorted(self.profiles.items()):
+            stats = None
+            for profile in profiles:
+                try:
+                    if stats is None:
+                        stats = pstats.Stats(profile)
+                    else:
+                        stats.add(profile)
+                except TypeError:
+                    # A profile that never ran has no data
+                    continue
+            if stats is None:
+                continue
+
+            stats.dump_stats(f"{self.output_prefix}.{stage}.prof")
+            if combined is None:
+                combined = pstats.Stats(f"{self.output_prefix}.{stage}.prof")
+            else:
+                combined.add(f"{self.output_prefix}.{stage}.prof")
+
+            output = io.StringIO()
+            stats.stream = output
+            stats.sort_stats('tottime').print_stats(self.top_n)
+            logger.info(f"Top {self.top_n} functions of stage '{stage}' by own time:\n{trim_stats(output.getvalue())}")
+
+        if combined is not None:
+            combined.dump_stats(f"{self.output_prefix}.prof")
+
+        for stage, totals in sorted(self.allocations.items()):
+            top = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:self.top_n]
+            lines = [f"{size / 1024:10.1f} KiB {count:8d} blocks  {site}" for site, (size, count) in top]
+            logger.info(
+                f"Top {self.top_n} allocation sites of stage '{stage}' (retained at block exit):\n" + '\n'.join(lines)
+            )
+            self.snapshots[stage].dump(f"{self.output_prefix}.{stage}.tracemalloc")
+
+        if self.skipped:
+            logger.info(f"{self.skipped} block(s) overlapped another active profiler and were not profiled")
+        logger.info(f"Profiles written to {os.path.dirname(self.output_prefix) or '.'}")
+
+
+def take_snapshot():
+    """
+    Take a tracemalloc snapshot without the allocations of tracemalloc itself.
+    """
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def trim_stats(text):
+    """
+    Drop the pstats header lines that only repeat the file list.
+    """
+    lines = text.strip().splitlines()
+    for index, line in enumerate(lines):
+        if line.strip().startswith('ncalls'):
+            return '\n'.join(lines[index:])
+    return '\n'.join(lines)
+
+
+@contextmanager
+def no_profile(stage):
+    yield
@@ -2,16 +2,17 @@ import os
 import logging
 
 # Setup logging BEFORE using logger
-def setup_logger(log_path):
+def setup_logger(log_path, logger_name='migration_logger'):
     """
-    Set up a comprehensive logger with both file and console logging
+    Set up a comprehensive logger with both file and console logging.
+    Use a distinct logger_name for migrations that run concurrently.
     """
     # Ensure the directory for the log file exists
     log_dir = os.path.dirname(log_path)
     os.makedirs(log_dir, exist_ok=True)
 
     # Configure logger
-    logger = logging.getLogger('migration_logger')
+    logger = logging.getLogger(logger_name)
     logger.setLevel(logging.INFO)
 
     # Clear any existing handlers to prevent duplicate logs
@@ -34,3 +35,12 @@ def setup_logger(log_path):
     logger.addHandler(file_handler)
 
     return logger
+
+
+def close_logger(logger):
+    """
+    Close and remove the handlers of a logger from setup_logger(), releasing its log file.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
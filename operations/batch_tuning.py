@@ -0,0 +1,127 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+# Batch size hints from previous runs are kept next to the migration logs
+DEFAULT_HINTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'batch_size_hints.json'
+)
+
+_hints_lock = threading.Lock()
+
+
+def load_batch_size_hint(source_table, hints_path=DEFAULT_HINTS_PATH):
+    """
+    Return the batch size hint recorded for a table by an earlier run, or None.
+    """
+    with _hints_lock:
+        if not os.path.exists(hints_path):
+            return None
+        with open(hints_path) as hints_file:
+            hints = json.load(hints_file)
+    hint = hints.get(source_table.lower())
+    return hint['batch_size'] if hint else None
+
+
+def save_batch_size_hint(source_table, batch_size, bytes_per_row=None, hints_path=DEFAULT_HINTS_PATH):
+    """
+    Record the batch size a run settled on so the next run of the table can start from it.
+    """
+    with _hints_lock:
+        hints = {}
+        if os.path.exists(hints_path):
+            with open(hints_path) as hints_file:
+                hints = json.load(hints_file)
+
+        hints[source_table.lower()] = {
+            'batch_size': int(batch_size),
+            'bytes_per_row': int(bytes_per_row) if bytes_per_row else None,
+            'updated_at': datetime.now().isoformat()
+        }
+
+        # Write to a temporary file first so a crash never leaves a truncated file
+        os.makedirs(os.path.dirname(os.path.abspath(hints_path)), exist_ok=True)
+        temp_path = f"{hints_path}.tmp"
+        with open(temp_path, 'w') as hints_file:
+            json.dump(hints, hints_file, indent=2, sort_keys=True)
+        os.replace(temp_path, hints_path)
+
+
+class BatchSizeTuner:
+    """
+    Adjusts the batch size of a partition from measured throughput.
+
+    Fetch and load latency per row and bytes per row are tracked as moving
+    averages. The next batch is sized so that it takes about target_seconds
+    (the sum of both stages, or the slower stage when they overlap in the
+    pipelined mode), changing by at most a factor of two per step, and never
+    larger than what fits in max_batch_bytes.
+    """
+
+    def __init__(
+            self,
+            initial_size=10000,
+            min_size=1000,
+            max_size=1000000,
+            target_seconds=5.0,
+            max_batch_bytes=64 * 1024 * 1024,
+            overlapped=False,
+            logger=None,
+            name=''
+    ):
+        self.batch_size = max(min_size, min(max_size, int(initial_size)))
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_batch_bytes = max_batch_bytes
+        self.overlapped = overlapped
+        self.logger = logger
+        self.name = name
+        self.lock = threading.Lock()
+        self.fetch_seconds_per_row = None
+        self.load_seconds_per_row = None
+        self.bytes_per_row = None
+
+    def current(self):
+        with self.lock:
+            return self.batch_size
+
+    def observe_fetch(self, rows, seconds, batch_bytes):
+        if rows:
+            with self.lock:
+                self.fetch_seconds_per_row = self._average(self.fetch_seconds_per_row, seconds / rows)
+                self.bytes_per_row = self._average(self.bytes_per_row, batch_bytes / rows)
+                self._retune()
+
+    def observe_load(self, rows, seconds):
+        if rows:
+            with self.lock:
+                self.load_seconds_per_row = self._average(self.load_seconds_per_row, seconds / rows)
+                self._retune()
+
+    def _average(self, previous, sample, weight=0.3):
+        return sample if previous is None else previous * (1 - weight) + sample * weight
+
+    def _retune(self):
+        stage_costs = [cost for cost in (self.fetch_seconds_per_row, self.load_seconds_per_row) if cost]
+        if not stage_costs:
+            return
+
+        seconds_per_row = max(stage_costs) if self.overlapped else sum(stage_costs)
+        ideal_size = self.target_seconds / seconds_per_row
+
+        # Move gradually towards the ideal size
+        new_size = max(self.batch_size / 2, min(self.batch_size * 2, ideal_size))
+        if self.bytes_per_row:
+            new_size = min(new_size, self.max_batch_bytes / self.bytes_per_row)
+        new_size = int(max(self.min_size, min(self.max_size, new_size)))
+
+        # Ignore small adjustments to avoid jitter
+        if abs(new_size - self.batch_size) >= self.batch_size * 0.1:
+            if self.logger:
+                self.logger.info(
+                    f"Batch size{' for ' + self.name if self.name else ''}: {self.batch_size} -> {new_size} "
+                    f"({seconds_per_row * 1000000:.1f} us/row, {self.bytes_per_row or 0:.0f} bytes/row)"
+                )
+            self.batch_size = new_size
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from config.connection_pool import pooled_connection
+
+# Catalog results are kept next to the migration logs
+DEFAULT_CATALOG_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'catalog_cache.json'
+)
+
+# Seconds a cached catalog result is served before it is queried again
+DEFAULT_CATALOG_TTL = int(os.getenv('CATALOG_CACHE_TTL', 3600))
+
+# Seconds after which a cache file lock is taken to be left by a crashed process
+CACHE_LOCK_STALE_SECONDS = 30
+
+# Environment variables identifying the account a system's catalog is read from
+SYSTEM_ENV = {
+    'teradata': ('TERADATA_HOST', 'TERADATA_USER'),
+    'snowflake': ('SNOWFLAKE_ACCOUNT', 'SNOWFLAKE_USER'),
+    'sql_server': ('SQL_SERVER_HOST', 'SQL_SERVER_DATABASE', 'SQL_SERVER_USER')
+}
+
+
+def catalog_scope(system):
+    """
+    Return the cache namespace of a system: its name plus the host and user of
+    the configured connection, since another account sees another catalog.
+    """
+    return ':'.join([system] + [os.getenv(name) or '' for name in SYSTEM_ENV.get(system, ())])
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold <path>.lock, created exclusively, for a with block, so processes
+    sharing a file update it one at a time. A lock older than
+    CACHE_LOCK_STALE_SECONDS is broken.
+    """
+    lock_path = f"{path}.lock"
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+    while True:
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > CACHE_LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                # Released in the meantime
+                continue
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(lock_fd)
+        os.remove(lock_path)
+
+
+class CatalogCache:
+    """
+    Catalog query results per system with a TTL, persisted as JSON so later
+    runs are served locally.
+
+    Entries are read from disk on first use. New entries are merged into the
+    file under a lock file (re-read, merged, rewritten atomically, dropping
+    expired entries), so concurrent runs do not lose each other's results;
+    inside batch() they are written once when the outermost batch ends
+    instead of on every put. Values are stored as JSON: dates, timestamps and
+    decimals come back as strings. invalidate() drops entries after DDL that
+    changes what the catalog would return.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_CACHE_PATH, ttl=DEFAULT_CATALOG_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = None
+        self.pending = {}
+        self.batch_depth = 0
+        self.lock = threading.RLock()
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except ValueError:
+            # A corrupt cache is only a cache
+            return {}
+
+    def _write_file(self, entries):
+        now = time.time()
+        entries = {
+            scope: {key: entry for key, entry in keys.items() if now - entry['cached_at'] < self.ttl}
+            for scope, keys in entries.items()
+        }
+        entries = {scope: keys for scope, keys in entries.items() if keys}
+
+        # Write to a temporary file first so a crash never leaves a truncated file
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(entries, cache_file, default=str)
+        os.replace(temp_path, self.path)
+        self.entries = entries
+
+    def get(self, system, key, ttl=None):
+        """
+        Return the cached value of key, or None if it is missing or older than ttl seconds.
+        """
+        with self.lock:
+            if self.entries is None:
+                self.entries = self._read_file()
+            entry = self.entries.get(catalog_scope(system), {}).get(key)
+        if entry is None or time.time() - entry['cached_at'] >= (self.ttl if ttl is None else ttl):
+            return None
+        return entry['value']
+
+    def put(self, system, key, value):
+        """
+        Cache value under key and return it as it will be read back from disk.
+        """
+        value = json.loads(json.dumps(value, default=str))
+        entry = {'value': value, 'cached_at': time.time()}
+        scope = catalog_scope(system)
+        with self.lock:
+            if self.entries is None:
+                self.entries = self._read_file()
+            self.entries.setdefault(scope, {})[key] = entry
+            self.pending.setdefault(scope, {})[key] = entry
+            if not self.batch_depth:
+                self.flush()
+        return value
+
+    @contextmanager
+    def batch(self):
+        """
+        Defer writing new entries until the outermost batch ends, so a cold
+        run caching many results (from any thread) rewrites the file once.
+        """
+        with self.lock:
+            self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.batch_depth -= 1
+                if not self.batch_depth:
+                    self.flush()
+
+    def flush(self):
+        """
+        Merge the entries put since the last flush into the file.
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            with file_lock(self.path):
+                entries = self._read_file()
+                for scope, keys in self.pending.items():
+                    entries.setdefault(scope, {}).update(keys)
+                self._write_file(entries)
+            self.pending = {}
+
+    def get_or_load(self, system, key, loader, ttl=None, refresh=False):
+        """
+        Return the cached value of key, calling loader() and caching its result
+        when it is missing, expired or refresh is set. Errors are not cached.
+        """
+        if not refresh:
+            value = self.get(system, key, ttl)
+            if value is not None:
+                return value
+        return self.put(system, key, loader())
+
+    def invalidate(self, system=None, key_prefix=''):
+        """
+        Drop the entries of a system whose key starts with key_prefix (all of
+        the system's entries by default, every system's when system is None).
+        Returns the number of entries dropped.
+        """
+        with self.lock, file_lock(self.path):
+            entries = self._read_file()
+            for scope, keys in self.pending.items():
+                entries.setdefault(scope, {}).update(keys)
+            self.pending = {}
+            scopes = [catalog_scope(system)] if system else list(entries)
+            dropped = 0
+            for scope in scopes:
+                keys = entries.get(scope, {})
+                for key in [key for key in keys if key.startswith(key_prefix)]:
+                    del keys[key]
+                    dropped += 1
+            self._write_file(entries)
+        return dropped
+
+
+_catalog_cache = None
+_catalog_cache_lock = threading.Lock()
+
+
+def get_catalog_cache():
+    """
+    Return the shared catalog cache at DEFAULT_CATALOG_CACHE_PATH.
+    """
+    global _catalog_cache
+    with _catalog_cache_lock:
+        if _catalog_cache is None:
+            _catalog_cache = CatalogCache()
+        return _catalog_cache
+
+
+def cached_catalog_query(system, key, factory, query, setup=(), refresh=False):
+    """
+    Run a catalog query on a pooled connection of factory through the catalog
+    cache. setup statements (e.g. USE [db]) run first on the same connection.
+    Returns (column names, rows as lists).
+    """
+    def load():
+        with pooled_connection(factory) as conn:
+            cursor = conn.cursor()
+            try:
+                for statement in setup:
+                    cursor.execute(statement)
+                cursor.execute(query)
+                columns = [column[0] for column in cursor.description]
+                return {'columns': columns, 'rows': [list(row) for row in cursor.fetchall()]}
+            finally:
+                cursor.close()
+
+    result = get_catalog_cache().get_or_load(system, key, load, refresh=refresh)
+    return result['columns'], result['rows']
+
+
+def parse_args():
+    """
+    Parse command line arguments for catalog cache maintenance
+    """
+    parser = argparse.ArgumentParser(description="Invalidate cached catalog results, e.g. after DDL")
+    parser.add_argument('--system', choices=sorted(SYSTEM_ENV), help="Only this system (default: all)")
+    parser.add_argument('--key-prefix', default='', help="Only keys starting with this, e.g. 'tables'")
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    dropped_entries = get_catalog_cache().invalidate(args.system, args.key_prefix)
+    print(f"Dropped {dropped_entries} cached catalog result(s) from {DEFAULT_CATALOG_CACHE_PATH}")
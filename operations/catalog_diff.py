@@ -0,0 +1,366 @@
+import os
+import json
+import argparse
+from tabulate import tabulate
+from config.snowflake import get_snowflake_connection
+from config.connection_pool import pooled_connection
+from operations.catalog_cache import get_catalog_cache
+from operations.catalog_snapshot import take_catalog_snapshot
+
+# Roles every Snowflake account has; never reported as extra
+SNOWFLAKE_SYSTEM_ROLES = {'ACCOUNTADMIN', 'ORGADMIN', 'SECURITYADMIN', 'SYSADMIN', 'USERADMIN', 'PUBLIC'}
+
+# Privileges that exist on Snowflake tables, after mapping source privilege names
+SNOWFLAKE_TABLE_PRIVILEGES = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'TRUNCATE', 'REFERENCES', 'OWNERSHIP'}
+
+# Source privilege names that differ in Snowflake
+PRIVILEGE_MAP = {'CONTROL': 'OWNERSHIP'}
+
+# Source type names by Snowflake type family, for comparing and creating columns
+TYPE_FAMILIES = {
+    'NUMBER': {'BYTEINT', 'TINYINT', 'SMALLINT', 'INTEGER', 'INT', 'BIGINT', 'DECIMAL', 'NUMERIC', 'NUMBER',
+               'MONEY', 'SMALLMONEY'},
+    'FLOAT': {'FLOAT', 'REAL', 'DOUBLE', 'DOUBLE PRECISION'},
+    'TEXT': {'CHAR', 'VARCHAR', 'NCHAR', 'NVARCHAR', 'TEXT', 'NTEXT', 'CLOB', 'STRING', 'UNIQUEIDENTIFIER',
+             'XML', 'SYSNAME'},
+    'BINARY': {'BYTE', 'VARBYTE', 'BLOB', 'BINARY', 'VARBINARY', 'IMAGE'},
+    'BOOLEAN': {'BIT', 'BOOLEAN'},
+    'DATE': {'DATE'},
+    'TIME': {'TIME', 'TIME WITH TIME ZONE'},
+    'TIMESTAMP': {'TIMESTAMP', 'DATETIME', 'DATETIME2', 'SMALLDATETIME', 'TIMESTAMP_NTZ', 'TIMESTAMP_LTZ',
+                  'TIMESTAMP_TZ', 'TIMESTAMP WITH TIME ZONE', 'DATETIMEOFFSET'},
+    'VARIANT': {'JSON', 'VARIANT', 'OBJECT', 'ARRAY'}
+}
+TYPE_FAMILY_BY_NAME = {name: family for family, names in TYPE_FAMILIES.items() for name in names}
+
+
+def normalize_identifier(name):
+    """
+    Normalize an identifier for comparison across systems: trimmed, without
+    [brackets] or "quotes", upper case like unquoted Snowflake identifiers.
+    """
+    if name is None:
+        return None
+    name = name.strip()
+    if len(name) > 1 and (name[0], name[-1]) in (('[', ']'), ('"', '"')):
+        name = name[1:-1]
+    return name.upper()
+
+
+def type_family(column_type):
+    """
+    Return the Snowflake type family of a column type name of any of the systems.
+    """
+    name = (column_type or '').strip().upper().split('(')[0]
+    return TYPE_FAMILY_BY_NAME.get(name, name)
+
+
+def snowflake_column_type(column):
+    """
+    Return the Snowflake type of a source column of a catalog snapshot.
+    """
+    family = type_family(column['type'])
+    if family == 'NUMBER':
+        if column['precision']:
+            return f"NUMBER({column['precision']}, {column['scale'] or 0})"
+        return 'NUMBER(38, 0)'
+    if family == 'TEXT':
+        length = column['length']
+        if column['type'].upper() in ('NCHAR', 'NVARCHAR') and length and length > 0:
+            # sys.columns reports bytes, two per character
+            length //= 2
+        return f"VARCHAR({length})" if length and length > 0 else 'VARCHAR'
+    if family == 'TIMESTAMP':
+        return 'TIMESTAMP_NTZ'
+    if family in ('FLOAT', 'BINARY', 'BOOLEAN', 'DATE', 'TIME', 'VARIANT'):
+        return family
+    return 'VARIANT'
+
+
+def quote_name(*names):
+    return '.'.join(f'"{name}"' for name in names if name)
+
+
+def target_location(source, table, target_database, target_schema=None):
+    """
+    Return the normalized (database, schema) a source table migrates to.
+    Teradata databases become schemas of target_database, as in
+    migrate_database; SQL Server keeps its database and schema unless
+    target_database or target_schema override them.
+    """
+    if source.system == 'teradata':
+        return normalize_identifier(target_database), normalize_identifier(target_schema or table['database'])
+    return (
+        normalize_identifier(target_database or table['database']),
+        normalize_identifier(target_schema or table['schema'])
+    )
+
+
+def diff_catalogs(source, target, target_database=None, target_schema=None):
+    """
+    Compare a source catalog snapshot (Teradata or SQL Server) with a
+    Snowflake snapshot after normalizing identifiers.
+
+    Tables are matched by their target location (see target_location) and
+    compared by their columns' names and type families. Only schemas that
+    source tables map to are searched for extra tables. Roles and users are
+    compared by name, and table grants and role memberships by grantee,
+    privilege and object. Extra objects are reported but never dropped.
+
+    Returns {'tables', 'roles', 'users', 'grants'} with the missing, extra
+    and changed objects of each, and 'work', the minimal list of actions
+    that makes the target match the source (see work_list).
+    """
+    target_database = target_database or os.getenv('SNOWFLAKE_DATABASE')
+    if source.system == 'teradata' and not target_database:
+        raise ValueError("A Snowflake target database is required to diff a Teradata catalog (SNOWFLAKE_DATABASE).")
+
+    # Index both sides by normalized target coordinates; set operations on the keys do the diff
+    source_tables = {}
+    for table in source.tables.values():
+        if table['kind'] == 'TABLE':
+            database, schema = target_location(source, table, target_database, target_schema)
+            source_tables[(database, schema, normalize_identifier(table['name']))] = table
+    locations = {key[:2] for key in source_tables}
+    target_tables = {
+        key: table for key, table in (
+            ((normalize_identifier(table['database']), normalize_identifier(table['schema']),
+              normalize_identifier(table['name'])), table)
+            for table in target.tables.values() if table['kind'] == 'TABLE'
+        ) if key[:2] in locations
+    }
+
+    changed_tables = []
+    for key in source_tables.keys() & target_tables.keys():
+        source_columns = {normalize_identifier(column['name']): column for column in source_tables[key]['columns']}
+        target_columns = {normalize_identifier(column['name']): column for column in target_tables[key]['columns']}
+        source_signature = {(name, type_family(column['type'])) for name, column in source_columns.items()}
+        target_signature = {(name, type_family(column['type'])) for name, column in target_columns.items()}
+        source_rows = source_tables[key]['row_count']
+        target_rows = target_tables[key]['row_count']
+        rows_differ = source_rows is not None and target_rows is not None and source_rows != target_rows
+        if source_signature == target_signature and not rows_differ and target_rows != 0:
+            continue
+        changed_tables.append({
+            'key': key,
+            'source': source_tables[key],
+            'missing_columns': [source_columns[name] for name in sorted(source_columns.keys() - target_columns.keys())],
+            'extra_columns': sorted(target_columns.keys() - source_columns.keys()),
+            'changed_columns': sorted(
+                name for name in source_columns.keys() & target_columns.keys()
+                if type_family(source_columns[name]['type']) != type_family(target_columns[name]['type'])
+            ),
+            'source_rows': source_rows,
+            'target_rows': target_rows
+        })
+
+    source_roles = {normalize_identifier(role): role for role in source.roles.values()}
+    target_roles = {normalize_identifier(role) for role in target.roles.values()}
+    source_users = {normalize_identifier(user): user for user in source.users.values()}
+    target_users = {normalize_identifier(user) for user in target.users.values()}
+
+    source_grants, unmapped_grants = normalize_grants(source, target_database, target_schema, source_tables)
+    target_grants, _ = normalize_grants(target)
+
+    diff = {
+        'tables': {
+            'missing': [
+                {'key': key, 'source': source_tables[key]}
+                for key in sorted(source_tables.keys() - target_tables.keys())
+            ],
+            'extra': sorted(target_tables.keys() - source_tables.keys()),
+            'changed': sorted(changed_tables, key=lambda entry: entry['key'])
+        },
+        'roles': {
+            'missing': sorted(source_roles.keys() - target_roles),
+            'extra': sorted(target_roles - source_roles.keys() - SNOWFLAKE_SYSTEM_ROLES)
+        },
+        'users': {
+            'missing': sorted(source_users.keys() - target_users),
+            'extra': sorted(target_users - source_users.keys())
+        },
+        'grants': {
+            'missing': sorted(source_grants - target_grants, key=str),
+            'extra': sorted(target_grants - source_grants, key=str),
+            'unmapped': unmapped_grants
+        }
+    }
+    diff['work'] = work_list(diff)
+    return diff
+
+
+def normalize_grants(snapshot, target_database=None, target_schema=None, source_tables=None):
+    """
+    Return the table grants and role memberships of a snapshot as a set of
+    normalized (grantee, grantee_type, privilege, object_type, database,
+    schema, object) tuples, in target coordinates for a source snapshot,
+    plus the number of grants that have no Snowflake counterpart.
+    """
+    grants = set()
+    unmapped = 0
+    for grant in snapshot.grants:
+        grantee = normalize_identifier(grant['grantee'])
+        if grant['object_type'] == 'ROLE':
+            grants.add((grantee, grant['grantee_type'], 'USAGE', 'ROLE', None, None,
+                        normalize_identifier(grant['object'])))
+            continue
+
+        privilege = PRIVILEGE_MAP.get(grant['privilege'].upper(), grant['privilege'].upper())
+        if grant['object_type'] not in ('TABLE', 'VIEW') or grant['state'] != 'GRANT' \
+                or privilege not in SNOWFLAKE_TABLE_PRIVILEGES:
+            unmapped += 1
+            continue
+
+        if source_tables is None:
+            database, schema = normalize_identifier(grant['database']), normalize_identifier(grant['schema'])
+        else:
+            table = {'database': grant['database'], 'schema': grant['schema']}
+            database, schema = target_location(snapshot, table, target_database, target_schema)
+        grants.add((grantee, grant['grantee_type'], privilege, 'TABLE', database, schema,
+                    normalize_identifier(grant['object'])))
+    return grants, unmapped
+
+
+def work_list(diff):
+    """
+    Turn a diff into the actions that apply it, in dependency order: roles,
+    then tables and columns, then data, then grants. Every action has an
+    'action' and a 'statement' to run on Snowflake, except migrate_table
+    and sync_table, which name the source and target tables for
+    migrate_database / migration_table and sync_table.
+    """
+    work = []
+    for role in diff['roles']['missing']:
+        work.append({'action': 'create_role', 'role': role, 'statement': f"CREATE ROLE IF NOT EXISTS {quote_name(role)}"})
+
+    def source_name(table):
+        return f"{table['database']}.{table['schema']}.{table['name']}" if table['schema'] \
+            else f"{table['database']}.{table['name']}"
+
+    for entry in diff['tables']['missing']:
+        table = entry['source']
+        columns = ', '.join(
+            f"{quote_name(normalize_identifier(column['name']))} {snowflake_column_type(column)}"
+            f"{'' if column['nullable'] else ' NOT NULL'}"
+            for column in sorted(table['columns'], key=lambda column: column['position'] or 0)
+        )
+        work.append({
+            'action': 'create_table',
+            'target_table': '.'.join(entry['key']),
+            'statement': f"CREATE TABLE IF NOT EXISTS {quote_name(*entry['key'])} ({columns})"
+        })
+
+    for entry in diff['tables']['changed']:
+        for column in entry['missing_columns']:
+            work.append({
+                'action': 'add_column',
+                'target_table': '.'.join(entry['key']),
+                'column': normalize_identifier(column['name']),
+                'statement': f"ALTER TABLE {quote_name(*entry['key'])} ADD COLUMN "
+                             f"{quote_name(normalize_identifier(column['name']))} {snowflake_column_type(column)}"
+            })
+
+    for entry in diff['tables']['missing']:
+        work.append({
+            'action': 'migrate_table', 'source_table': source_name(entry['source']),
+            'target_table': '.'.join(entry['key'])
+        })
+    for entry in diff['tables']['changed']:
+        if entry['target_rows'] == 0:
+            action = 'migrate_table'
+        elif entry['source_rows'] is not None and entry['source_rows'] != entry['target_rows']:
+            action = 'sync_table'
+        else:
+            continue
+        work.append({'action': action, 'source_table': source_name(entry['source']), 'target_table': '.'.join(entry['key'])})
+
+    for grantee, grantee_type, privilege, object_type, database, schema, name in diff['grants']['missing']:
+        if object_type == 'ROLE':
+            statement = f"GRANT ROLE {quote_name(name)} TO {grantee_type} {quote_name(grantee)}"
+        else:
+            statement = f"GRANT {privilege} ON TABLE {quote_name(database, schema, name)} TO {grantee_type} {quote_name(grantee)}"
+        work.append({'action': 'grant', 'grantee': grantee, 'statement': statement})
+    return work
+
+
+def apply_work_list(work, actions=('create_role', 'create_table', 'add_column', 'grant')):
+    """
+    Run the statements of the given actions of a work list on Snowflake, in
+    order, and drop the cached Snowflake catalog afterwards.
+    Returns the number of statements run.
+    """
+    statements = [item['statement'] for item in work if item['action'] in actions and item.get('statement')]
+    try:
+        with pooled_connection(get_snowflake_connection) as conn:
+            cursor = conn.cursor()
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+            finally:
+                cursor.close()
+    finally:
+        get_catalog_cache().invalidate('snowflake')
+    return len(statements)
+
+
+def compare_catalogs(source_system, source_databases=None, target_database=None, target_schema=None, refresh=True):
+    """
+    Snapshot a source system and the Snowflake target database and diff them.
+    Snapshots are read fresh unless refresh is False.
+    """
+    target_database = target_database or os.getenv('SNOWFLAKE_DATABASE')
+    source = take_catalog_snapshot(source_system, source_databases, refresh=refresh)
+    target = take_catalog_snapshot('snowflake', [target_database] if target_database else None, refresh=refresh)
+    return diff_catalogs(source, target, target_database, target_schema)
+
+
+def format_diff_summary(diff):
+    """
+    Format the number of missing, extra and changed objects of a diff as a table.
+    """
+    rows = [
+        [kind, len(diff[kind]['missing']), len(diff[kind]['extra']), len(diff[kind].get('changed', []))]
+        for kind in ('tables', 'roles', 'users', 'grants')
+    ]
+    return tabulate(rows, headers=["Objects", "Missing", "Extra", "Changed"], tablefmt="grid")
+
+
+def parse_args():
+    """
+    Parse command line arguments for a catalog diff
+    """
+    parser = argparse.ArgumentParser(description="Compare a source catalog with Snowflake and list the work left")
+    parser.add_argument('--source', required=True, choices=['teradata', 'sql_server'])
+    parser.add_argument('--source-databases', help="Comma separated source databases (default: all)")
+    parser.add_argument('--target-database', help="Snowflake database (default: SNOWFLAKE_DATABASE)")
+    parser.add_argument('--target-schema', help="Snowflake schema for all source tables")
+    parser.add_argument('--cached', action='store_true', help="Use cached snapshots instead of reading them fresh")
+    parser.add_argument('--output', help="Write the work list to this file as JSON lines")
+    parser.add_argument('--apply', action='store_true',
+                        help="Create missing roles, tables and columns and issue missing grants")
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    catalog_diff = compare_catalogs(
+        args.source,
+        source_databases=[name.strip() for name in args.source_databases.split(',')] if args.source_databases else None,
+        target_database=args.target_database,
+        target_schema=args.target_schema,
+        refresh=not args.cached
+    )
+    print(format_diff_summary(catalog_diff))
+    print(tabulate(
+        [[item['action'], item.get('statement') or f"{item['source_table']} -> {item['target_table']}"]
+         for item in catalog_diff['work']],
+        headers=["Action", "Work"], tablefmt="grid"
+    ))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            for work_item in catalog_diff['work']:
+                output_file.write(json.dumps(work_item, default=str) + '\n')
+    if args.apply:
+        print(f"Ran {apply_work_list(catalog_diff['work'])} statement(s) on Snowflake")
@@ -0,0 +1,550 @@
+import time
+import argparse
+from tabulate import tabulate
+from config.teradata import get_teradata_connection
+from config.sql_server import get_sql_server_connection
+from config.snowflake import get_snowflake_connection
+from config.connection_pool import pooled_connection
+from operations.catalog_cache import get_catalog_cache
+
+# Rows fetched per round trip while reading a catalog query
+CATALOG_FETCH_SIZE = 10000
+
+# Teradata DBC.ColumnsV type codes
+TERADATA_TYPES = {
+    'I1': 'BYTEINT', 'I2': 'SMALLINT', 'I': 'INTEGER', 'I8': 'BIGINT', 'D': 'DECIMAL', 'N': 'NUMBER',
+    'F': 'FLOAT', 'CF': 'CHAR', 'CV': 'VARCHAR', 'CO': 'CLOB', 'BF': 'BYTE', 'BV': 'VARBYTE', 'BO': 'BLOB',
+    'DA': 'DATE', 'AT': 'TIME', 'TS': 'TIMESTAMP', 'TZ': 'TIME WITH TIME ZONE',
+    'SZ': 'TIMESTAMP WITH TIME ZONE', 'JN': 'JSON', 'XM': 'XML', 'PD': 'PERIOD(DATE)'
+}
+
+# Teradata DBC.AllRoleRightsV access right codes
+TERADATA_RIGHTS = {
+    'R': 'SELECT', 'I': 'INSERT', 'U': 'UPDATE', 'D': 'DELETE', 'E': 'EXECUTE', 'EF': 'EXECUTE FUNCTION',
+    'PE': 'EXECUTE PROCEDURE', 'CT': 'CREATE TABLE', 'DT': 'DROP TABLE', 'CV': 'CREATE VIEW',
+    'DV': 'DROP VIEW', 'CM': 'CREATE MACRO', 'DM': 'DROP MACRO', 'PC': 'CREATE PROCEDURE',
+    'PD': 'DROP PROCEDURE', 'RF': 'REFERENCES', 'ST': 'STATISTICS', 'IX': 'INDEX', 'DG': 'DUMP',
+    'RS': 'RESTORE'
+}
+
+# Teradata TableKind values kept in a snapshot
+TERADATA_TABLE_KINDS = {'T': 'TABLE', 'O': 'TABLE', 'V': 'VIEW'}
+
+# SQL Server databases left out unless asked for: master, tempdb, model and msdb
+SQL_SERVER_SYSTEM_DATABASE_IDS = 4
+
+
+def catalog_key(*names):
+    """
+    Index key of a catalog object: its names upper cased, since all three
+    systems resolve unquoted identifiers case-insensitively.
+    """
+    return tuple((name or '').upper() for name in names)
+
+
+def strip_name(value):
+    # DBC views return CHAR columns padded with spaces
+    return value.strip() if isinstance(value, str) else value
+
+
+def as_int(value):
+    # Catalog sizes and lengths may come back as decimals
+    return int(value) if value is not None else None
+
+
+def sql_in(names):
+    """
+    Format names as a SQL IN list of string literals.
+    """
+    return "IN ({})".format(', '.join("'{}'".format(name.replace("'", "''")) for name in names))
+
+
+class CatalogSnapshot:
+    """
+    Databases, schemas, tables with their columns and sizes, roles, users and
+    grants of a system, read in a few set-based catalog queries and indexed
+    for lookups.
+
+    Lookups are case-insensitive. Teradata has no schemas, so its tables have
+    schema None. A table is a dict with database, schema, name, kind,
+    size_bytes, row_count (None where the catalog has no count) and columns,
+    a list of dicts with name, type, length, precision, scale, nullable and
+    position. A grant is a dict with grantee, grantee_type (ROLE or USER),
+    privilege, state (GRANT or DENY), object_type, database, schema and
+    object; a role granted to a grantee is a USAGE grant on object_type ROLE.
+    """
+
+    def __init__(self, system, taken_at=None):
+        self.system = system
+        self.taken_at = taken_at or time.time()
+        self.databases = {}
+        self.schemas = {}
+        self.tables = {}
+        self.roles = {}
+        self.users = {}
+        self.grants = []
+        self.tables_by_database = {}
+        self.grants_by_grantee = {}
+
+    def add_database(self, database):
+        self.databases.setdefault(catalog_key(database), database)
+
+    def add_schema(self, database, schema):
+        self.add_database(database)
+        if schema is not None:
+            self.schemas.setdefault(catalog_key(database, schema), (database, schema))
+
+    def add_table(self, database, schema, name, kind='TABLE'):
+        key = catalog_key(database, schema, name)
+        if key not in self.tables:
+            self.add_schema(database, schema)
+            self.tables[key] = {
+                'database': database, 'schema': schema, 'name': name, 'kind': kind,
+                'size_bytes': None, 'row_count': None, 'columns': []
+            }
+            self.tables_by_database.setdefault(catalog_key(database), []).append(key)
+        return self.tables[key]
+
+    def add_column(self, database, schema, table, name, column_type, length=None, precision=None,
+                   scale=None, nullable=True, position=None):
+        """
+        Add a column to a table of the snapshot; columns of other objects are ignored.
+        """
+        entry = self.tables.get(catalog_key(database, schema, table))
+        if entry is not None:
+            entry['columns'].append({
+                'name': name, 'type': column_type, 'length': as_int(length), 'precision': as_int(precision),
+                'scale': as_int(scale), 'nullable': nullable, 'position': as_int(position)
+            })
+
+    def set_size(self, database, schema, table, size_bytes, row_count=None):
+        entry = self.tables.get(catalog_key(database, schema, table))
+        if entry is not None:
+            entry['size_bytes'] = as_int(size_bytes)
+            entry['row_count'] = as_int(row_count)
+
+    def add_role(self, role):
+        self.roles.setdefault(catalog_key(role), role)
+
+    def add_user(self, user):
+        self.users.setdefault(catalog_key(user), user)
+
+    def add_grant(self, grantee, grantee_type, privilege, object_type, database=None, schema=None,
+                  object_name=None, state='GRANT'):
+        grant = {
+            'grantee': grantee, 'grantee_type': grantee_type, 'privilege': privilege, 'state': state,
+            'object_type': object_type, 'database': database, 'schema': schema, 'object': object_name
+        }
+        self.grants.append(grant)
+        self.grants_by_grantee.setdefault(catalog_key(grantee), []).append(grant)
+
+    def table(self, database, schema, name):
+        """
+        Return the table dict of database.schema.name, or None.
+        """
+        return self.tables.get(catalog_key(database, schema, name))
+
+    def tables_in(self, database, schema=None):
+        """
+        Return the table dicts of a database, or of one of its schemas.
+        """
+        tables = [self.tables[key] for key in self.tables_by_database.get(catalog_key(database), [])]
+        if schema is not None:
+            tables = [table for table in tables if catalog_key(table['schema']) == catalog_key(schema)]
+        return tables
+
+    def columns(self, database, schema, name):
+        table = self.table(database, schema, name)
+        return table['columns'] if table else []
+
+    def grants_to(self, grantee):
+        return self.grants_by_grantee.get(catalog_key(grantee), [])
+
+    def summary(self):
+        """
+        Return the number of objects of each kind.
+        """
+        return {
+            'databases': len(self.databases),
+            'schemas': len(self.schemas),
+            'tables': len(self.tables),
+            'columns': sum(len(table['columns']) for table in self.tables.values()),
+            'bytes': sum(table['size_bytes'] or 0 for table in self.tables.values()),
+            'roles': len(self.roles),
+            'users': len(self.users),
+            'grants': len(self.grants)
+        }
+
+    def to_dict(self):
+        """
+        Return the snapshot as JSON-serializable data; see from_dict().
+        """
+        return {
+            'system': self.system,
+            'taken_at': self.taken_at,
+            'databases': sorted(self.databases.values()),
+            'schemas': sorted(list(schema) for schema in self.schemas.values()),
+            'tables': list(self.tables.values()),
+            'roles': sorted(self.roles.values()),
+            'users': sorted(self.users.values()),
+            'grants': self.grants
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        snapshot = cls(data['system'], data['taken_at'])
+        for database in data['databases']:
+            snapshot.add_database(database)
+        for database, schema in data['schemas']:
+            snapshot.add_schema(database, schema)
+        for table in data['tables']:
+            entry = snapshot.add_table(table['database'], table['schema'], table['name'], table['kind'])
+            entry.update(size_bytes=table['size_bytes'], row_count=table['row_count'], columns=table['columns'])
+        for role in data['roles']:
+            snapshot.add_role(role)
+        for user in data['users']:
+            snapshot.add_user(user)
+        for grant in data['grants']:
+            snapshot.add_grant(
+                grant['grantee'], grant['grantee_type'], grant['privilege'], grant['object_type'],
+                grant['database'], grant['schema'], grant['object'], grant['state']
+            )
+        return snapshot
+
+
+def fetch_rows(cursor, query):
+    """
+    Run a catalog query and yield its rows, CATALOG_FETCH_SIZE at a time.
+    """
+    cursor.execute(query)
+    while True:
+        rows = cursor.fetchmany(CATALOG_FETCH_SIZE)
+        if not rows:
+            return
+        for row in rows:
+            yield tuple(strip_name(value) for value in row)
+
+
+def snapshot_teradata(databases=None):
+    """
+    Read a catalog snapshot of Teradata from the DBC views, optionally limited to some databases.
+    Grants are the rights granted to roles and the roles granted to users and roles.
+    """
+    database_filter = f"DatabaseName {sql_in(databases)}" if databases else "1 = 1"
+    snapshot = CatalogSnapshot('teradata')
+    with pooled_connection(get_teradata_connection) as conn:
+        cursor = conn.cursor()
+        try:
+            for (database,) in fetch_rows(cursor, f"SELECT DatabaseName FROM DBC.DatabasesV WHERE {database_filter}"):
+                snapshot.add_database(database)
+
+            query = f"""
+            SELECT DatabaseName, TableName, TableKind
+            FROM DBC.TablesV
+            WHERE TableKind {sql_in(TERADATA_TABLE_KINDS)} AND {database_filter}
+            """
+            for database, table, kind in fetch_rows(cursor, query):
+                snapshot.add_table(database, None, table, TERADATA_TABLE_KINDS[kind])
+
+            query = f"""
+            SELECT DatabaseName, TableName, ColumnName, ColumnType, ColumnLength,
+                   DecimalTotalDigits, DecimalFractionalDigits, Nullable, ColumnId
+            FROM DBC.ColumnsV
+            WHERE {database_filter}
+            ORDER BY DatabaseName, TableName, ColumnId
+            """
+            for database, table, column, column_type, length, precision, scale, nullable, position \
+                    in fetch_rows(cursor, query):
+                snapshot.add_column(
+                    database, None, table, column, TERADATA_TYPES.get(column_type, column_type),
+                    length, precision, scale, nullable == 'Y', position
+                )
+
+            query = f"""
+            SELECT DatabaseName, TableName, SUM(CurrentPerm)
+            FROM DBC.TableSizeV
+            WHERE {database_filter}
+            GROUP BY DatabaseName, TableName
+            """
+            for database, table, size in fetch_rows(cursor, query):
+                snapshot.set_size(database, None, table, size)
+
+            for (role,) in fetch_rows(cursor, "SELECT RoleName FROM DBC.RolesV"):
+                snapshot.add_role(role)
+            for (user,) in fetch_rows(cursor, "SELECT UserName FROM DBC.UsersV"):
+                snapshot.add_user(user)
+
+            query = f"""
+            SELECT RoleName, DatabaseName, TableName, AccessRight
+            FROM DBC.AllRoleRightsV
+            WHERE {database_filter}
+            """
+            for role, database, table, right in fetch_rows(cursor, query):
+                on_database = table == 'All'
+                snapshot.add_grant(
+                    role, 'ROLE', TERADATA_RIGHTS.get(right, right), 'DATABASE' if on_database else 'TABLE',
+                    database, None, None if on_database else table
+                )
+
+            for role, grantee in fetch_rows(cursor, "SELECT RoleName, Grantee FROM DBC.RoleMembersV"):
+                grantee_type = 'ROLE' if catalog_key(grantee) in snapshot.roles else 'USER'
+                snapshot.add_grant(grantee, grantee_type, 'USAGE', 'ROLE', object_name=role)
+        finally:
+            cursor.close()
+    return snapshot
+
+
+def sql_server_union(databases, template):
+    """
+    Build one UNION ALL query running template once per database, with {db}
+    replaced by the database name, so all databases are read in one round trip
+    without switching databases.
+    """
+    return "\nUNION ALL\n".join(
+        template.format(db=database.replace(']', ']]'), name=database.replace("'", "''"))
+        for database in databases
+    )
+
+
+def snapshot_sql_server(databases=None):
+    """
+    Read a catalog snapshot of SQL Server from the sys views of every user
+    database (or of the given databases) through three-part names.
+    Users are database users; grants are database permissions and role memberships.
+    """
+    snapshot = CatalogSnapshot('sql_server')
+    with pooled_connection(get_sql_server_connection) as conn:
+        cursor = conn.cursor()
+        try:
+            database_filter = f"name {sql_in(databases)}" if databases \
+                else f"database_id > {SQL_SERVER_SYSTEM_DATABASE_IDS}"
+            query = f"""
+            SELECT name FROM sys.databases
+            WHERE {database_filter} AND state = 0 AND HAS_DBACCESS(name) = 1
+            ORDER BY name
+            """
+            names = [database for (database,) in fetch_rows(cursor, query)]
+            for database in names:
+                snapshot.add_database(database)
+            if not names:
+                return snapshot
+
+            for database, schema in fetch_rows(cursor, sql_server_union(names, """
+            SELECT '{name}', s.name
+            FROM [{db}].sys.schemas s
+            WHERE s.schema_id < 16384 AND s.name NOT IN ('sys', 'INFORMATION_SCHEMA', 'guest')
+            """)):
+                snapshot.add_schema(database, schema)
+
+            for database, schema, table, kind in fetch_rows(cursor, sql_server_union(names, """
+            SELECT '{name}', s.name, o.name, CASE o.type WHEN 'V' THEN 'VIEW' ELSE 'TABLE' END
+            FROM [{db}].sys.objects o
+            JOIN [{db}].sys.schemas s ON s.schema_id = o.schema_id
+            WHERE o.type IN ('U', 'V') AND o.is_ms_shipped = 0
+            """)):
+                snapshot.add_table(database, schema, table, kind)
+
+            query = sql_server_union(names, """
+            SELECT '{name}', s.name, o.name, c.name, ty.name, c.max_length, c.precision, c.scale,
+                   c.is_nullable, c.column_id
+            FROM [{db}].sys.columns c
+            JOIN [{db}].sys.objects o ON o.object_id = c.object_id
+            JOIN [{db}].sys.schemas s ON s.schema_id = o.schema_id
+            JOIN [{db}].sys.types ty ON ty.user_type_id = c.user_type_id
+            WHERE o.type IN ('U', 'V') AND o.is_ms_shipped = 0
+            """)
+            for database, schema, table, column, column_type, length, precision, scale, nullable, position \
+                    in fetch_rows(cursor, f"{query}\nORDER BY 1, 2, 3, 10"):
+                snapshot.add_column(
+                    database, schema, table, column, column_type, length, precision, scale, bool(nullable), position
+                )
+
+            for database, schema, table, size, rows in fetch_rows(cursor, sql_server_union(names, """
+            SELECT '{name}', s.name, t.name,
+                   (SELECT SUM(a.total_pages) * 8192
+                    FROM [{db}].sys.partitions p
+                    JOIN [{db}].sys.allocation_units a ON a.container_id = p.partition_id
+                    WHERE p.object_id = t.object_id),
+                   (SELECT SUM(p.rows) FROM [{db}].sys.partitions p
+                    WHERE p.object_id = t.object_id AND p.index_id IN (0, 1))
+            FROM [{db}].sys.tables t
+            JOIN [{db}].sys.schemas s ON s.schema_id = t.schema_id
+            """)):
+                snapshot.set_size(database, schema, table, size, rows)
+
+            for database, principal, principal_type in fetch_rows(cursor, sql_server_union(names, """
+            SELECT '{name}', name, type
+            FROM [{db}].sys.database_principals
+            WHERE (type = 'R' AND is_fixed_role = 0) OR (type IN ('S', 'U') AND principal_id > 0)
+            """)):
+                if principal_type == 'R':
+                    snapshot.add_role(principal)
+                else:
+                    snapshot.add_user(principal)
+
+            query = sql_server_union(names, """
+            SELECT '{name}', dp.name, dp.type, p.permission_name, p.state_desc, p.class_desc,
+                   OBJECT_SCHEMA_NAME(p.major_id, DB_ID('{name}')), OBJECT_NAME(p.major_id, DB_ID('{name}'))
+            FROM [{db}].sys.database_permissions p
+            JOIN [{db}].sys.database_principals dp ON dp.principal_id = p.grantee_principal_id
+            WHERE dp.type IN ('R', 'S', 'U') AND p.permission_name <> 'CONNECT'
+            """)
+            for database, grantee, grantee_type, permission, state, grant_class, schema, name \
+                    in fetch_rows(cursor, query):
+                on_object = grant_class == 'OBJECT_OR_COLUMN'
+                snapshot.add_grant(
+                    grantee, 'ROLE' if grantee_type == 'R' else 'USER', permission,
+                    'TABLE' if on_object else grant_class, database, schema if on_object else None,
+                    name if on_object else None, 'DENY' if state == 'DENY' else 'GRANT'
+                )
+
+            for database, role, member, member_type in fetch_rows(cursor, sql_server_union(names, """
+            SELECT '{name}', r.name, m.name, m.type
+            FROM [{db}].sys.database_role_members rm
+            JOIN [{db}].sys.database_principals r ON r.principal_id = rm.role_principal_id
+            JOIN [{db}].sys.database_principals m ON m.principal_id = rm.member_principal_id
+            WHERE r.is_fixed_role = 0
+            """)):
+                snapshot.add_grant(
+                    member, 'ROLE' if member_type == 'R' else 'USER', 'USAGE', 'ROLE', database, object_name=role
+                )
+        finally:
+            cursor.close()
+    return snapshot
+
+
+def snapshot_snowflake(databases=None):
+    """
+    Read a catalog snapshot of Snowflake. Databases, roles, users and grants
+    come from SNOWFLAKE.ACCOUNT_USAGE (which lags behind by up to a few hours
+    and needs access to the SNOWFLAKE database). Schemas, tables and columns
+    come from ACCOUNT_USAGE too, or, when databases are given, from their
+    INFORMATION_SCHEMA views, which are current.
+    """
+    snapshot = CatalogSnapshot('snowflake')
+    with pooled_connection(get_snowflake_connection) as conn:
+        cursor = conn.cursor()
+        try:
+            database_filter = f"AND DATABASE_NAME {sql_in(databases)}" if databases else ""
+            query = f"SELECT DATABASE_NAME FROM SNOWFLAKE.ACCOUNT_USAGE.DATABASES WHERE DELETED IS NULL {database_filter}"
+            for (database,) in fetch_rows(cursor, query):
+                snapshot.add_database(database)
+
+            if databases:
+                def information_schema(view, columns):
+                    return "\nUNION ALL\n".join(
+                        f"SELECT {columns} FROM {database}.INFORMATION_SCHEMA.{view}" for database in databases
+                    )
+                schemas_query = information_schema('SCHEMATA', 'CATALOG_NAME, SCHEMA_NAME')
+                tables_query = information_schema(
+                    'TABLES', 'TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE, BYTES, ROW_COUNT'
+                )
+                columns_query = information_schema(
+                    'COLUMNS', 'TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, '
+                               'CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE, '
+                               'ORDINAL_POSITION'
+                )
+            else:
+                schemas_query = """
+                SELECT CATALOG_NAME, SCHEMA_NAME FROM SNOWFLAKE.ACCOUNT_USAGE.SCHEMATA WHERE DELETED IS NULL
+                """
+                tables_query = """
+                SELECT TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE, BYTES, ROW_COUNT
+                FROM SNOWFLAKE.ACCOUNT_USAGE.TABLES WHERE DELETED IS NULL
+                """
+                columns_query = """
+                SELECT TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE,
+                       CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE, ORDINAL_POSITION
+                FROM SNOWFLAKE.ACCOUNT_USAGE.COLUMNS WHERE DELETED IS NULL
+                """
+
+            for database, schema in fetch_rows(cursor, schemas_query):
+                if schema != 'INFORMATION_SCHEMA':
+                    snapshot.add_schema(database, schema)
+            for database, schema, table, kind, size, rows in fetch_rows(cursor, tables_query):
+                if schema != 'INFORMATION_SCHEMA':
+                    snapshot.add_table(database, schema, table, 'VIEW' if kind == 'VIEW' else 'TABLE')
+                    snapshot.set_size(database, schema, table, size, rows)
+            for database, schema, table, column, column_type, length, precision, scale, nullable, position \
+                    in fetch_rows(cursor, f"{columns_query}\nORDER BY 1, 2, 3, 10"):
+                snapshot.add_column(
+                    database, schema, table, column, column_type, length, precision, scale, nullable == 'YES',
+                    position
+                )
+
+            for (role,) in fetch_rows(cursor, "SELECT NAME FROM SNOWFLAKE.ACCOUNT_USAGE.ROLES WHERE DELETED_ON IS NULL"):
+                snapshot.add_role(role)
+            for (user,) in fetch_rows(cursor, "SELECT NAME FROM SNOWFLAKE.ACCOUNT_USAGE.USERS WHERE DELETED_ON IS NULL"):
+                snapshot.add_user(user)
+
+            query = f"""
+            SELECT GRANTEE_NAME, PRIVILEGE, GRANTED_ON, TABLE_CATALOG, TABLE_SCHEMA, NAME
+            FROM SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_ROLES
+            WHERE DELETED_ON IS NULL AND GRANTED_TO = 'ROLE'
+            {f"AND (TABLE_CATALOG IS NULL OR TABLE_CATALOG {sql_in(databases)})" if databases else ""}
+            """
+            for role, privilege, granted_on, database, schema, name in fetch_rows(cursor, query):
+                if granted_on in ('ACCOUNT', 'ROLE', 'WAREHOUSE', 'INTEGRATION', 'USER'):
+                    database, schema = None, None
+                elif granted_on == 'DATABASE':
+                    database, schema, name = name, None, None
+                elif granted_on == 'SCHEMA':
+                    schema, name = name, None
+                snapshot.add_grant(role, 'ROLE', privilege, granted_on, database, schema, name)
+
+            query = """
+            SELECT GRANTEE_NAME, ROLE FROM SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_USERS WHERE DELETED_ON IS NULL
+            """
+            for user, role in fetch_rows(cursor, query):
+                snapshot.add_grant(user, 'USER', 'USAGE', 'ROLE', object_name=role)
+        finally:
+            cursor.close()
+    return snapshot
+
+
+# Snapshot readers by system
+SNAPSHOT_READERS = {
+    'teradata': snapshot_teradata,
+    'sql_server': snapshot_sql_server,
+    'snowflake': snapshot_snowflake
+}
+
+
+def take_catalog_snapshot(system, databases=None, refresh=False):
+    """
+    Return a CatalogSnapshot of system ('teradata', 'sql_server' or
+    'snowflake'), optionally limited to some databases. Snapshots are kept in
+    the catalog cache like the show_* listings, unless refresh is set.
+    """
+    if system not in SNAPSHOT_READERS:
+        raise ValueError(f"Unknown system '{system}'; choose from {', '.join(SNAPSHOT_READERS)}")
+    databases = sorted(databases) if databases else None
+    key = f"snapshot:{','.join(databases) if databases else '*'}"
+    data = get_catalog_cache().get_or_load(
+        system, key, lambda: SNAPSHOT_READERS[system](databases).to_dict(), refresh=refresh
+    )
+    return CatalogSnapshot.from_dict(data)
+
+
+def parse_args():
+    """
+    Parse command line arguments for a catalog snapshot
+    """
+    parser = argparse.ArgumentParser(description="Read the catalog of a system in a few set-based queries")
+    parser.add_argument('--system', required=True, choices=sorted(SNAPSHOT_READERS))
+    parser.add_argument('--databases', help="Comma separated databases (default: all)")
+    parser.add_argument('--refresh', action='store_true', help="Ignore a cached snapshot")
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    start_time = time.time()
+    catalog_snapshot = take_catalog_snapshot(
+        args.system,
+        databases=[name.strip() for name in args.databases.split(',')] if args.databases else None,
+        refresh=args.refresh
+    )
+    print(tabulate(catalog_snapshot.summary().items(), headers=["Objects", "Count"], tablefmt="grid"))
+    print(f"Snapshot of {args.system} read in {time.time() - start_time:.2f} s")
@@ -0,0 +1,116 @@
+import os
+import sys
+import csv
+import json
+from tabulate import tabulate
+
+# Rows rendered per grid by the table sink; each page is printed as soon as it is full
+DEFAULT_TABLE_PAGE_SIZE = 1000
+
+
+class TableRowSink:
+    """
+    Prints rows as grids of at most page_size rows, so a large result is shown
+    page by page instead of being rendered into one string first.
+    """
+
+    def __init__(self, stream=None, page_size=DEFAULT_TABLE_PAGE_SIZE):
+        self.stream = stream or sys.stdout
+        self.page_size = page_size
+
+    def write_rows(self, title, columns, rows, empty_message=None):
+        """
+        Print title and the rows; print empty_message instead when there are none.
+        Returns the number of rows written.
+        """
+        print(title, file=self.stream)
+        count = 0
+        page = []
+        for row in rows:
+            page.append(row)
+            count += 1
+            if len(page) >= self.page_size:
+                self._print_page(columns, page)
+                page = []
+        if page:
+            self._print_page(columns, page)
+        if not count and empty_message:
+            print(empty_message, file=self.stream)
+        return count
+
+    def _print_page(self, columns, page):
+        print(tabulate(page, headers=columns, tablefmt="grid"), file=self.stream)
+        self.stream.flush()
+
+    def close(self):
+        if self.stream in (sys.stdout, sys.stderr):
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+
+class CsvRowSink:
+    """
+    Writes rows as CSV, one row at a time, with a header line whenever the
+    columns differ from those of the previous write_rows() call.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.writer = csv.writer(self.stream)
+        self.columns = None
+
+    def write_rows(self, title, columns, rows, empty_message=None):
+        columns = list(columns)
+        if columns and columns != self.columns:
+            self.writer.writerow(columns)
+            self.columns = columns
+        count = 0
+        for row in rows:
+            self.writer.writerow(row)
+            count += 1
+        self.stream.flush()
+        return count
+
+    def close(self):
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class JsonLinesRowSink:
+    """
+    Writes every row as one JSON object per line, keyed by column name.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write_rows(self, title, columns, rows, empty_message=None):
+        count = 0
+        for row in rows:
+            self.stream.write(json.dumps(dict(zip(columns, row)), default=str) + '\n')
+            count += 1
+        self.stream.flush()
+        return count
+
+    def close(self):
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+def create_row_sink(output_format='table', path=None):
+    """
+    Create a row sink: 'table' (tabulate grids), 'csv' or 'jsonl', writing to
+    path, or to stdout when no path is given.
+    """
+    if output_format not in ('table', 'csv', 'jsonl'):
+        raise ValueError(f"Unknown output format: {output_format}")
+    stream = None
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        stream = open(path, 'w', encoding='utf-8', newline='' if output_format == 'csv' else None)
+    if output_format == 'csv':
+        return CsvRowSink(stream)
+    if output_format == 'jsonl':
+        return JsonLinesRowSink(stream)
+    return TableRowSink(stream)
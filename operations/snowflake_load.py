@@ -0,0 +1,334 @@
+import io
+import os
+import csv
+import gzip
+import uuid
+import shutil
+import tempfile
+from operations.arrow_batches import record_batch_rows
+
+# Rows at or above this count are loaded through stage + COPY when load_mode is 'auto'
+COPY_THRESHOLD_ROWS = 1000000
+
+# Target compressed size of each staged file; Snowflake recommends 100-250 MB files
+DEFAULT_TARGET_FILE_SIZE = 128 * 1024 * 1024
+
+# Marker written for NULL values in staged CSV files
+CSV_NULL_MARKER = '\\N'
+
+
+def format_csv_value(value):
+    """
+    Format a Python value for a staged CSV file.
+    """
+    if value is None:
+        return CSV_NULL_MARKER
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    return value
+
+
+def is_record_batch(payload):
+    return hasattr(payload, 'schema') and hasattr(payload, 'num_rows')
+
+
+def prepare_batch(rows, columns, load_mode='insert', file_format='csv', builder=None):
+    """
+    Convert fetched rows into the payload a loader writes with load_prepared().
+    This is the CPU bound part of loading and is safe to run on any thread:
+    INSERT takes the rows as-is, CSV staging takes encoded CSV text and
+    Parquet staging takes an Arrow table. With an ArrowBatchBuilder the rows
+    are converted column by column into a RecordBatch, which every loader accepts.
+    """
+    if builder is not None:
+        return builder.build(rows)
+
+    if load_mode != 'copy':
+        return rows
+
+    if file_format == 'parquet':
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError("The 'parquet' stage format requires the pyarrow package.")
+        return pa.Table.from_pylist([dict(zip(columns, row)) for row in rows])
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for row in rows:
+        writer.writerow([format_csv_value(value) for value in row])
+    return buffer.getvalue()
+
+
+def table_stage(target_table):
+    """
+    Return the internal table stage reference for a (possibly qualified) table name.
+    """
+    namespace, _, table_name = target_table.rpartition('.')
+    return f"@{namespace}.%{table_name}" if namespace else f"@%{table_name}"
+
+
+def choose_load_mode(load_mode, total_rows):
+    """
+    Resolve the 'auto' load mode: stage + COPY for large tables, INSERT otherwise.
+    """
+    if load_mode == 'auto':
+        return 'copy' if (total_rows or 0) >= COPY_THRESHOLD_ROWS else 'insert'
+    if load_mode not in ('insert', 'copy'):
+        raise ValueError(f"Unknown load mode: {load_mode}")
+    return load_mode
+
+
+def create_loader(
+        snowflake_conn,
+        target_table,
+        columns,
+        load_mode='insert',
+        logger=None,
+        on_commit=None,
+        **copy_options
+):
+    """
+    Create the Snowflake loader for a resolved load mode ('insert' or 'copy').
+    on_commit(token) is called once the rows of a batch loaded with that token
+    are committed in Snowflake.
+    """
+    if load_mode == 'copy':
+        return StageCopyLoader(
+            snowflake_conn, target_table, columns, logger=logger, on_commit=on_commit, **copy_options
+        )
+    return InsertLoader(snowflake_conn, target_table, columns, on_commit=on_commit)
+
+
+class InsertLoader:
+    """
+    Loads batches into Snowflake with executemany INSERT statements.
+    """
+
+    def __init__(self, snowflake_conn, target_table, columns, on_commit=None):
+        self.cursor = snowflake_conn.cursor()
+        self.on_commit = on_commit
+        self.insert_sql = f"""
+        INSERT INTO {target_table} ({','.join(columns)})
+        VALUES ({','.join(['%s'] * len(columns))})
+        """
+
+    def load(self, rows, token=None):
+        self.load_prepared(rows, token)
+
+    def load_prepared(self, rows, token=None):
+        if is_record_batch(rows):
+            rows = record_batch_rows(rows)
+        # The connector autocommits each executemany
+        self.cursor.executemany(self.insert_sql, rows)
+        if token is not None and self.on_commit:
+            self.on_commit(token)
+
+    def close(self):
+        self.cursor.close()
+
+    def discard(self):
+        self.cursor.close()
+
+
+class StageCopyLoader:
+    """
+    Loads batches into Snowflake by writing compressed local files, uploading
+    them to the table stage with PUT and issuing one COPY INTO per file group.
+
+    Files are rolled when they reach target_file_size compressed bytes and a
+    group is uploaded and copied once files_per_copy files are ready (and on
+    close). PUT uploads every file of a group using upload_threads threads.
+    Commit tokens of the batches in a group are reported after its COPY.
+    """
+
+    def __init__(
+            self,
+            snowflake_conn,
+            target_table,
+            columns,
+            file_format='csv',
+            target_file_size=DEFAULT_TARGET_FILE_SIZE,
+            files_per_copy=8,
+            upload_threads=4,
+            logger=None,
+            on_commit=None
+    ):
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported stage file format: {file_format}")
+
+        self.cursor = snowflake_conn.cursor()
+        self.target_table = target_table
+        self.columns = list(columns)
+        self.file_format = file_format
+        self.target_file_size = target_file_size
+        self.files_per_copy = files_per_copy
+        self.upload_threads = upload_threads
+        self.logger = logger
+        self.on_commit = on_commit
+
+        # Unique prefix so concurrent loaders never collide in the table stage
+        self.prefix = f"migration_{uuid.uuid4().hex}"
+        self.work_dir = tempfile.mkdtemp(prefix='td_sf_stage_')
+        self.file_index = 0
+        self.group_index = 0
+        self.ready_files = []
+        self.ready_tokens = []
+        self.current_tokens = []
+        self.current_path = None
+        self.current_raw = None
+        self.current_writer = None
+
+    def load(self, rows, token=None):
+        self.load_prepared(prepare_batch(rows, self.columns, 'copy', self.file_format), token)
+
+    def load_prepared(self, payload, token=None):
+        if is_record_batch(payload) and self.file_format == 'csv':
+            payload = prepare_batch(record_batch_rows(payload), self.columns, 'copy', 'csv')
+
+        if self.file_format == 'parquet':
+            self._write_parquet(payload)
+        else:
+            self._write_csv(payload)
+        if token is not None:
+            self.current_tokens.append(token)
+
+        if self._current_size() >= self.target_file_size:
+            self._roll_file()
+        if len(self.ready_files) >= self.files_per_copy:
+            self._copy_group()
+
+    def close(self):
+        try:
+            self._roll_file()
+            if self.ready_files:
+                self._copy_group()
+        finally:
+            self.discard()
+
+    def discard(self):
+        """
+        Drop any files that were not copied yet and release the cursor.
+        """
+        if self.current_writer is not None:
+            try:
+                if self.file_format == 'parquet':
+                    self.current_writer.close()
+                else:
+                    self.current_text.close()
+                    self.current_raw.close()
+            except Exception:
+                pass
+            self.current_writer = None
+        self.cursor.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _group_dir(self):
+        group_dir = os.path.join(self.work_dir, f"group_{self.group_index}")
+        os.makedirs(group_dir, exist_ok=True)
+        return group_dir
+
+    def _next_path(self, extension):
+        self.file_index += 1
+        return os.path.join(self._group_dir(), f"{self.prefix}_{self.file_index:06d}.{extension}")
+
+    def _write_csv(self, csv_text):
+        if self.current_writer is None:
+            self.current_path = self._next_path('csv.gz')
+            self.current_raw = open(self.current_path, 'wb')
+            self.current_gzip = gzip.GzipFile(fileobj=self.current_raw, mode='wb', compresslevel=6)
+            self.current_text = io.TextIOWrapper(self.current_gzip, encoding='utf-8', newline='')
+            self.current_writer = self.current_text
+
+        self.current_text.write(csv_text)
+        self.current_text.flush()
+
+    def _write_parquet(self, table):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        if self.current_writer is None:
+            self.current_path = self._next_path('parquet')
+            self.current_writer = pq.ParquetWriter(self.current_path, table.schema, compression='snappy')
+        elif table.schema != self.current_writer.schema:
+            # Types inferred per batch can drift, e.g. a column that was all NULL so far
+            table = table.cast(self.current_writer.schema)
+        self.current_writer.write_table(table)
+
+    def _current_size(self):
+        if self.current_writer is None:
+            return 0
+        if self.file_format == 'parquet':
+            return os.path.getsize(self.current_path)
+        # Compressed bytes written so far
+        return self.current_raw.tell()
+
+    def _roll_file(self):
+        if self.current_writer is None:
+            return
+
+        if self.file_format == 'parquet':
+            self.current_writer.close()
+        else:
+            # Closing the text wrapper also finishes the gzip stream
+            self.current_text.close()
+            self.current_raw.close()
+
+        self.ready_files.append(self.current_path)
+        self.ready_tokens.extend(self.current_tokens)
+        self.current_tokens = []
+        self.current_writer = None
+        self.current_path = None
+
+    def _copy_group(self):
+        group_dir = self._group_dir()
+        stage_path = f"{table_stage(self.target_table)}/{self.prefix}/"
+        local_pattern = os.path.join(group_dir, '*').replace('\\', '/')
+
+        # Files are already compressed locally, so PUT must not compress them again
+        self.cursor.execute(
+            f"PUT 'file://{local_pattern}' {stage_path} "
+            f"PARALLEL={self.upload_threads} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+        )
+
+        file_names = ', '.join(f"'{os.path.basename(path)}'" for path in self.ready_files)
+        if self.file_format == 'parquet':
+            copy_sql = f"""
+            COPY INTO {self.target_table}
+            FROM {stage_path}
+            FILES = ({file_names})
+            FILE_FORMAT = (TYPE = PARQUET)
+            MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
+            PURGE = TRUE
+            """
+        else:
+            copy_sql = f"""
+            COPY INTO {self.target_table} ({','.join(self.columns)})
+            FROM {stage_path}
+            FILES = ({file_names})
+            FILE_FORMAT = (
+                TYPE = CSV
+                COMPRESSION = GZIP
+                FIELD_OPTIONALLY_ENCLOSED_BY = '"'
+                NULL_IF = ('\\\\N')
+                EMPTY_FIELD_AS_NULL = FALSE
+                BINARY_FORMAT = HEX
+            )
+            PURGE = TRUE
+            """
+        self.cursor.execute(copy_sql)
+
+        if self.logger:
+            self.logger.info(f"Copied {len(self.ready_files)} staged file(s) into {self.target_table}")
+
+        shutil.rmtree(group_dir, ignore_errors=True)
+        self.ready_files = []
+        tokens, self.ready_tokens = self.ready_tokens, []
+        if self.on_commit:
+            for token in tokens:
+                self.on_commit(token)
+        self.group_index += 1
@@ -1,63 +1,61 @@
-import snowflake.connector
-from config.snowflake import get_snowflake_connection
+from config.snowflake import get_snowflake_connection, snowflake_connector
+from config.lazy_imports import driver_error
+from operations.catalog_cache import cached_catalog_query
 from tabulate import tabulate
 
-def show_databases_snowflake():
+def show_databases_snowflake(refresh=False):
     """
     Fetches and returns a list of all databases in Snowflake.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_snowflake_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SHOW DATABASES")
-            databases = cursor.fetchall()
-            return [db[1] for db in databases]  # Snowflake returns database names in the second column
-    except snowflake.connector.Error as e:
+        _, databases = cached_catalog_query(
+            'snowflake', 'databases', get_snowflake_connection, "SHOW DATABASES", refresh=refresh
+        )
+        return [db[1] for db in databases]  # Snowflake returns database names in the second column
+    except driver_error(snowflake_connector) as e:
         print("Error fetching databases from Snowflake:", e)
         return []
 
 
-def show_tables_snowflake(database_name):
+def show_tables_snowflake(database_name, refresh=False):
     """
     Fetches and returns a list of all tables in a specific Snowflake database.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_snowflake_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SHOW TABLES IN DATABASE {database_name}")
-            tables = cursor.fetchall()
-            return [table[1] for table in tables]  # Table names are in the second column
-    except snowflake.connector.Error as e:
+        _, tables = cached_catalog_query(
+            'snowflake', f"tables:{database_name}", get_snowflake_connection,
+            f"SHOW TABLES IN DATABASE {database_name}", refresh=refresh
+        )
+        return [table[1] for table in tables]  # Table names are in the second column
+    except driver_error(snowflake_connector) as e:
         print(f"Error fetching tables for database '{database_name}':", e)
         return []
 
 
-def show_roles_snowflake():
+def show_roles_snowflake(refresh=False):
     """
     Fetches and returns a list of roles in Snowflake.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_snowflake_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SHOW ROLES")
-            roles = cursor.fetchall()
-            return [role[1] for role in roles]  # Role names are in the second column
-    except snowflake.connector.Error as e:
+        _, roles = cached_catalog_query('snowflake', 'roles', get_snowflake_connection, "SHOW ROLES", refresh=refresh)
+        return [role[1] for role in roles]  # Role names are in the second column
+    except driver_error(snowflake_connector) as e:
         print("Error fetching roles from Snowflake:", e)
         return []
 
 
-def show_users_snowflake():
+def show_users_snowflake(refresh=False):
     """
     Fetches and returns a list of users in Snowflake.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_snowflake_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SHOW USERS")
-            users = cursor.fetchall()
-            return [user[0] for user in users]  # User names are in the second column
-    except snowflake.connector.Error as e:
+        _, users = cached_catalog_query('snowflake', 'users', get_snowflake_connection, "SHOW USERS", refresh=refresh)
+        return [user[0] for user in users]  # User names are in the second column
+    except driver_error(snowflake_connector) as e:
         print("Error fetching users from Snowflake:", e)
         return []
 
@@ -1,25 +1,104 @@
-from config.sql_server import  get_sql_server_connection
-import pyodbc
+import argparse
+from config.sql_server import  get_sql_server_connection, sql_server_database_connection
+from config.connection_pool import get_pool, pooled_connection
+from config.sql_server import pyodbc
+from config.lazy_imports import driver_error
+from operations.catalog_cache import cached_catalog_query, get_catalog_cache
+from operations.row_sinks import TableRowSink, create_row_sink
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
 
-conn = get_sql_server_connection()
+# Rows fetched per round trip by the iter_* functions
+SQL_SERVER_FETCH_SIZE = 5000
 
-def show_roles_sql_server():
+# Databases inventoried concurrently, each on its own connection
+DEFAULT_INVENTORY_JOBS = 8
+
+# Row types of the iter_* functions; fields are the column names of their queries
+DatabaseRow = namedtuple('DatabaseRow', ['DatabaseName'])
+SchemaRow = namedtuple('SchemaRow', ['SchemaName'])
+TableRow = namedtuple('TableRow', ['TABLE_SCHEMA', 'TABLE_NAME'])
+LoginRow = namedtuple('LoginRow', ['LoginName', 'LoginType', 'IsDisabled'])
+PrivilegeRow = namedtuple(
+    'PrivilegeRow', ['RoleName', 'RoleType', 'Permission', 'PermissionState', 'ObjectName', 'ObjectType']
+)
+MaskingPolicyRow = namedtuple('MaskingPolicyRow', ['TableName', 'ColumnName', 'MaskingFunction'])
+MaskedColumnPermissionRow = namedtuple(
+    'MaskedColumnPermissionRow',
+    ['TableName', 'ColumnName', 'MaskingFunction', 'RoleName', 'RoleType', 'Permission', 'PermissionState']
+)
+
+
+def iter_rows(row_type, query, database_name=None):
+    """
+    Runs a query on a pooled SQL Server connection and yields its rows as
+    row_type, fetching SQL_SERVER_FETCH_SIZE rows at a time. With database_name
+    the query runs on a connection to that database from its own pool.
+    The connection stays checked out until the iterator is exhausted or closed,
+    so consume it on the calling thread before running other queries there.
+    """
+    factory = sql_server_database_connection(database_name) if database_name else get_sql_server_connection
+    with pooled_connection(factory) as conn, conn.cursor() as cursor:
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(SQL_SERVER_FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield row_type._make(row)
+
+
+def write_rows(sink, title, columns, rows, empty_message):
+    """
+    Streams rows to sink (see operations.row_sinks), by default as grids on stdout.
+    Returns the number of rows written.
+    """
+    return (sink or TableRowSink()).write_rows(title, columns, rows, empty_message)
+
+
+def show_roles_sql_server(refresh=False):
     """
     Connects to SQL Server and shows the list of roles in the current database excluding system roles.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with conn.cursor() as cursor:
+        # Query to fetch roles in the current database Exclude system-defined roles
+        query = """
+        SELECT name AS RoleName
+        FROM sys.database_principals
+        WHERE type = 'R' -- Roles
+          AND is_fixed_role = 0 -- Exclude system-defined roles
+        ORDER BY name;
+        """
+        _, tables = cached_catalog_query('sql_server', 'roles', get_sql_server_connection, query, refresh=refresh)
+
+        print("Roles in the current database:")
+        if tables:
+            for table in tables:
+                print(table[0])
+        else:
+            print("No roles found in the current database.")
+
+    except driver_error(pyodbc) as e:
+        print("Error accessing SQL Server:", e)
+
+
+def show_users_sql_server(refresh=False):
+        """
+        Connects to SQL Server and shows the list of roles in the current database excluding system roles.
+        Served from the catalog cache unless refresh is set.
+        """
+        try:
             # Query to fetch roles in the current database Exclude system-defined roles
             query = """
-            SELECT name AS RoleName
+            SELECT name AS UserName
             FROM sys.database_principals
-            WHERE type = 'R' -- Roles
-              AND is_fixed_role = 0 -- Exclude system-defined roles
+            WHERE type IN ('S', 'U') -- 'S' for SQL user, 'U' for Windows user/group
+              AND principal_id > 0 -- Exclude system objects
             ORDER BY name;
             """
-            cursor.execute(query)
-            tables = cursor.fetchall()
+            _, tables = cached_catalog_query('sql_server', 'users', get_sql_server_connection, query, refresh=refresh)
 
             print("Roles in the current database:")
             if tables:
@@ -28,125 +107,106 @@ def show_roles_sql_server():
             else:
                 print("No roles found in the current database.")
 
-    except pyodbc.Error as e:
-        print("Error accessing SQL Server:", e)
-
-
-def show_users_sql_server():
-        """
-        Connects to SQL Server and shows the list of roles in the current database excluding system roles.
-        """
-        try:
-            with conn.cursor() as cursor:
-                # Query to fetch roles in the current database Exclude system-defined roles
-                query = """
-                SELECT name AS UserName
-                FROM sys.database_principals
-                WHERE type IN ('S', 'U') -- 'S' for SQL user, 'U' for Windows user/group
-                  AND principal_id > 0 -- Exclude system objects
-                ORDER BY name;
-                """
-                cursor.execute(query)
-                tables = cursor.fetchall()
-
-                print("Roles in the current database:")
-                if tables:
-                    for table in tables:
-                        print(table[0])
-                else:
-                    print("No roles found in the current database.")
-
-        except pyodbc.Error as e:
+        except driver_error(pyodbc) as e:
             print("Error accessing SQL Server:", e)
 
-def show_databases_sql_server():
+def show_databases_sql_server(refresh=False):
     """
     Connects to SQL Server and shows the list of databases.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with conn.cursor() as cursor:
-            query = "SELECT name FROM sys.databases ORDER BY name;"
-            cursor.execute(query)
-            databases = cursor.fetchall()
-
-            print("Databases in SQL Server:")
-            if databases:
-                print(tabulate(databases, headers=["Database Name"], tablefmt="grid"))
-            else:
-                print("No databases found.")
-    except pyodbc.Error as e:
+        query = "SELECT name FROM sys.databases ORDER BY name;"
+        _, databases = cached_catalog_query(
+            'sql_server', 'databases', get_sql_server_connection, query, refresh=refresh
+        )
+
+        print("Databases in SQL Server:")
+        if databases:
+            print(tabulate(databases, headers=["Database Name"], tablefmt="grid"))
+        else:
+            print("No databases found.")
+    except driver_error(pyodbc) as e:
         print("Error accessing SQL Server:", e)
 
 
-def show_schemas_sql_server(database_name):
+def iter_schemas_sql_server(database_name):
+    """
+    Yields a SchemaRow for every schema in the specified database.
+    """
+    return iter_rows(SchemaRow, "SELECT name FROM sys.schemas ORDER BY name;", database_name)
+
+
+def show_schemas_sql_server(database_name, sink=None):
     """
     Connects to SQL Server and shows the list of schemas in the specified database.
     """
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(f"USE [{database_name}]")  # Switch to the specified database
-            query = "SELECT name FROM sys.schemas ORDER BY name;"
-            cursor.execute(query)
-            schemas = cursor.fetchall()
-
-            print(f"Schemas in database '{database_name}':")
-            if schemas:
-                print(tabulate(schemas, headers=["Schema Name"], tablefmt="grid"))
-            else:
-                print(f"No schemas found in the database '{database_name}'.")
-    except pyodbc.Error as e:
+        write_rows(
+            sink, f"Schemas in database '{database_name}':", ["Schema Name"],
+            iter_schemas_sql_server(database_name), f"No schemas found in the database '{database_name}'."
+        )
+    except driver_error(pyodbc) as e:
         print(f"Error accessing database '{database_name}':", e)
 
 
-def show_tables_sql_server(database_name):
+def iter_tables_sql_server(database_name, refresh=False):
+    """
+    Yields a TableRow for every table in the specified database.
+    Served from the catalog cache unless refresh is set.
+    """
+    query = """
+    SELECT TABLE_SCHEMA, TABLE_NAME
+    FROM INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_TYPE = 'BASE TABLE'
+    ORDER BY TABLE_SCHEMA, TABLE_NAME;
+    """
+    _, tables = cached_catalog_query(
+        'sql_server', f"tables:{database_name}", sql_server_database_connection(database_name), query,
+        refresh=refresh
+    )
+    for table in tables:
+        yield TableRow._make(table)
+
+
+def show_tables_sql_server(database_name, refresh=False, sink=None):
     """
     Connects to SQL Server and shows the list of tables in the specified database.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(f"USE [{database_name}]")  # Switch to the specified database
-            query = """
-            SELECT TABLE_SCHEMA, TABLE_NAME
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE TABLE_TYPE = 'BASE TABLE'
-            ORDER BY TABLE_SCHEMA, TABLE_NAME;
-            """
-            cursor.execute(query)
-            tables = cursor.fetchall()
-
-            print(f"Tables in database '{database_name}':")
-            if tables:
-                print(tabulate(tables, headers=["Schema", "Table Name"], tablefmt="grid"))
-            else:
-                print(f"No tables found in the database '{database_name}'.")
-    except pyodbc.Error as e:
+        write_rows(
+            sink, f"Tables in database '{database_name}':", ["Schema", "Table Name"],
+            iter_tables_sql_server(database_name, refresh),
+            f"No tables found in the database '{database_name}'."
+        )
+    except driver_error(pyodbc) as e:
         print(f"Error accessing database '{database_name}':", e)
 
-def show_logins_sql_server():
+
+def iter_logins_sql_server():
+    """
+    Yields a LoginRow for every login.
+    """
+    # Query to fetch logins from sys.server_principals
+    query = """
+    SELECT name AS LoginName,
+           type_desc AS LoginType,
+           is_disabled AS IsDisabled
+    FROM sys.server_principals
+    WHERE type IN ('S', 'U', 'G') -- S: SQL Login, U: Windows Login, G: Group
+    ORDER BY name;
+    """
+    return iter_rows(LoginRow, query)
+
+
+def show_logins_sql_server(sink=None):
     """
     Connects to SQL Server and shows the list of logins.
     """
     try:
-        with conn.cursor() as cursor:
-            # Query to fetch logins from sys.server_principals
-            query = """
-            SELECT name AS LoginName,
-                   type_desc AS LoginType,
-                   is_disabled AS IsDisabled
-            FROM sys.server_principals
-            WHERE type IN ('S', 'U', 'G') -- S: SQL Login, U: Windows Login, G: Group
-            ORDER BY name;
-            """
-            cursor.execute(query)
-            logins = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]  # Get column names dynamically
-
-            print("Logins in SQL Server:")
-            if logins:
-                print(tabulate(logins, headers=columns, tablefmt="grid"))
-            else:
-                print("No logins found.")
-    except pyodbc.Error as e:
+        write_rows(sink, "Logins in SQL Server:", LoginRow._fields, iter_logins_sql_server(), "No logins found.")
+    except driver_error(pyodbc) as e:
         print("Error accessing SQL Server:", e)
 
 # show_databases()
@@ -154,105 +214,108 @@ def show_logins_sql_server():
 # show_tables("migration_data")
 # show_logins()
 
-def show_privileges_for_roles_sql_server(database_name):
+def iter_privileges_for_roles_sql_server(database_name):
+    """
+    Yields a PrivilegeRow for every permission granted to a role in the specified database.
+    """
+    query = """
+    SELECT dp.name AS RoleName,
+           dp.type_desc AS RoleType,
+           p.permission_name AS Permission,
+           p.state_desc AS PermissionState,
+           o.name AS ObjectName,
+           o.type_desc AS ObjectType
+    FROM sys.database_permissions p
+    JOIN sys.database_principals dp ON p.grantee_principal_id = dp.principal_id
+    LEFT JOIN sys.objects o ON p.major_id = o.object_id
+    WHERE dp.type = 'R' -- Roles
+    ORDER BY dp.name, o.name, p.permission_name;
+    """
+    return iter_rows(PrivilegeRow, query, database_name)
+
+
+def show_privileges_for_roles_sql_server(database_name, sink=None):
     """
     Connects to SQL Server and shows privileges for roles in the specified database.
     """
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(f"USE [{database_name}]")  # Switch to the specified database
-            query = """
-            SELECT dp.name AS RoleName,
-                   dp.type_desc AS RoleType,
-                   p.permission_name AS Permission,
-                   p.state_desc AS PermissionState,
-                   o.name AS ObjectName,
-                   o.type_desc AS ObjectType
-            FROM sys.database_permissions p
-            JOIN sys.database_principals dp ON p.grantee_principal_id = dp.principal_id
-            LEFT JOIN sys.objects o ON p.major_id = o.object_id
-            WHERE dp.type = 'R' -- Roles
-            ORDER BY dp.name, o.name, p.permission_name;
-            """
-            cursor.execute(query)
-            privileges = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]  # Get column names dynamically
-
-            print(f"Privileges for roles in database '{database_name}':")
-            if privileges:
-                print(tabulate(privileges, headers=columns, tablefmt="grid"))
-            else:
-                print(f"No privileges found for roles in the database '{database_name}'.")
-    except pyodbc.Error as e:
+        write_rows(
+            sink, f"Privileges for roles in database '{database_name}':", PrivilegeRow._fields,
+            iter_privileges_for_roles_sql_server(database_name),
+            f"No privileges found for roles in the database '{database_name}'."
+        )
+    except driver_error(pyodbc) as e:
         print(f"Error accessing database '{database_name}':", e)
 
-def show_masking_policies_sql_server(database_name):
+
+def iter_masking_policies_sql_server(database_name):
+    """
+    Yields a MaskingPolicyRow for every masked column in the specified database.
+    """
+    query = """
+    SELECT t.name AS TableName,
+           c.name AS ColumnName,
+           mc.masking_function AS MaskingFunction
+    FROM sys.masked_columns mc
+    JOIN sys.columns c ON mc.column_id = c.column_id AND mc.object_id = c.object_id
+    JOIN sys.tables t ON c.object_id = t.object_id
+    WHERE mc.is_masked = 1
+    ORDER BY t.name, c.name;
+    """
+    return iter_rows(MaskingPolicyRow, query, database_name)
+
+
+def show_masking_policies_sql_server(database_name, sink=None):
     """
     Connects to SQL Server and shows masking policies in the specified database.
     """
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(f"USE [{database_name}]")  # Switch to the specified database
-            query = """
-            SELECT t.name AS TableName,
-                   c.name AS ColumnName,
-                   mc.masking_function AS MaskingFunction
-            FROM sys.masked_columns mc
-            JOIN sys.columns c ON mc.column_id = c.column_id AND mc.object_id = c.object_id
-            JOIN sys.tables t ON c.object_id = t.object_id
-            WHERE mc.is_masked = 1
-            ORDER BY t.name, c.name;
-            """
-            cursor.execute(query)
-            policies = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]  # Get column names dynamically
-
-            print(f"Masking Policies in database '{database_name}':")
-            if policies:
-                print(tabulate(policies, headers=columns, tablefmt="grid"))
-            else:
-                print(f"No masking policies found in the database '{database_name}'.")
-    except pyodbc.Error as e:
+        write_rows(
+            sink, f"Masking Policies in database '{database_name}':", MaskingPolicyRow._fields,
+            iter_masking_policies_sql_server(database_name),
+            f"No masking policies found in the database '{database_name}'."
+        )
+    except driver_error(pyodbc) as e:
         print(f"Error accessing database '{database_name}':", e)
 
 
-def check_masking_policies_roles_sql_server(database_name):
+def iter_masking_policies_roles_sql_server(database_name):
     """
-    Connects to SQL Server and checks which roles have permissions on columns with masking policies applied.
+    Yields a MaskedColumnPermissionRow for every role permission on a masked column in the specified database.
     """
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute(f"USE [{database_name}]")  # Switch to the specified database
+    # Query to check roles and permissions on masked columns
+    query = """
+    SELECT 
+        t.name AS TableName,
+        c.name AS ColumnName,
+        mc.masking_function AS MaskingFunction,
+        dp.name AS RoleName,
+        dp.type_desc AS RoleType,
+        p.permission_name AS Permission,
+        p.state_desc AS PermissionState
+    FROM sys.masked_columns mc
+    JOIN sys.columns c ON mc.column_id = c.column_id AND mc.object_id = c.object_id
+    JOIN sys.tables t ON c.object_id = t.object_id
+    JOIN sys.database_permissions p ON p.major_id = c.object_id
+    JOIN sys.database_principals dp ON p.grantee_principal_id = dp.principal_id
+    WHERE mc.is_masked = 1 -- Masked columns only
+      AND dp.type = 'R'  -- Roles only
+    ORDER BY t.name, c.name, dp.name;
+    """
+    return iter_rows(MaskedColumnPermissionRow, query, database_name)
 
-            # Query to check roles and permissions on masked columns
-            query = """
-            SELECT 
-                t.name AS TableName,
-                c.name AS ColumnName,
-                mc.masking_function AS MaskingFunction,
-                dp.name AS RoleName,
-                dp.type_desc AS RoleType,
-                p.permission_name AS Permission,
-                p.state_desc AS PermissionState
-            FROM sys.masked_columns mc
-            JOIN sys.columns c ON mc.column_id = c.column_id AND mc.object_id = c.object_id
-            JOIN sys.tables t ON c.object_id = t.object_id
-            JOIN sys.database_permissions p ON p.major_id = c.object_id
-            JOIN sys.database_principals dp ON p.grantee_principal_id = dp.principal_id
-            WHERE mc.is_masked = 1 -- Masked columns only
-              AND dp.type = 'R'  -- Roles only
-            ORDER BY t.name, c.name, dp.name;
-            """
-            cursor.execute(query)
-            policies_roles = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]  # Get column names dynamically
 
-            print(f"Masking policies and role permissions in database '{database_name}':")
-            if policies_roles:
-                print(tabulate(policies_roles, headers=columns, tablefmt="grid"))
-            else:
-                print(f"No roles found with permissions on masked columns in the database '{database_name}'.")
-    except pyodbc.Error as e:
+def check_masking_policies_roles_sql_server(database_name, sink=None):
+    """
+    Connects to SQL Server and checks which roles have permissions on columns with masking policies applied.
+    """
+    try:
+        write_rows(
+            sink, f"Masking policies and role permissions in database '{database_name}':",
+            MaskedColumnPermissionRow._fields, iter_masking_policies_roles_sql_server(database_name),
+            f"No roles found with permissions on masked columns in the database '{database_name}'."
+        )
+    except driver_error(pyodbc) as e:
         print(f"Error accessing database '{database_name}':", e)
 
 
@@ -260,3 +323,136 @@ def check_masking_policies_roles_sql_server(database_name):
 # show_privileges_for_roles("migration_data")
 #check_masking_policies_roles_sql_server("migration_data")
 
+
+# Row iterators of the inventory, by kind
+INVENTORY_KINDS = {
+    'schemas': iter_schemas_sql_server,
+    'tables': iter_tables_sql_server,
+    'privileges': iter_privileges_for_roles_sql_server,
+    'masking_policies': iter_masking_policies_sql_server,
+    'masking_permissions': iter_masking_policies_roles_sql_server
+}
+
+
+def iter_inventory_databases_sql_server():
+    """
+    Yields a DatabaseRow for every online user database the login can access.
+    """
+    query = """
+    SELECT name
+    FROM sys.databases
+    WHERE database_id > 4 -- Exclude master, tempdb, model and msdb
+      AND state = 0 -- Online
+      AND HAS_DBACCESS(name) = 1
+    ORDER BY name;
+    """
+    return iter_rows(DatabaseRow, query)
+
+
+def inventory_database_sql_server(database_name, kinds):
+    """
+    Reads the inventory kinds of one database on a connection to that database.
+    Returns {kind: [rows]}.
+    """
+    factory = sql_server_database_connection(database_name)
+    try:
+        with pooled_connection(factory):
+            # One checkout for all kinds; the iterators reuse it
+            return {kind: list(INVENTORY_KINDS[kind](database_name)) for kind in kinds}
+    finally:
+        # Inventories visit each database once; do not keep its connection open
+        get_pool(factory).close()
+
+
+def iter_inventory_sql_server(databases=None, kinds=None, jobs=DEFAULT_INVENTORY_JOBS):
+    """
+    Inventories databases (by default all from sys.databases) concurrently,
+    with at most jobs databases and connections at a time, and yields
+    (database name, {kind: [rows]}, error) as each database completes.
+    """
+    kinds = list(kinds or INVENTORY_KINDS)
+    for kind in kinds:
+        if kind not in INVENTORY_KINDS:
+            raise ValueError(f"Unknown inventory kind '{kind}'; choose from {', '.join(INVENTORY_KINDS)}")
+    if databases is None:
+        databases = [row.DatabaseName for row in iter_inventory_databases_sql_server()]
+
+    # Cache the table lists of all databases with one write of the cache file
+    with get_catalog_cache().batch(), ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {
+            executor.submit(inventory_database_sql_server, database_name, kinds): database_name
+            for database_name in databases
+        }
+        for future in as_completed(futures):
+            database_name = futures[future]
+            try:
+                yield database_name, future.result(), None
+            except driver_error(pyodbc) as e:
+                yield database_name, {}, str(e)
+
+
+def inventory_sql_server(databases=None, kinds=None, jobs=DEFAULT_INVENTORY_JOBS):
+    """
+    Inventories databases concurrently (see iter_inventory_sql_server).
+    Returns {'databases': {database name: {kind: [rows]}}, 'errors': {database name: error}}.
+    """
+    result = {'databases': {}, 'errors': {}}
+    for database_name, inventory, error in iter_inventory_sql_server(databases, kinds, jobs):
+        if error:
+            result['errors'][database_name] = error
+        else:
+            result['databases'][database_name] = inventory
+    return result
+
+
+def show_inventory_sql_server(databases=None, kinds=None, jobs=DEFAULT_INVENTORY_JOBS, sink=None):
+    """
+    Inventories databases concurrently and writes each database's rows to sink
+    as soon as that database completes. Returns {database name: error} of the
+    databases that failed.
+    """
+    sink = sink or TableRowSink()
+    errors = {}
+    for database_name, inventory, error in iter_inventory_sql_server(databases, kinds, jobs):
+        if error:
+            print(f"Error accessing database '{database_name}':", error)
+            errors[database_name] = error
+            continue
+        for kind, rows in inventory.items():
+            columns = rows[0]._fields if rows else []
+            sink.write_rows(
+                f"{kind.replace('_', ' ').capitalize()} in database '{database_name}':", columns, rows,
+                f"No {kind.replace('_', ' ')} found in the database '{database_name}'."
+            )
+    return errors
+
+
+def parse_args():
+    """
+    Parse command line arguments for a SQL Server inventory
+    """
+    parser = argparse.ArgumentParser(description="Inventory SQL Server databases concurrently")
+    parser.add_argument('--databases', help="Comma separated databases (default: all user databases)")
+    parser.add_argument('--kinds', default=','.join(INVENTORY_KINDS),
+                        help=f"Comma separated kinds of {', '.join(INVENTORY_KINDS)}")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_INVENTORY_JOBS, help="Databases read concurrently")
+    parser.add_argument('--format', choices=['table', 'csv', 'jsonl'], default='table')
+    parser.add_argument('--output', help="Write to this file instead of stdout")
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    row_sink = create_row_sink(args.format, args.output)
+    try:
+        inventory_errors = show_inventory_sql_server(
+            databases=[name.strip() for name in args.databases.split(',')] if args.databases else None,
+            kinds=[kind.strip() for kind in args.kinds.split(',')],
+            jobs=args.jobs,
+            sink=row_sink
+        )
+    finally:
+        row_sink.close()
+    if inventory_errors:
+        print(f"{len(inventory_errors)} database(s) could not be inventoried")
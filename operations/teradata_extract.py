@@ -0,0 +1,127 @@
+import sys
+
+# Rows requested per fetchmany() round trip
+DEFAULT_FETCH_SIZE = 10000
+
+# Upper bound on the estimated in-memory size of one batch handed downstream
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024 * 1024
+
+# teradatasql escape that runs a query over FastExport when possible and falls back to SQL otherwise
+FASTEXPORT_ESCAPE = '{fn teradata_try_fastexport}'
+
+# Tables at or above this perm size are extracted with FastExport when extract_mode is 'auto'
+FASTEXPORT_THRESHOLD_BYTES = 1024 * 1024 * 1024
+
+# DBC column types FastExport cannot return: LOBs, JSON, XML, UDTs and arrays
+FASTEXPORT_UNSUPPORTED_TYPES = ('BO', 'CO', 'JN', 'XM', 'UT', 'A1', 'AN')
+
+
+def estimate_row_bytes(row):
+    """
+    Estimate the in-memory size of a fetched row (the tuple plus its values).
+    """
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+def estimate_batch_bytes(rows, sample_size=100):
+    """
+    Estimate the in-memory size of a batch from an evenly spaced sample of its rows.
+    """
+    if not rows:
+        return 0
+    step = max(1, len(rows) // sample_size)
+    sample = rows[::step]
+    return sum(estimate_row_bytes(row) for row in sample) * len(rows) // len(sample)
+
+
+def iter_row_chunks(cursor, fetch_size=DEFAULT_FETCH_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+    """
+    Stream the current result set of cursor as lists of rows.
+
+    Rows are pulled with fetchmany() and grouped into chunks whose estimated
+    size stays under max_batch_bytes, so only one chunk is held at a time no
+    matter how large the result set or how wide the rows are. The fetch size
+    shrinks automatically when rows are wide enough that fetch_size rows
+    would not fit in the budget. A single row larger than the budget is
+    yielded on its own.
+    """
+    chunk = []
+    chunk_bytes = 0
+    next_fetch = fetch_size
+
+    while True:
+        rows = cursor.fetchmany(next_fetch)
+        if not rows:
+            break
+
+        fetched_rows = len(rows)
+        fetched_bytes = 0
+        for row in rows:
+            row_bytes = estimate_row_bytes(row)
+            fetched_bytes += row_bytes
+            if chunk and chunk_bytes + row_bytes > max_batch_bytes:
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+            chunk.append(row)
+            chunk_bytes += row_bytes
+        del rows
+
+        # Size the next round trip so it fits in the remaining budget
+        average_row_bytes = max(1, fetched_bytes // fetched_rows)
+        remaining = max(max_batch_bytes - chunk_bytes, average_row_bytes)
+        next_fetch = max(1, min(fetch_size, remaining // average_row_bytes))
+
+    if chunk:
+        yield chunk
+
+
+def split_table_name(table_name):
+    """
+    Return the DBC filter and parameters matching a (possibly qualified) table name.
+    """
+    database_name, _, bare_table = table_name.rpartition('.')
+    if database_name:
+        return "DatabaseName = ? AND TableName = ?", [database_name, bare_table]
+    return "DatabaseName = DATABASE AND TableName = ?", [bare_table]
+
+
+def choose_extract_mode(teradata_conn, table_name, extract_mode, logger):
+    """
+    Resolve the extraction protocol of a table: 'fastexport' or 'sql'.
+
+    'auto' picks FastExport for tables of at least FASTEXPORT_THRESHOLD_BYTES
+    perm space. FastExport is never used for tables with column types it
+    cannot return, or when the catalog cannot be read in 'auto' mode.
+    """
+    if extract_mode == 'sql':
+        return 'sql'
+    if extract_mode not in ('auto', 'fastexport'):
+        raise ValueError(f"Unknown extract mode: {extract_mode}")
+
+    table_filter, params = split_table_name(table_name)
+    cursor = teradata_conn.cursor()
+    try:
+        cursor.execute(f"""
+        SELECT ColumnName, ColumnType
+        FROM DBC.ColumnsV
+        WHERE {table_filter}
+          AND ColumnType IN ({', '.join("'" + column_type + "'" for column_type in FASTEXPORT_UNSUPPORTED_TYPES)})
+        """, params)
+        unsupported = [column_name.strip() for column_name, _ in cursor.fetchall()]
+        if unsupported:
+            logger.info(f"Extracting with SQL: FastExport cannot return {', '.join(unsupported)}")
+            return 'sql'
+
+        if extract_mode == 'auto':
+            cursor.execute(f"SELECT SUM(CurrentPerm) FROM DBC.TableSizeV WHERE {table_filter}", params)
+            table_bytes = cursor.fetchone()[0] or 0
+            if table_bytes < FASTEXPORT_THRESHOLD_BYTES:
+                return 'sql'
+    except Exception as e:
+        logger.warning(f"Could not check {table_name} for FastExport: {e}")
+        if extract_mode == 'auto':
+            return 'sql'
+    finally:
+        cursor.close()
+    return 'fastexport'
@@ -1,76 +1,128 @@
 from tabulate import tabulate
 from config.teradata import get_teradata_connection
-import teradatasql
+from config.connection_pool import pooled_connection
+from config.teradata import teradatasql
+from config.lazy_imports import driver_error
+from operations.catalog_cache import cached_catalog_query
 
-def show_databases():
+def show_databases(refresh=False):
     """
     Fetches and returns a list of all databases in Teradata.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_teradata_connection() as conn:
-            with conn.cursor() as cursor:
-                query = "SELECT DatabaseName FROM DBC.DatabasesV ORDER BY DatabaseName"
-                cursor.execute(query)
-                databases = cursor.fetchall()
-                return [db[0] for db in databases]
-    except teradatasql.Error as e:
+        query = "SELECT DatabaseName FROM DBC.DatabasesV ORDER BY DatabaseName"
+        _, databases = cached_catalog_query('teradata', 'databases', get_teradata_connection, query, refresh=refresh)
+        return [db[0] for db in databases]
+    except driver_error(teradatasql) as e:
         print("Error fetching databases from Teradata:", e)
         return []
 
 
-def show_tables(database_name):
+def show_tables(database_name, refresh=False):
     """
     Fetches and returns a list of all tables in a specific Teradata database.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_teradata_connection() as conn:
-            with conn.cursor() as cursor:
-                query = f"""
-                SELECT TableName
-                FROM DBC.TablesV
-                WHERE DatabaseName = '{database_name}'
-                ORDER BY TableName
-                """
-                cursor.execute(query)
-                tables = cursor.fetchall()
-                return [table[0] for table in tables]
-    except teradatasql.Error as e:
+        query = f"""
+        SELECT TableName
+        FROM DBC.TablesV
+        WHERE DatabaseName = '{database_name}'
+        ORDER BY TableName
+        """
+        _, tables = cached_catalog_query(
+            'teradata', f"tables:{database_name}", get_teradata_connection, query, refresh=refresh
+        )
+        return [table[0] for table in tables]
+    except driver_error(teradatasql) as e:
         print(f"Error fetching tables for database '{database_name}':", e)
         return []
 
 
-def show_roles():
+def show_roles(refresh=False):
     """
     Fetches and returns a list of roles in Teradata.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_teradata_connection() as conn:
-            with conn.cursor() as cursor:
-                query = "SELECT RoleName FROM DBC.RolesV ORDER BY RoleName"
-                cursor.execute(query)
-                roles = cursor.fetchall()
-                return [role[0] for role in roles]
-    except teradatasql.Error as e:
+        query = "SELECT RoleName FROM DBC.RolesV ORDER BY RoleName"
+        _, roles = cached_catalog_query('teradata', 'roles', get_teradata_connection, query, refresh=refresh)
+        return [role[0] for role in roles]
+    except driver_error(teradatasql) as e:
         print("Error fetching roles from Teradata:", e)
         return []
 
 
-def show_users():
+def show_users(refresh=False):
     """
     Fetches and returns a list of users in Teradata.
+    Served from the catalog cache unless refresh is set.
     """
     try:
-        with get_teradata_connection() as conn:
-            with conn.cursor() as cursor:
-                query = "SELECT UserName FROM DBC.UsersV ORDER BY UserName"
-                cursor.execute(query)
-                users = cursor.fetchall()
-                return [user[0] for user in users]
-    except teradatasql.Error as e:
+        query = "SELECT UserName FROM DBC.UsersV ORDER BY UserName"
+        _, users = cached_catalog_query('teradata', 'users', get_teradata_connection, query, refresh=refresh)
+        return [user[0] for user in users]
+    except driver_error(teradatasql) as e:
         print("Error fetching users from Teradata:", e)
         return []
 
 
+def get_table_sizes(database_name):
+    """
+    Fetches and returns {table name: current perm bytes} for the tables of a Teradata database.
+    """
+    try:
+        with pooled_connection(get_teradata_connection) as conn:
+            with conn.cursor() as cursor:
+                query = f"""
+                SELECT TableName, SUM(CurrentPerm)
+                FROM DBC.TableSizeV
+                WHERE DatabaseName = '{database_name}'
+                GROUP BY TableName
+                """
+                cursor.execute(query)
+                sizes = cursor.fetchall()
+                return {table: int(size or 0) for table, size in sizes}
+    except driver_error(teradatasql) as e:
+        print(f"Error fetching table sizes for database '{database_name}':", e)
+        return {}
+
+
+def get_unique_key_columns(database_name):
+    """
+    Fetches and returns {table name: [columns]} with a unique key for each table of a Teradata database.
+    Primary keys are preferred, then unique primary indexes, then other unique indexes.
+    """
+    preference = {'K': 0, 'P': 1, 'Q': 1, 'U': 2}
+    try:
+        with pooled_connection(get_teradata_connection) as conn:
+            with conn.cursor() as cursor:
+                query = f"""
+                SELECT TableName, IndexNumber, IndexType, ColumnName
+                FROM DBC.IndicesV
+                WHERE DatabaseName = '{database_name}'
+                  AND UniqueFlag = 'Y'
+                ORDER BY TableName, IndexNumber, ColumnPosition
+                """
+                cursor.execute(query)
+                rows = cursor.fetchall()
+    except driver_error(teradatasql) as e:
+        print(f"Error fetching unique keys for database '{database_name}':", e)
+        return {}
+
+    indexes = {}
+    for table_name, index_number, index_type, column_name in rows:
+        key = (table_name.strip(), index_number)
+        entry = indexes.setdefault(key, {'rank': preference.get(index_type.strip(), 3), 'columns': []})
+        entry['columns'].append(column_name.strip())
+
+    keys = {}
+    for (table_name, index_number), entry in sorted(indexes.items(), key=lambda item: item[1]['rank']):
+        keys.setdefault(table_name, entry['columns'])
+    return keys
+
+
 def print_results_in_table(title, data):
     """
     Prints data in a tabular format with a title.
@@ -0,0 +1,287 @@
+import os
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tabulate import tabulate
+from operations.teradata_operations import show_tables, get_table_sizes, get_unique_key_columns
+from operations.catalog_diff import compare_catalogs, apply_work_list, normalize_identifier
+from logs.migration_table_logs import setup_logger
+from logs.migration_checkpoints import CheckpointStore, DEFAULT_CHECKPOINT_PATH
+from scripts.migration_table import migrate_table_in_batches, batch_size_arg
+
+# Tables below this size are migrated as a single partition
+SMALL_TABLE_BYTES = 1024 * 1024 * 1024
+
+
+class SessionLimiter:
+    """
+    Counts sessions in use against a cap; acquire(n) takes n sessions atomically.
+    Any waiter whose request fits may proceed, so small tables fill the gaps
+    left next to a large table instead of queueing behind it.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.available = capacity
+        self.condition = threading.Condition()
+
+    def acquire(self, sessions):
+        sessions = min(sessions, self.capacity)
+        with self.condition:
+            while self.available < sessions:
+                self.condition.wait()
+            self.available -= sessions
+        return sessions
+
+    def release(self, sessions):
+        with self.condition:
+            self.available += sessions
+            self.condition.notify_all()
+
+
+def plan_delta(database_name, target_schema, logger):
+    """
+    Diff a Teradata database with its Snowflake schema, create the missing
+    target tables and columns, and return the work list of the delta.
+    """
+    diff = compare_catalogs('teradata', [database_name], target_schema=target_schema or os.getenv('SNOWFLAKE_SCHEMA'))
+    created = apply_work_list(diff['work'], actions=('create_table', 'add_column'))
+    if created:
+        logger.info(f"Created {created} missing Snowflake table(s) and column(s)")
+    return diff['work']
+
+
+def unfinished_tables(checkpoint_path):
+    """
+    Return the (source_table, target_table) pairs, normalized, whose last
+    migration run in the checkpoint store was left unfinished.
+    """
+    checkpoint_store = CheckpointStore(checkpoint_path)
+    try:
+        return {
+            (normalize_identifier(source_table), normalize_identifier(target_table))
+            for source_table, target_table in checkpoint_store.unfinished_runs()
+        }
+    finally:
+        checkpoint_store.close()
+
+
+def plan_tables(database_name, target_schema=None, tables=None, delta=None, unfinished=(), resume=False):
+    """
+    Enumerate and size the tables of a Teradata database, largest first.
+    With a delta work list (see plan_delta) only tables it has migrate_table work for are planned.
+    The catalog diff cannot tell a partly loaded table from a complete one
+    (Teradata snapshots carry no row counts), so tables in unfinished (see
+    unfinished_tables) are planned with resume, or reported otherwise.
+    Returns the plan entries and the objects that cannot be migrated.
+    """
+    table_names = [table.strip() for table in show_tables(database_name)]
+    if tables:
+        wanted = {table.lower() for table in tables}
+        table_names = [table for table in table_names if table.lower() in wanted]
+
+    sizes = get_table_sizes(database_name)
+    sizes = {table.strip(): size for table, size in sizes.items()}
+    keys = get_unique_key_columns(database_name)
+    pending = {
+        normalize_identifier(item['source_table']): item['action']
+        for item in delta or [] if item['action'] in ('migrate_table', 'sync_table')
+    }
+
+    plan = []
+    skipped = []
+    for table_name in table_names:
+        if table_name not in sizes:
+            # Views and other objects without perm space
+            skipped.append((table_name, 'not a table'))
+            continue
+        if table_name not in keys:
+            skipped.append((table_name, 'no unique key for keyset pagination'))
+            continue
+        target_table = f"{target_schema}.{table_name}" if target_schema else table_name
+        if delta is not None:
+            action = pending.get(normalize_identifier(f"{database_name}.{table_name}"))
+            run = (normalize_identifier(f"{database_name}.{table_name}"), normalize_identifier(target_table))
+            if run in unfinished:
+                if not resume:
+                    skipped.append((table_name, 'partly migrated by an unfinished run; rerun with --resume'))
+                    continue
+                action = 'migrate_table'
+            if action is None:
+                skipped.append((table_name, 'already in Snowflake'))
+                continue
+            if action == 'sync_table':
+                skipped.append((table_name, 'row counts differ from Snowflake; reconcile it with sync_table'))
+                continue
+
+        plan.append({
+            'source_table': f"{database_name}.{table_name}",
+            'target_table': target_table,
+            'sort_columns': keys[table_name],
+            'bytes': sizes[table_name]
+        })
+
+    plan.sort(key=lambda entry: entry['bytes'], reverse=True)
+    return plan, skipped
+
+
+def migrate_database(
+        database_name,
+        target_schema=None,
+        tables=None,
+        max_tables=4,
+        jobs=4,
+        max_source_sessions=8,
+        max_target_sessions=8,
+        small_table_bytes=SMALL_TABLE_BYTES,
+        delta=False,
+        **table_options
+):
+    """
+    Migrate every table of a Teradata database to Snowflake.
+
+    Tables are scheduled largest first on a pool of max_tables workers. Large
+    tables are split into `jobs` partitions, small ones run as one partition,
+    and each table reserves its sessions against the per-source and per-target
+    caps before it starts. With delta, the database is first diffed with
+    Snowflake, missing target tables and columns are created and only tables
+    that are missing or empty in Snowflake, or left unfinished by an earlier
+    run (with resume), are migrated, so re-runs only touch what is left.
+    table_options are passed to migrate_table_in_batches.
+    Returns the per-table results.
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    log_dir = os.path.normpath(os.path.join(current_dir, '../logs'))
+    log_file = f'migration_database_{database_name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    logger = setup_logger(os.path.join(log_dir, log_file), f'migration_database_{database_name}')
+
+    delta_work = plan_delta(database_name, target_schema, logger) if delta else None
+    unfinished = unfinished_tables(table_options.get('checkpoint_path', DEFAULT_CHECKPOINT_PATH)) if delta else ()
+    plan, skipped = plan_tables(
+        database_name, target_schema, tables, delta_work, unfinished, table_options.get('resume', False)
+    )
+    for table_name, reason in skipped:
+        logger.warning(f"Skipping {database_name}.{table_name}: {reason}")
+    logger.info(f"Migrating {len(plan)} table(s) from {database_name}, largest first")
+
+    source_limiter = SessionLimiter(max_source_sessions)
+    target_limiter = SessionLimiter(max_target_sessions)
+    load_threads = table_options.get('load_threads', 1) if table_options.get('pipeline') else 1
+
+    def run_table(entry):
+        # Every partition holds one Teradata session and load_threads Snowflake sessions
+        table_jobs = jobs if entry['bytes'] >= small_table_bytes else 1
+        table_jobs = max(1, min(table_jobs, max_source_sessions, max_target_sessions // load_threads))
+        source_sessions = source_limiter.acquire(table_jobs)
+        target_sessions = target_limiter.acquire(table_jobs * load_threads)
+        try:
+            logger.info(f"Starting {entry['source_table']} ({entry['bytes']} bytes, {table_jobs} job(s))")
+            return migrate_table_in_batches(
+                source_table=entry['source_table'],
+                target_table=entry['target_table'],
+                sort_column=entry['sort_columns'],
+                jobs=table_jobs,
+                **table_options
+            )
+        finally:
+            target_limiter.release(target_sessions)
+            source_limiter.release(source_sessions)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_tables)) as executor:
+        futures = {executor.submit(run_table, entry): entry for entry in plan}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {
+                    'source_table': entry['source_table'],
+                    'target_table': entry['target_table'],
+                    'rows': 0,
+                    'seconds': 0.0,
+                    'error': str(e)
+                }
+            result['bytes'] = entry['bytes']
+            results.append(result)
+            status = f"failed: {result['error']}" if result['error'] else 'completed'
+            logger.info(f"{result['source_table']} {status}")
+
+    log_run_summary(logger, results)
+    return results
+
+
+def log_run_summary(logger, results):
+    """
+    Log per-table duration and throughput of a database migration.
+    """
+    rows = []
+    for result in sorted(results, key=lambda item: item['seconds'], reverse=True):
+        rows_per_second = result['rows'] / result['seconds'] if result['seconds'] else 0
+        rows.append([
+            result['source_table'],
+            result['target_table'],
+            result['rows'],
+            f"{result['seconds']:.1f}",
+            f"{rows_per_second:.0f}",
+            'FAILED' if result['error'] else 'OK'
+        ])
+
+    headers = ["Source", "Target", "Rows", "Seconds", "Rows/sec", "Status"]
+    logger.info("Run summary:\n" + tabulate(rows, headers=headers, tablefmt="grid"))
+
+    failed = sum(1 for result in results if result['error'])
+    total_rows = sum(result['rows'] for result in results)
+    logger.info(f"{len(results) - failed} table(s) migrated, {failed} failed, {total_rows} rows in total")
+
+
+def parse_args():
+    """
+    Parse command line arguments for a database migration
+    """
+    parser = argparse.ArgumentParser(description="Migrate all tables of a Teradata database to Snowflake")
+    parser.add_argument('--database', required=True, help="Teradata database to migrate")
+    parser.add_argument('--target-schema', default=None, help="Snowflake schema for the target tables")
+    parser.add_argument('--tables', nargs='*', default=None, help="Only migrate these tables")
+    parser.add_argument('--max-tables', type=int, default=4, help="Tables migrated concurrently")
+    parser.add_argument('--jobs', type=int, default=4, help="Partitions per large table")
+    parser.add_argument('--max-source-sessions', type=int, default=8)
+    parser.add_argument('--max-target-sessions', type=int, default=8)
+    parser.add_argument('--batch-size', type=batch_size_arg, default='auto')
+    parser.add_argument('--load-mode', choices=['auto', 'insert', 'copy'], default='auto')
+    parser.add_argument('--pipeline', action='store_true')
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--resume-delete-all', action='store_true',
+                        help="Let --resume empty targets whose rows no checkpoint bounds")
+    parser.add_argument('--validate', action='store_true', help="Compare exact row counts after each table")
+    parser.add_argument('--delta', action='store_true',
+                        help="Only migrate tables missing or empty in Snowflake, creating missing tables first")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile every table; profiles are written next to the table logs")
+    parser.add_argument('--metrics-format', choices=['prometheus', 'jsonl'], default=None,
+                        help="Export per-table stage metrics to logs/metrics")
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    migrate_database(
+        database_name=args.database,
+        target_schema=args.target_schema,
+        tables=args.tables,
+        max_tables=args.max_tables,
+        jobs=args.jobs,
+        max_source_sessions=args.max_source_sessions,
+        max_target_sessions=args.max_target_sessions,
+        batch_size=args.batch_size,
+        load_mode=args.load_mode,
+        pipeline=args.pipeline,
+        resume=args.resume,
+        resume_delete_all=args.resume_delete_all,
+        validate=args.validate,
+        metrics_format=args.metrics_format,
+        profile=args.profile,
+        delta=args.delta
+    )
@@ -1,4 +1,5 @@
 import os
+import time
 import logging
 from operations.sql_server_operations import (
     show_roles_sql_server,
@@ -9,8 +10,13 @@ from operations.snowflake_operations import (
     show_roles_snowflake,
     show_users_snowflake
 )
-from config.sql_server import get_sql_server_connection
+from config.sql_server import sql_server_database_connection
 from config.snowflake import get_snowflake_connection
+from config.connection_pool import pooled_connection
+from operations.catalog_cache import get_catalog_cache
+from operations.catalog_diff import normalize_identifier
+from operations.catalog_snapshot import sql_in
+from logs.migration_metrics import create_metrics
 
 # Ensure the 'scripts/logs' folder exists
 log_folder = 'C:/Users/Lenovo/PycharmProjects/Teradata_Snowflake/scripts/logs'
@@ -35,12 +41,13 @@ logger = logging.getLogger(__name__)
 
 def get_sql_server_roles(sql_conn, database_name):
     """
-    Fetch all roles and their privileges from SQL Server
+    Fetch all roles and their privileges from SQL Server. sql_conn must be
+    connected to database_name (see sql_server_database_connection), so no
+    USE switches a pooled connection to another database.
     """
     try:
         with sql_conn.cursor() as cursor:
             # Get roles
-            cursor.execute(f"USE [{database_name}]")
             query = """
             SELECT 
                 dp.name AS role_name,
@@ -63,22 +70,79 @@ def get_sql_server_roles(sql_conn, database_name):
         raise
 
 
-def create_snowflake_role(snow_conn, role_name):
+def load_snowflake_roles(snow_conn):
     """
-    Create a role in Snowflake
+    Fetch the names of all Snowflake roles in one SHOW ROLES, normalized
     """
+    with snow_conn.cursor() as cursor:
+        cursor.execute("SHOW ROLES")
+        # Role names are in the second column
+        return {normalize_identifier(row[1]) for row in cursor.fetchall()}
+
+
+def current_database(snow_conn):
+    """
+    Return the database that unqualified schema.object names resolve to on a Snowflake connection
+    """
+    with snow_conn.cursor() as cursor:
+        cursor.execute("SELECT CURRENT_DATABASE()")
+        return cursor.fetchone()[0]
+
+
+def grant_key(privilege, object_name, database=None):
+    """
+    Key of a table grant for comparing a GRANT statement with the granted
+    objects of a role: the privilege and the database, schema and object of
+    the object name, in database unless it is fully qualified
+    """
+    parts = [normalize_identifier(part) for part in object_name.split('.')]
+    if len(parts) < 3:
+        parts = [normalize_identifier(database)] + parts[-2:]
+    return (privilege.upper(),) + tuple(parts[-3:])
+
+
+def load_snowflake_grants(snow_conn, role_names):
+    """
+    Fetch the object grants held by the given Snowflake roles in one
+    ACCOUNT_USAGE.GRANTS_TO_ROLES query, as catalog snapshots do. The view
+    lags by up to two hours, so grants issued since may be issued again,
+    which GRANT tolerates.
+    Returns {normalized role name: set of grant keys}
+    """
+    grants = {normalize_identifier(role_name): set() for role_name in role_names}
+    if not grants:
+        return grants
+    with snow_conn.cursor() as cursor:
+        cursor.execute(f"""
+        SELECT GRANTEE_NAME, PRIVILEGE, TABLE_CATALOG, TABLE_SCHEMA, NAME
+        FROM SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_ROLES
+        WHERE DELETED_ON IS NULL AND GRANTED_TO = 'ROLE' AND TABLE_SCHEMA IS NOT NULL
+        AND GRANTEE_NAME {sql_in(grants)}
+        """)
+        for role_name, privilege, database, schema, name in cursor.fetchall():
+            grants[normalize_identifier(role_name)].add(grant_key(privilege, f"{database}.{schema}.{name}"))
+    return grants
+
+
+def create_snowflake_role(snow_conn, role_name, existing_roles=None):
+    """
+    Create a role in Snowflake unless it is in existing_roles (normalized names,
+    see load_snowflake_roles), which is updated. Returns True if the role was created;
+    the caller then drops the cached Snowflake roles, once for all roles it creates.
+    """
+    if existing_roles is not None and normalize_identifier(role_name) in existing_roles:
+        logger.info(f"Role already exists: {role_name}")
+        return False
     try:
         with snow_conn.cursor() as cursor:
-            # Check if role exists
-            cursor.execute(f"SHOW ROLES LIKE '{role_name}'")
-            if not cursor.fetchone():
-                cursor.execute(f"CREATE ROLE IF NOT EXISTS {role_name}")
-                logger.info(f"Created role: {role_name}")
-            else:
-                logger.info(f"Role already exists: {role_name}")
+            cursor.execute(f"CREATE ROLE IF NOT EXISTS {role_name}")
+            logger.info(f"Created role: {role_name}")
     except Exception as e:
         logger.error(f"Error creating Snowflake role {role_name}: {str(e)}")
         raise
+    if existing_roles is not None:
+        existing_roles.add(normalize_identifier(role_name))
+    return True
 
 
 def map_sql_server_to_snowflake_privileges(permission_name, state_desc):
@@ -103,10 +167,34 @@ def map_sql_server_to_snowflake_privileges(permission_name, state_desc):
     return f"GRANT {privilege}"
 
 
-def grant_snowflake_privileges(snow_conn, role_name, schema_name, object_name, privilege):
+def grant_satisfied(existing_grants, schema_name, object_name, privilege, database=None):
+    """
+    Check whether a 'GRANT <privilege>' is already held, or a 'REVOKE <privilege>'
+    has nothing to revoke, according to the grant keys of a role; schema_name
+    is in database (see grant_key).
+    Schema-wide grants cannot be checked against single object grants and are never satisfied.
+    """
+    if existing_grants is None or not (schema_name and object_name):
+        return False
+    action, _, privilege_name = privilege.partition(' ')
+    key = grant_key(privilege_name, f"{schema_name}.{object_name}", database)
+    return (key in existing_grants) == (action == 'GRANT')
+
+
+def grant_snowflake_privileges(
+        snow_conn, role_name, schema_name, object_name, privilege, existing_grants=None, database=None
+):
     """
-    Grant privileges to a role in Snowflake
+    Grant privileges to a role in Snowflake. With existing_grants (the grant
+    keys the role holds, see load_snowflake_grants), which is updated,
+    statements that are already satisfied are skipped; database is the
+    current database of snow_conn (see current_database).
+    Returns True if a statement was issued.
     """
+    if grant_satisfied(existing_grants, schema_name, object_name, privilege, database):
+        logger.info(f"Already satisfied: {privilege} ON {schema_name}.{object_name} TO ROLE {role_name}")
+        return False
+
     try:
         with snow_conn.cursor() as cursor:
             if schema_name and object_name:
@@ -120,58 +208,105 @@ def grant_snowflake_privileges(snow_conn, role_name, schema_name, object_name, p
         logger.error(f"Error granting privilege to role {role_name}: {str(e)}")
         raise
 
+    if existing_grants is not None and schema_name and object_name:
+        action, _, privilege_name = privilege.partition(' ')
+        key = grant_key(privilege_name, f"{schema_name}.{object_name}", database)
+        if action == 'GRANT':
+            existing_grants.add(key)
+        else:
+            existing_grants.discard(key)
+    return True
 
-def migrate_roles(source_db_name):
+
+def migrate_roles(source_db_name, metrics_format=None, metrics_path=None):
     """
-    Main function to migrate roles from SQL Server to Snowflake
+    Main function to migrate roles from SQL Server to Snowflake.
+    Snowflake roles and the grants of the migrated roles are loaded once up
+    front, so only missing roles are created and only grants that are not yet
+    satisfied are issued; re-runs issue nothing for what is already in place.
+    Timings of the fetches and of every CREATE ROLE and GRANT are logged
+    per stage and exported when metrics_format is 'prometheus' or 'jsonl'.
     """
     logger.info("Starting role migration process...")
-
-    # Get connections
-    sql_conn = get_sql_server_connection()
-    snow_conn = get_snowflake_connection()
+    metrics = create_metrics(f"roles_{source_db_name}", metrics_format, metrics_path)
+    created = 0
 
     try:
-        # Get all SQL Server roles and their privileges
-        sql_server_roles = get_sql_server_roles(sql_conn, source_db_name)
-
-        # Process each role
-        current_role = None
-        for role_data in sql_server_roles:
-            role_name, role_type, schema_name, object_name, permission_name, state_desc = role_data
-
-            # Create role in Snowflake if it's a new role
-            if current_role != role_name:
-                create_snowflake_role(snow_conn, role_name)
-                current_role = role_name
-
-            # Skip if no permissions are assigned
-            if not permission_name:
-                continue
-
-            # Map and grant privileges
-            snowflake_privilege = map_sql_server_to_snowflake_privileges(
-                permission_name,
-                state_desc
-            )
+        # Get all SQL Server roles and their privileges, on a connection to the source database
+        start = time.time()
+        with pooled_connection(sql_server_database_connection(source_db_name)) as sql_conn:
+            sql_server_roles = get_sql_server_roles(sql_conn, source_db_name)
+        metrics.observe('fetch_roles', time.time() - start, rows=len(sql_server_roles))
 
-            # Grant privileges to Snowflake
-            grant_snowflake_privileges(
-                snow_conn,
-                role_name,
-                schema_name,  # Use schema_name from the query results
-                object_name,
-                snowflake_privilege
+        with pooled_connection(get_snowflake_connection) as snow_conn:
+            # Load the Snowflake side once: all roles, and the grants of the roles being migrated
+            start = time.time()
+            existing_roles = load_snowflake_roles(snow_conn)
+            database = current_database(snow_conn)
+            source_roles = {role_data[0] for role_data in sql_server_roles}
+            existing_grants = load_snowflake_grants(
+                snow_conn, sorted(role for role in source_roles if normalize_identifier(role) in existing_roles)
+            )
+            metrics.observe(
+                'fetch_snowflake_grants', time.time() - start, rows=sum(len(keys) for keys in existing_grants.values())
             )
 
-        logger.info("Role migration completed successfully")
+            # Process each role
+            current_role = None
+            issued = skipped = 0
+            for role_data in sql_server_roles:
+                role_name, role_type, schema_name, object_name, permission_name, state_desc = role_data
+                role_grants = existing_grants.setdefault(normalize_identifier(role_name), set())
+
+                # Create role in Snowflake if it's a new role
+                if current_role != role_name:
+                    if normalize_identifier(role_name) in existing_roles:
+                        logger.info(f"Role already exists: {role_name}")
+                        skipped += 1
+                    else:
+                        with metrics.timer('create_role', role=role_name):
+                            create_snowflake_role(snow_conn, role_name, existing_roles)
+                        issued += 1
+                        created += 1
+                    current_role = role_name
+
+                # Skip if no permissions are assigned
+                if not permission_name:
+                    continue
+
+                # Map and grant privileges
+                snowflake_privilege = map_sql_server_to_snowflake_privileges(
+                    permission_name,
+                    state_desc
+                )
+
+                # Grant privileges to Snowflake unless already satisfied
+                if grant_satisfied(role_grants, schema_name, object_name, snowflake_privilege, database):
+                    skipped += 1
+                    continue
+                with metrics.timer('grant', role=role_name):
+                    grant_snowflake_privileges(
+                        snow_conn,
+                        role_name,
+                        schema_name,  # Use schema_name from the query results
+                        object_name,
+                        snowflake_privilege,
+                        role_grants,
+                        database
+                    )
+                issued += 1
+
+        logger.info(f"Role migration completed successfully: {issued} statement(s) issued, {skipped} already satisfied")
+        metrics.log_summary(logger)
 
     except Exception as e:
         logger.error(f"Error during role migration: {str(e)}")
         raise
     finally:
-        sql_conn.close()
-        snow_conn.close()
+        # Drop the cached Snowflake roles once, also when a later statement failed
+        if created:
+            get_catalog_cache().invalidate('snowflake', 'roles')
+        metrics.close()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 import pandas as pd
 import logging
+import time
 from config.snowflake import get_snowflake_connection
 from config.sql_server import get_sql_server_connection
+from config.connection_pool import pooled_connection
+from logs.migration_metrics import create_metrics
 import os
 
 # Define the file path for your Excel file
@@ -49,12 +52,18 @@ def log_query_status(query_type, query, status, error_message=None):
         if error_message:
             logger.error(f"Error: {error_message}")
 
-def run_snowflake_queries(excel_file_path, sheet_name="Test"):
+def run_snowflake_queries(excel_file_path, sheet_name="Test", metrics_format=None, metrics_path=None):
     """
     Reads and executes Snowflake queries from the specified sheet in the Excel file.
+    The time of every query is logged per stage and exported when
+    metrics_format is 'prometheus' or 'jsonl'.
     """
+    metrics = create_metrics(f"excel_{sheet_name}", metrics_format, metrics_path)
+
     # Read the specified sheet from the Excel file
+    start = time.time()
     df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
+    metrics.observe('read_excel', time.time() - start, rows=len(df))
 
     # Clean column names to avoid issues with spaces or hidden characters
     df.columns = df.columns.str.strip()
@@ -63,21 +72,23 @@ def run_snowflake_queries(excel_file_path, sheet_name="Test"):
     if "Snowflake Query" not in df.columns:
         raise ValueError(f"The sheet '{sheet_name}' must contain a 'Snowflake Query' column.")
 
-    # Connect to Snowflake
-    snowflake_conn = get_snowflake_connection()
-
+    # Check out a pooled Snowflake connection
     try:
-        with snowflake_conn.cursor() as cursor:
+        with pooled_connection(get_snowflake_connection) as snowflake_conn, snowflake_conn.cursor() as cursor:
             for query in df["Snowflake Query"]:
                 if pd.notna(query):  # Skip empty queries
+                    start = time.time()
                     try:
                         logger.info(f"Executing Snowflake Query: {query}")
                         cursor.execute(query)
                         log_query_status('Snowflake', query, 'success')
+                        metrics.observe('snowflake_query', time.time() - start, rows=1)
                     except Exception as e:
                         log_query_status('Snowflake', query, 'failure', str(e))
+                        metrics.observe('snowflake_query', time.time() - start, rows=1, error=True)
+        metrics.log_summary(logger)
     finally:
-        snowflake_conn.close()
+        metrics.close()
 
 
 # def run_sql_server_queries(excel_file_path, sheet_name="Test"):
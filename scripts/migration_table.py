@@ -1,15 +1,38 @@
 import os
+import sys
 import logging
 from dotenv import load_dotenv
 from datetime import datetime
 import time
+import argparse
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
 from config.teradata import get_teradata_connection
 from config.snowflake import get_snowflake_connection
-from logs.migration_table_logs import  setup_logger
+from config.connection_pool import get_pool, pooled_connection
+from logs.migration_table_logs import  setup_logger, close_logger
+from logs.migration_checkpoints import CheckpointStore, DEFAULT_CHECKPOINT_PATH
+from logs.migration_metrics import MigrationMetrics, create_metrics
+from logs.migration_profiling import MigrationProfiler, no_profile
+from operations.teradata_extract import (
+    iter_row_chunks, estimate_batch_bytes, split_table_name, choose_extract_mode,
+    DEFAULT_FETCH_SIZE, DEFAULT_MAX_BATCH_BYTES, FASTEXPORT_ESCAPE
+)
+from operations.batch_tuning import (
+    BatchSizeTuner, load_batch_size_hint, save_batch_size_hint, DEFAULT_HINTS_PATH
+)
+from operations.snowflake_load import choose_load_mode, create_loader, prepare_batch, DEFAULT_TARGET_FILE_SIZE
+from operations.arrow_batches import ArrowBatchBuilder
+
+# Per-row overhead of a Teradata row (row length, row id, flags and presence bits)
+ROW_OVERHEAD_BYTES = 14
+
 
 def get_total_row_count(teradata_conn, table_name, logger):
     """
-    Get total row count of the source table
+    Get the exact row count of a table (a full scan on large tables)
     """
     try:
         cursor = teradata_conn.cursor()
@@ -21,86 +44,535 @@ def get_total_row_count(teradata_conn, table_name, logger):
         logger.error(f"Error getting row count: {e}")
         raise
 
-def migrate_table_in_batches(
+def estimate_row_count(teradata_conn, table_name, logger):
+    """
+    Estimate the row count of the source table from the catalog instead of scanning it.
+    Uses the row count of the most recently collected statistics, falling back
+    to current perm space divided by the declared row width.
+    Returns (rows, source), with rows None when no estimate is available.
+    """
+    table_filter, params = split_table_name(table_name)
+
+    cursor = teradata_conn.cursor()
+    try:
+        cursor.execute(f"""
+        SELECT TOP 1 RowCount
+        FROM DBC.StatsV
+        WHERE {table_filter} AND RowCount IS NOT NULL
+        ORDER BY LastCollectTimeStamp DESC
+        """, params)
+        row = cursor.fetchone()
+        if row and row[0]:
+            return int(row[0]), 'collected statistics'
+
+        cursor.execute(f"""
+        SELECT SUM(CurrentPerm)
+        FROM DBC.TableSizeV
+        WHERE {table_filter}
+        """, params)
+        perm = cursor.fetchone()[0]
+        cursor.execute(f"""
+        SELECT SUM(ColumnLength)
+        FROM DBC.ColumnsV
+        WHERE {table_filter}
+        """, params)
+        row_width = cursor.fetchone()[0]
+        if perm and row_width:
+            # Rough: VARCHAR columns count at their maximum length and compression is ignored
+            return int(perm) // (int(row_width) + ROW_OVERHEAD_BYTES), 'table size'
+    except Exception as e:
+        logger.warning(f"Could not read catalog statistics for {table_name}: {e}")
+    finally:
+        cursor.close()
+    return None, 'unavailable'
+
+
+def validate_row_counts(source_table, target_table, logger):
+    """
+    Compare exact source and target row counts after a migration.
+    Returns (source_rows, target_rows).
+    """
+    with pooled_connection(get_teradata_connection) as teradata_conn:
+        source_rows = get_total_row_count(teradata_conn, source_table, logger)
+
+    with pooled_connection(get_snowflake_connection) as snowflake_conn:
+        target_rows = get_total_row_count(snowflake_conn, target_table, logger)
+
+    if source_rows == target_rows:
+        logger.info(f"Row count validated: {source_rows} rows in source and target")
+    else:
+        logger.error(f"Row count mismatch: {source_rows} rows in {source_table}, {target_rows} in {target_table}")
+    return source_rows, target_rows
+
+
+def normalize_sort_columns(sort_column):
+    """
+    Normalize the sort key to a list of column names.
+    Accepts a single column, a comma separated string or a list/tuple of columns.
+    """
+    if isinstance(sort_column, str):
+        columns = [column.strip() for column in sort_column.split(',')]
+    else:
+        columns = [str(column).strip() for column in sort_column]
+
+    columns = [column for column in columns if column]
+    if not columns:
+        raise ValueError("At least one sort column is required for keyset pagination.")
+    return columns
+
+
+def build_keyset_predicate(sort_columns, last_key, placeholder='?'):
+    """
+    Build the predicate that seeks past last_key in sort_columns order.
+    Teradata has no row value comparison, so (a, b) > (x, y) is expanded to
+    a >= x AND (a > x OR (a = x AND b > y)); the leading range term lets the
+    optimizer drive the batch as a range read on the first key column.
+    Returns the SQL fragment and its bind parameters.
+    """
+    if last_key is None:
+        return "", []
+
+    if len(sort_columns) == 1:
+        return f"{sort_columns[0]} > {placeholder}", [last_key[0]]
+
+    terms = []
+    params = [last_key[0]]
+    for position, column in enumerate(sort_columns):
+        conditions = [f"{sort_columns[i]} = {placeholder}" for i in range(position)]
+        conditions.append(f"{column} > {placeholder}")
+        terms.append(f"({' AND '.join(conditions)})")
+        params.extend(last_key[:position + 1])
+
+    predicate = f"{sort_columns[0]} >= {placeholder} AND ({' OR '.join(terms)})"
+    return predicate, params
+
+
+def build_keyset_query(source_table, sort_columns, batch_size, last_key=None, partition=None, select_columns=None):
+    """
+    Build the query for the next batch after last_key (None for the first batch).
+    When a partition is given its predicate restricts the read to that key range.
+    select_columns limits the columns read (default: all). batch_size None
+    reads the rest of the table or partition in one query.
+    """
+    predicate, params = build_keyset_predicate(sort_columns, last_key)
+
+    conditions = []
+    if partition and partition['predicate']:
+        conditions.append(f"({partition['predicate']})")
+        params = list(partition['params']) + params
+    if predicate:
+        conditions.append(predicate)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = f"""
+    SELECT {f'TOP {batch_size} ' if batch_size else ''}{', '.join(select_columns) if select_columns else '*'} FROM {source_table}
+    {where_clause}
+    ORDER BY {', '.join(sort_columns)}
+    """
+    return query, params
+
+
+def get_key_positions(columns, sort_columns):
+    """
+    Return the positions of the sort columns in the result set columns.
+    """
+    lookup = {column.lower(): position for position, column in enumerate(columns)}
+    missing = [column for column in sort_columns if column.lower() not in lookup]
+    if missing:
+        raise ValueError(f"Sort column(s) not found in source table: {', '.join(missing)}")
+    return [lookup[column.lower()] for column in sort_columns]
+
+
+def get_key_range(teradata_conn, table_name, column, logger):
+    """
+    Get the MIN and MAX value of a column in the source table
+    """
+    try:
+        cursor = teradata_conn.cursor()
+        cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table_name}")
+        min_value, max_value = cursor.fetchone()
+        cursor.close()
+        return min_value, max_value
+    except Exception as e:
+        logger.error(f"Error getting key range: {e}")
+        raise
+
+
+def split_key_range(min_value, max_value, partitions):
+    """
+    Split [min_value, max_value] into contiguous boundaries for the given number of partitions.
+    Supports integer, decimal, float, date and timestamp keys.
+    """
+    if isinstance(min_value, datetime):
+        span = (max_value - min_value) / partitions
+        return [min_value + span * i for i in range(1, partitions)]
+    if hasattr(min_value, 'toordinal'):
+        # DATE keys are split on whole days
+        span = (max_value.toordinal() - min_value.toordinal()) / partitions
+        return [min_value.fromordinal(int(min_value.toordinal() + span * i)) for i in range(1, partitions)]
+    if isinstance(min_value, (int, float, Decimal)):
+        span = (max_value - min_value) / partitions
+        if isinstance(min_value, int):
+            return [min_value + int(span * i) for i in range(1, partitions)]
+        return [min_value + span * i for i in range(1, partitions)]
+    raise ValueError(
+        f"Cannot split a key range of type {type(min_value).__name__}; use partition_method='hash'."
+    )
+
+
+def build_partitions(teradata_conn, source_table, sort_columns, partitions, partition_method, logger):
+    """
+    Build the partition predicates used to migrate a table concurrently.
+
+    'range' splits MIN/MAX of the leading sort column into contiguous key ranges.
+    'hash' assigns rows to partitions by Teradata row hash bucket, which spreads
+    every partition across all AMPs regardless of key skew.
+    """
+    if partitions <= 1:
+        return [{'index': 0, 'predicate': None, 'params': []}]
+
+    if partition_method == 'hash':
+        hash_expression = f"HASHBUCKET(HASHROW({', '.join(sort_columns)})) MOD {partitions}"
+        return [
+            {'index': index, 'predicate': f"{hash_expression} = {index}", 'params': []}
+            for index in range(partitions)
+        ]
+
+    if partition_method != 'range':
+        raise ValueError(f"Unknown partition method: {partition_method}")
+
+    key_column = sort_columns[0]
+    min_value, max_value = get_key_range(teradata_conn, source_table, key_column, logger)
+    if min_value is None:
+        return [{'index': 0, 'predicate': None, 'params': []}]
+
+    # Drop duplicate boundaries produced by narrow key ranges
+    boundaries = []
+    for boundary in split_key_range(min_value, max_value, partitions):
+        if min_value < boundary and boundary not in boundaries:
+            boundaries.append(boundary)
+
+    result = []
+    lower = None
+    for index, upper in enumerate(boundaries + [None]):
+        conditions = []
+        params = []
+        if lower is not None:
+            conditions.append(f"{key_column} >= ?")
+            params.append(lower)
+        if upper is not None:
+            conditions.append(f"{key_column} < ?")
+            params.append(upper)
+        result.append({'index': index, 'predicate': ' AND '.join(conditions) or None, 'params': params})
+        lower = upper
+    return result
+
+
+class MigrationProgress:
+    """
+    Thread-safe migrated row counter shared by the partition workers.
+    """
+
+    def __init__(self, total_rows, logger, migrated_rows=0, estimated=False):
+        self.total_rows = total_rows
+        self.estimated = estimated
+        self.migrated_rows = migrated_rows
+        self.logger = logger
+        self.lock = threading.Lock()
+
+    def add(self, rows):
+        with self.lock:
+            self.migrated_rows += rows
+            migrated_rows = self.migrated_rows
+
+        if self.total_rows:
+            approx = '~' if self.estimated else ''
+            self.logger.info(
+                f"Migrated {migrated_rows}/{approx}{self.total_rows} rows "
+                f"({approx}{migrated_rows / self.total_rows * 100:.2f}%)"
+            )
+        else:
+            self.logger.info(f"Migrated {migrated_rows} rows")
+
+
+class MigrationContext:
+    """
+    Settings and shared state of one table migration, handed to every partition worker.
+    """
+
+    def __init__(
+            self,
+            source_table,
+            target_table,
+            sort_columns,
+            batch_size,
+            progress,
+            logger,
+            checkpoint_store,
+            load_mode='insert',
+            load_options=None,
+            fetch_size=DEFAULT_FETCH_SIZE,
+            max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+            pipeline_stats=None,
+            tuning_options=None,
+            data_format='rows',
+            extract_mode='sql',
+            metrics=None,
+            profiler=None
+    ):
+        self.source_table = source_table
+        self.target_table = target_table
+        self.sort_columns = sort_columns
+        self.batch_size = batch_size
+        self.progress = progress
+        self.logger = logger
+        self.checkpoint_store = checkpoint_store
+        self.load_mode = load_mode
+        self.load_options = load_options or {}
+        self.fetch_size = fetch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.pipeline_stats = pipeline_stats
+        self.tuning_options = tuning_options
+        self.data_format = data_format
+        self.extract_mode = extract_mode
+        self.metrics = metrics or MigrationMetrics(f"migration_{source_table}")
+        self.profiler = profiler
+        self.tuners = []
+        self.lock = threading.Lock()
+
+    def stage(self, name):
+        """
+        Context manager profiling a block of a stage when profiling is on.
+        """
+        return self.profiler.stage(name) if self.profiler else no_profile(name)
+
+    def create_builder(self, teradata_cursor):
+        """
+        Create the Arrow batch builder of a partition from its result set description,
+        or None when batches travel as rows.
+        """
+        if self.data_format != 'arrow':
+            return None
+        return ArrowBatchBuilder(teradata_cursor.description)
+
+    def create_tuner(self, partition):
+        """
+        Create the batch size tuner of a partition when adaptive batch sizing is on.
+        FastExport reads a partition in one query, so there is nothing to tune.
+        """
+        if not self.tuning_options or self.extract_mode == 'fastexport':
+            return None
+
+        tuner = BatchSizeTuner(
+            initial_size=self.batch_size,
+            max_batch_bytes=self.max_batch_bytes,
+            overlapped=self.pipeline_stats is not None,
+            logger=self.logger,
+            name=f"partition {partition['index']}",
+            **self.tuning_options
+        )
+        with self.lock:
+            self.tuners.append(tuner)
+        return tuner
+
+
+class CheckpointTracker:
+    """
+    Advances a partition's checkpoint as its batches are committed in Snowflake.
+
+    Batches can commit out of order (pipelined load threads, staged file
+    groups), so the checkpoint only moves past a batch once every earlier
+    batch of the partition has been committed as well.
+    """
+
+    def __init__(self, context, partition):
+        self.context = context
+        self.partition_index = partition['index']
+        self.migrated_rows = partition.get('migrated_rows', 0)
+        self.lock = threading.Lock()
+        self.next_sequence = 0
+        self.committed_sequence = -1
+        self.pending = {}
+        self.committed = set()
+
+    def register(self, last_key, rows):
+        """
+        Register an extracted batch and return its commit token.
+        """
+        with self.lock:
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            self.pending[sequence] = (last_key, rows)
+            return sequence
+
+    def commit(self, sequence):
+        """
+        Record that a batch is committed and persist the new high-water key.
+        """
+        with self.lock:
+            self.committed.add(sequence)
+            high_water_key = None
+            while self.committed_sequence + 1 in self.committed:
+                self.committed_sequence += 1
+                self.committed.discard(self.committed_sequence)
+                high_water_key, rows = self.pending.pop(self.committed_sequence)
+                self.migrated_rows += rows
+
+            if high_water_key is not None:
+                self.context.checkpoint_store.save_checkpoint(
+                    self.context.source_table, self.context.target_table,
+                    self.partition_index, high_water_key, self.migrated_rows
+                )
+
+    def complete(self):
+        self.context.checkpoint_store.mark_completed(
+            self.context.source_table, self.context.target_table, self.partition_index
+        )
+
+
+def extract_batches(
+        teradata_cursor,
         source_table,
-        target_table,
-        batch_size=1000,
-        sort_column='Customer_Index'
+        sort_columns,
+        batch_size,
+        partition=None,
+        fetch_size=DEFAULT_FETCH_SIZE,
+        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+        start_key=None,
+        tuner=None,
+        select_columns=None,
+        fastexport=False
 ):
     """
-    Migrate table from Teradata to Snowflake in batches
+    Yield (columns, rows, last_key) batches of a table or partition using the keyset cursor,
+    starting after start_key when resuming. select_columns must include the sort columns.
+    Each keyset query reads up to batch_size rows (or the tuner's current size),
+    streamed with fetchmany() in chunks whose estimated size stays under max_batch_bytes.
+    With fastexport=True the whole table or partition is read by one ordered
+    query over the FastExport protocol instead, since every FastExport
+    request sets up its own export sessions.
     """
-    # Setup logging
-    log_file = f'migration_{source_table}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    last_key = start_key
+    key_positions = None
+    columns = None
+
+    while True:
+        # Fetch batch from Teradata
+        query_size = None if fastexport else (tuner.current() if tuner else batch_size)
+        started = time.time()
+        query, params = build_keyset_query(
+            source_table, sort_columns, query_size, last_key, partition, select_columns
+        )
+        if fastexport:
+            query = FASTEXPORT_ESCAPE + query
+        if params:
+            teradata_cursor.execute(query, params)
+        else:
+            teradata_cursor.execute(query)
+
+        if columns is None:
+            columns = [desc[0] for desc in teradata_cursor.description]
+            key_positions = get_key_positions(columns, sort_columns)
+
+        query_rows = 0
+        for batch_data in iter_row_chunks(teradata_cursor, fetch_size, max_batch_bytes):
+            # Remember where the next query starts before handing the rows on
+            query_rows += len(batch_data)
+            last_row = batch_data[-1]
+            last_key = tuple(last_row[position] for position in key_positions)
+            if tuner:
+                tuner.observe_fetch(len(batch_data), time.time() - started, estimate_batch_bytes(batch_data))
+            yield columns, batch_data, last_key
+            started = time.time()
+
+        if fastexport or query_rows < query_size:
+            break
+
+
+def migrate_partition(context, partition):
+    """
+    Migrate one partition of the source table over its own Teradata and Snowflake connections.
+    Every committed batch advances the partition's checkpoint.
+    Returns the number of rows migrated.
+    """
+    logger = context.logger
+    metrics = context.metrics
+    tracker = CheckpointTracker(context, partition)
+    tuner = context.create_tuner(partition)
 
     # Initialize connection and cursor variables to None to prevent reference before assignment
     teradata_conn = None
     snowflake_conn = None
     teradata_cursor = None
-    snowflake_cursor = None
+    loader = None
+    builder = None
+    file_format = context.load_options.get('file_format', 'csv')
 
     try:
-        # Load environment variables
-        load_dotenv()
-
         # Establish connections
-        teradata_conn = get_teradata_connection()
-        snowflake_conn = get_snowflake_connection()
-
-        # Get total row count
-        total_rows = get_total_row_count(teradata_conn, source_table, logger)
-        logger.info(f"Total rows to migrate: {total_rows}")
+        teradata_conn = get_pool(get_teradata_connection).acquire()
+        snowflake_conn = get_pool(get_snowflake_connection).acquire()
 
-        # Cursor for Teradata and Snowflake
+        # Cursor for Teradata
         teradata_cursor = teradata_conn.cursor()
-        snowflake_cursor = snowflake_conn.cursor()
 
-        # Track migration progress
         migrated_rows = 0
-        start_time = time.time()
-
-        # Migrate in batches
-        while migrated_rows < total_rows:
-            # Fetch batch from Teradata
-            query = f"""
-            SELECT * FROM {source_table}
-            WHERE {sort_column} > {migrated_rows}
-            ORDER BY {sort_column}
-            FETCH FIRST {batch_size} ROWS ONLY
-            """
-            teradata_cursor.execute(query)
-            batch_data = teradata_cursor.fetchall()
 
-            if not batch_data:
+        # Migrate in batches, seeking from the last key of the previous batch
+        batches = extract_batches(
+            teradata_cursor, context.source_table, context.sort_columns, context.batch_size, partition,
+            context.fetch_size, context.max_batch_bytes, partition.get('start_key'), tuner,
+            fastexport=context.extract_mode == 'fastexport'
+        )
+        while True:
+            fetch_start = time.time()
+            with context.stage('fetch'):
+                item = next(batches, None)
+            if item is None:
                 break
+            columns, batch_data, last_key = item
+            batch_bytes = estimate_batch_bytes(batch_data)
+            metrics.observe(
+                'fetch', time.time() - fetch_start, len(batch_data), batch_bytes, partition=partition['index']
+            )
 
-            # Prepare batch for Snowflake insertion
-            columns = [desc[0] for desc in teradata_cursor.description]
+            if loader is None:
+                # Prepare the Snowflake loader for this partition
+                loader = create_loader(
+                    snowflake_conn, context.target_table, columns, context.load_mode, logger,
+                    on_commit=tracker.commit, **context.load_options
+                )
+                builder = context.create_builder(teradata_cursor)
+
+            convert_start = time.time()
+            with context.stage('convert'):
+                payload = prepare_batch(batch_data, columns, context.load_mode, file_format, builder)
+            load_start = time.time()
+            metrics.observe(
+                'convert', load_start - convert_start, len(batch_data), batch_bytes, partition=partition['index']
+            )
 
-            # Use Snowflake's bulk insert for performance
-            insert_sql = f"""
-            INSERT INTO {target_table} ({','.join(columns)})
-            VALUES ({','.join(['%s'] * len(columns))})
-            """
-            snowflake_cursor.executemany(insert_sql, batch_data)
+            with context.stage('load'):
+                loader.load_prepared(payload, tracker.register(last_key, len(batch_data)))
+            metrics.observe(
+                'load', time.time() - load_start, len(batch_data), batch_bytes, partition=partition['index']
+            )
+            if tuner:
+                tuner.observe_load(len(batch_data), time.time() - convert_start)
 
             # Update progress
             migrated_rows += len(batch_data)
+            context.progress.add(len(batch_data))
 
-            # Log progress
-            logger.info(f"Migrated {migrated_rows}/{total_rows} rows ({migrated_rows / total_rows * 100:.2f}%)")
+        # Flush anything the loader still holds (staged files not copied yet)
+        if loader:
+            with context.stage('load'):
+                loader.close()
+            loader = None
+        tracker.complete()
 
-        # Final logging
-        end_time = time.time()
-        total_time = end_time - start_time
-        logger.info(f"Migration completed in {total_time:.2f} seconds")
-        logger.info(f"Average migration speed: {migrated_rows / total_time:.2f} rows/second")
-
-    except Exception as e:
-        if logger:
-            logger.error(f"Migration Error: {e}")
-        else:
-            print(f"Migration Error: {e}")
+        logger.info(f"Partition {partition['index']} completed: {migrated_rows} rows")
+        return migrated_rows
     finally:
         # Close connections safely
         try:
@@ -110,27 +582,741 @@ def migrate_table_in_batches(
             pass
 
         try:
-            if snowflake_cursor:
-                snowflake_cursor.close()
+            if loader:
+                loader.discard()
         except Exception:
             pass
 
+        # Return the connections to their pools, to be health checked first after a failure
+        failed = sys.exc_info()[0] is not None
+        if teradata_conn:
+            get_pool(get_teradata_connection).release(teradata_conn, broken=failed)
+        if snowflake_conn:
+            get_pool(get_snowflake_connection).release(snowflake_conn, broken=failed)
+
+
+# Queue item marking the end of a pipeline stage's input
+END_OF_STREAM = object()
+
+
+class PipelineAborted(Exception):
+    """
+    Raised inside a pipeline stage when another stage has failed.
+    """
+
+
+class PipelineStats:
+    """
+    Thread-safe per-stage counters for the pipelined migration mode.
+    busy is time spent doing the stage's work, wait is time blocked on queues.
+    """
+
+    def __init__(self, queue_depth, convert_threads, load_threads):
+        self.queue_depth = queue_depth
+        self.convert_threads = convert_threads
+        self.load_threads = load_threads
+        self.lock = threading.Lock()
+        self.stages = {}
+
+    def record(self, stage, busy=0.0, wait=0.0, rows=0, batches=0):
+        with self.lock:
+            stats = self.stages.setdefault(stage, {'busy': 0.0, 'wait': 0.0, 'rows': 0, 'batches': 0})
+            stats['busy'] += busy
+            stats['wait'] += wait
+            stats['rows'] += rows
+            stats['batches'] += batches
+
+    def report(self, logger):
+        logger.info(
+            f"Pipeline: queue depth {self.queue_depth}, {self.convert_threads} convert thread(s), "
+            f"{self.load_threads} load thread(s) per partition"
+        )
+        for stage in ('fetch', 'convert', 'load'):
+            stats = self.stages.get(stage)
+            if stats:
+                logger.info(
+                    f"  {stage}: {stats['batches']} batches, {stats['rows']} rows, "
+                    f"busy {stats['busy']:.2f}s, queue wait {stats['wait']:.2f}s"
+                )
+
+
+def put_with_stop(work_queue, item, stop_event):
+    """
+    Put an item on a bounded queue, blocking for backpressure until there is room.
+    Returns the seconds spent waiting.
+    """
+    start = time.time()
+    while not stop_event.is_set():
         try:
-            if teradata_conn:
-                teradata_conn.close()
-        except Exception:
+            work_queue.put(item, timeout=0.5)
+            return time.time() - start
+        except queue.Full:
+            continue
+    raise PipelineAborted()
+
+
+def take_with_stop(work_queue, stop_event):
+    """
+    Take the next item from a queue. Returns the item and the seconds spent waiting.
+    """
+    start = time.time()
+    while not stop_event.is_set():
+        try:
+            return work_queue.get(timeout=0.5), time.time() - start
+        except queue.Empty:
+            continue
+    raise PipelineAborted()
+
+
+def migrate_partition_pipelined(context, partition):
+    """
+    Migrate one partition with extraction, conversion and loading overlapped.
+
+    The calling thread fetches from Teradata into a bounded queue, convert
+    threads turn batches into loader payloads and load threads (each with its
+    own Snowflake connection) load them. Bounded queues apply backpressure so
+    a slow stage throttles the others instead of buffering without limit.
+    Returns the number of rows migrated.
+    """
+    logger = context.logger
+    load_mode = context.load_mode
+    load_options = context.load_options
+    stats = context.pipeline_stats or PipelineStats(4, 1, 1)
+    file_format = load_options.get('file_format', 'csv')
+    metrics = context.metrics
+    tracker = CheckpointTracker(context, partition)
+    tuner = context.create_tuner(partition)
+
+    fetch_queue = queue.Queue(maxsize=stats.queue_depth)
+    load_queue = queue.Queue(maxsize=stats.queue_depth)
+    stop_event = threading.Event()
+    lock = threading.Lock()
+    errors = []
+    state = {'converters': stats.convert_threads, 'migrated_rows': 0, 'builder': None}
+
+    def fail(error):
+        with lock:
+            errors.append(error)
+        stop_event.set()
+
+    def convert_worker():
+        try:
+            while True:
+                item, waited = take_with_stop(fetch_queue, stop_event)
+                stats.record('convert', wait=waited)
+                if item is END_OF_STREAM:
+                    break
+
+                columns, rows, token, batch_bytes = item
+                start = time.time()
+                with context.stage('convert'):
+                    payload = prepare_batch(rows, columns, load_mode, file_format, state['builder'])
+                busy = time.time() - start
+                stats.record('convert', busy=busy, rows=len(rows), batches=1)
+
+                take_wait = waited
+                waited = put_with_stop(load_queue, (columns, payload, len(rows), token, batch_bytes), stop_event)
+                stats.record('convert', wait=waited)
+                metrics.observe(
+                    'convert', busy, len(rows), batch_bytes, wait=take_wait + waited, partition=partition['index']
+                )
+
+            # The last converter to finish ends the load stage
+            with lock:
+                state['converters'] -= 1
+                last_converter = state['converters'] == 0
+            if last_converter:
+                for _ in range(stats.load_threads):
+                    put_with_stop(load_queue, END_OF_STREAM, stop_event)
+        except PipelineAborted:
             pass
+        except Exception as e:
+            fail(e)
 
+    def load_worker():
+        snowflake_conn = None
+        loader = None
         try:
+            snowflake_conn = get_pool(get_snowflake_connection).acquire()
+            while True:
+                item, waited = take_with_stop(load_queue, stop_event)
+                stats.record('load', wait=waited)
+                if item is END_OF_STREAM:
+                    break
+
+                columns, payload, row_count, token, batch_bytes = item
+                if loader is None:
+                    loader = create_loader(
+                        snowflake_conn, context.target_table, columns, load_mode, logger,
+                        on_commit=tracker.commit, **load_options
+                    )
+
+                start = time.time()
+                with context.stage('load'):
+                    loader.load_prepared(payload, token)
+                busy = time.time() - start
+                stats.record('load', busy=busy, rows=row_count, batches=1)
+                metrics.observe('load', busy, row_count, batch_bytes, wait=waited, partition=partition['index'])
+                if tuner:
+                    tuner.observe_load(row_count, busy)
+
+                with lock:
+                    state['migrated_rows'] += row_count
+                context.progress.add(row_count)
+
+            # Flush anything the loader still holds (staged files not copied yet)
+            if loader:
+                with context.stage('load'):
+                    loader.close()
+                loader = None
+        except PipelineAborted:
+            pass
+        except Exception as e:
+            fail(e)
+        finally:
+            try:
+                if loader:
+                    loader.discard()
+            except Exception:
+                pass
+
             if snowflake_conn:
-                snowflake_conn.close()
+                get_pool(get_snowflake_connection).release(snowflake_conn, broken=stop_event.is_set())
+
+    workers = [threading.Thread(target=convert_worker, daemon=True) for _ in range(stats.convert_threads)]
+    workers += [threading.Thread(target=load_worker, daemon=True) for _ in range(stats.load_threads)]
+    for worker in workers:
+        worker.start()
+
+    teradata_conn = None
+    teradata_cursor = None
+    try:
+        teradata_conn = get_pool(get_teradata_connection).acquire()
+        teradata_cursor = teradata_conn.cursor()
+
+        batches = extract_batches(
+            teradata_cursor, context.source_table, context.sort_columns, context.batch_size, partition,
+            context.fetch_size, context.max_batch_bytes, partition.get('start_key'), tuner,
+            fastexport=context.extract_mode == 'fastexport'
+        )
+        while True:
+            start = time.time()
+            with context.stage('fetch'):
+                item = next(batches, None)
+            if item is None:
+                break
+            columns, rows, last_key = item
+            busy = time.time() - start
+            batch_bytes = estimate_batch_bytes(rows)
+            stats.record('fetch', busy=busy, rows=len(rows), batches=1)
+            if state['builder'] is None:
+                # Set before the first batch is queued, so converters always see it
+                state['builder'] = context.create_builder(teradata_cursor)
+
+            token = tracker.register(last_key, len(rows))
+            waited = put_with_stop(fetch_queue, (columns, rows, token, batch_bytes), stop_event)
+            stats.record('fetch', wait=waited)
+            metrics.observe('fetch', busy, len(rows), batch_bytes, wait=waited, partition=partition['index'])
+
+        for _ in range(stats.convert_threads):
+            put_with_stop(fetch_queue, END_OF_STREAM, stop_event)
+    except PipelineAborted:
+        pass
+    except Exception as e:
+        fail(e)
+    finally:
+        # Close connections safely
+        try:
+            if teradata_cursor:
+                teradata_cursor.close()
         except Exception:
             pass
 
+        if teradata_conn:
+            get_pool(get_teradata_connection).release(teradata_conn, broken=stop_event.is_set())
+
+        for worker in workers:
+            worker.join()
+
+    if errors:
+        raise errors[0]
+    tracker.complete()
+
+    logger.info(f"Partition {partition['index']} completed: {state['migrated_rows']} rows")
+    return state['migrated_rows']
+
+
+def build_plan(sort_columns, partition_method, partition_list):
+    """
+    Build the partition plan stored with a run's checkpoints.
+    """
+    return {
+        'sort_columns': sort_columns,
+        'partition_method': partition_method,
+        'partitions': [
+            {'index': partition['index'], 'predicate': partition['predicate'], 'params': partition['params']}
+            for partition in partition_list
+        ]
+    }
+
+
+def prepare_resume(checkpoint_store, source_table, target_table, plan, logger, delete_all=False):
+    """
+    Work out where each partition resumes from the stored checkpoints and
+    delete the target rows loaded after the last checkpoint, so the resumed
+    batches are loaded exactly once. Assumes the target table only holds rows
+    written by this migration.
+
+    Rows are only deleted above a checkpoint or inside a partition's own key
+    range. When neither bounds the cleanup (an unpartitioned or hash
+    partitioned run without a checkpoint) the whole target would have to be
+    emptied: that needs delete_all=True, otherwise a target holding rows
+    raises ValueError.
+    Returns the partitions still to migrate.
+    """
+    checkpoints = checkpoint_store.get_checkpoints(source_table, target_table)
+    sort_columns = plan['sort_columns']
+    partition_list = plan['partitions']
+    cleanups = []
+
+    if plan['partition_method'] == 'hash' and len(partition_list) > 1:
+        # Hash buckets cannot be evaluated in Snowflake, so every partition
+        # resumes from the lowest committed key and rows above it are reloaded
+        keys = []
+        for partition in partition_list:
+            checkpoint = checkpoints.get(partition['index'], {})
+            if checkpoint.get('completed') and checkpoint.get('last_key') is None:
+                # Empty partition, nothing to redo
+                continue
+            keys.append(checkpoint.get('last_key'))
+        start_key = None if not keys or any(key is None for key in keys) else min(keys)
+        for partition in partition_list:
+            partition['start_key'] = start_key
+            partition['migrated_rows'] = 0
+        cleanups.append((None, [], start_key))
+        pending = partition_list
+    else:
+        pending = []
+        for partition in partition_list:
+            checkpoint = checkpoints.get(partition['index'], {})
+            if checkpoint.get('completed'):
+                logger.info(f"Partition {partition['index']} already completed, skipping")
+                continue
+            partition['start_key'] = checkpoint.get('last_key')
+            partition['migrated_rows'] = checkpoint.get('migrated_rows', 0)
+            cleanups.append((partition['predicate'], partition['params'], partition['start_key']))
+            pending.append(partition)
+
+    with pooled_connection(get_snowflake_connection) as snowflake_conn, snowflake_conn.cursor() as cursor:
+        for predicate, params, start_key in cleanups:
+            conditions = []
+            delete_params = []
+            if predicate:
+                conditions.append(f"({predicate.replace('?', '%s')})")
+                delete_params.extend(params)
+            key_predicate, key_params = build_keyset_predicate(sort_columns, start_key, placeholder='%s')
+            if key_predicate:
+                conditions.append(key_predicate)
+                delete_params.extend(key_params)
+
+            if not conditions:
+                cursor.execute(f"SELECT COUNT(*) FROM {target_table}")
+                target_rows = cursor.fetchone()[0]
+                if not target_rows:
+                    continue
+                if not delete_all:
+                    raise ValueError(
+                        f"Cannot resume: {target_table} holds {target_rows} row(s) but no checkpoint bounds them; "
+                        f"rerun with --resume-delete-all to empty it, or migrate without --resume"
+                    )
+                logger.warning(f"No checkpoint bounds the rows of {target_table}, deleting all {target_rows} row(s)")
+                cursor.execute(f"DELETE FROM {target_table}")
+                continue
+
+            cursor.execute(f"DELETE FROM {target_table} WHERE {' AND '.join(conditions)}", delete_params)
+            logger.info(f"Removed {cursor.rowcount} uncheckpointed row(s) from {target_table}")
+
+    return pending
+
+
+def migrate_table_in_batches(
+        source_table,
+        target_table,
+        batch_size=1000,
+        sort_column='Customer_Index',
+        jobs=1,
+        partitions=None,
+        partition_method='range',
+        load_mode='auto',
+        stage_format='csv',
+        target_file_size=DEFAULT_TARGET_FILE_SIZE,
+        upload_threads=4,
+        pipeline=False,
+        queue_depth=4,
+        convert_threads=1,
+        load_threads=1,
+        fetch_size=DEFAULT_FETCH_SIZE,
+        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+        resume=False,
+        resume_delete_all=False,
+        checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+        target_batch_seconds=5.0,
+        hints_path=DEFAULT_HINTS_PATH,
+        data_format='rows',
+        validate=False,
+        extract_mode='auto',
+        metrics_format=None,
+        metrics_path=None,
+        profile=False,
+        profile_top=20
+):
+    """
+    Migrate table from Teradata to Snowflake in batches.
+    Batches are read with a keyset cursor: each query seeks past the last key
+    seen (sort_column may be a single column, a comma separated string or a
+    list for composite keys) so every batch is a range read on the sort key.
+    The sort key must be unique and non-null, e.g. the primary key.
+
+    With jobs > 1 the table is split into partitions (default: one per job) by
+    key range or Teradata hash bucket, and up to `jobs` partitions are migrated
+    concurrently, each worker using its own connection pair. Connections are
+    checked out of the shared pools in config/connection_pool.py, so workers
+    and later runs in the same process reuse authenticated sessions.
+
+    load_mode 'copy' writes batches to compressed stage files (CSV.gz or
+    Parquet) rolled at target_file_size and loads them with PUT + COPY INTO;
+    'insert' uses executemany INSERT; 'auto' picks COPY for large tables.
+
+    With pipeline=True each partition overlaps fetch, conversion and load in
+    separate stages connected by queues of queue_depth batches, using
+    convert_threads and load_threads threads per partition.
+
+    Rows are streamed from each keyset query with fetchmany(fetch_size) and
+    handed on in chunks of at most max_batch_bytes (estimated), so batch_size
+    can be large for throughput while memory per in-flight batch stays bounded.
+
+    Every committed batch records its partition's high-water key in a SQLite
+    checkpoint store next to the logs. With resume=True the stored partition
+    plan is reused, completed partitions are skipped and the others continue
+    after their last committed key; rows loaded after that key are deleted
+    from the target first so each batch is loaded exactly once. A target
+    whose rows no checkpoint bounds is only emptied with resume_delete_all.
+
+    batch_size='auto' tunes the keyset query size per partition from measured
+    fetch/load latency and bytes per row, aiming at target_batch_seconds per
+    batch within max_batch_bytes. It starts from the size recorded for the
+    table by the previous run and records the size it settles on.
+
+    data_format='arrow' converts each batch column by column into an Arrow
+    RecordBatch typed from the Teradata result set description, with low
+    cardinality strings dictionary encoded, and loads that instead of row
+    tuples. COPY loads of Arrow batches are staged as Parquet, and Parquet
+    staging always uses Arrow batches so every file of a run has one schema.
+    Arrow batches save conversion work on that path, not memory (see
+    ArrowBatchBuilder).
+
+    Progress and the load mode are based on a row count estimated from
+    catalog statistics, so no COUNT(*) scan delays the start. validate=True
+    compares exact source and target counts once the load is done and fails
+    the migration on a mismatch.
+
+    extract_mode 'fastexport' reads each partition with one ordered query over
+    Teradata's FastExport protocol; 'sql' uses keyset queries over regular SQL
+    sessions; 'auto' uses FastExport for tables of at least 1 GB. Tables with
+    LOB, JSON, XML, UDT or array columns are always read with SQL, and
+    teradatasql falls back to SQL by itself for queries FastExport cannot run.
+
+    Fetch, convert and load time, queue wait, rows and estimated bytes of every
+    batch are aggregated per stage into histograms and logged at the end;
+    metrics_format 'prometheus' or 'jsonl' also exports them (see
+    logs/migration_metrics.py).
+
+    profile=True profiles the fetch, convert and load stages with cProfile and
+    tracemalloc, writes the profiles next to the log file and logs the
+    profile_top hottest functions and allocation sites of each stage.
+
+    Returns a summary dict with the rows migrated by this run, the elapsed
+    seconds and the error message if the migration failed.
+    """
+    sort_columns = normalize_sort_columns(sort_column)
+    partitions = partitions or jobs
+
+    # Determine the log directory
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    log_dir = os.path.normpath(os.path.join(current_dir, '../logs'))
+
+    # Setup logging
+    log_file = f'migration_{source_table}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    log_path = os.path.join(log_dir, log_file)
+    logger = setup_logger(log_path, f'migration_{source_table}')
+
+    result = {
+        'source_table': source_table,
+        'target_table': target_table,
+        'rows': 0,
+        'seconds': 0.0,
+        'error': None
+    }
+    run_start = time.time()
+    teradata_conn = None
+    checkpoint_store = None
+    metrics = None
+    profiler = None
+
+    try:
+        # Load environment variables
+        load_dotenv()
+
+        checkpoint_store = CheckpointStore(checkpoint_path)
+        metrics = create_metrics(f"migration_{source_table}", metrics_format, metrics_path)
+        if profile:
+            profiler = MigrationProfiler(os.path.splitext(log_path)[0], profile_top)
+            profiler.start()
+
+        # Adaptive batch sizing starts from the previous run's hint
+        tuning_options = None
+        if batch_size == 'auto':
+            tuning_options = {'target_seconds': target_batch_seconds}
+            hint = load_batch_size_hint(source_table, hints_path)
+            batch_size = hint or 10000
+            logger.info(f"Adaptive batch size, starting at {batch_size}{' (hint)' if hint else ''}")
+
+        # Check out the planning connection; the workers reuse it from the pool
+        teradata_conn = get_pool(get_teradata_connection).acquire()
+
+        # Estimate the row count from the catalog
+        total_rows, estimate_source = estimate_row_count(teradata_conn, source_table, logger)
+        if total_rows is None:
+            logger.info("No row count estimate available")
+        else:
+            logger.info(f"Estimated rows to migrate: {total_rows} (from {estimate_source})")
+
+        # Pick the load path
+        load_mode = choose_load_mode(load_mode, total_rows)
+        load_options = {}
+        if load_mode == 'copy':
+            if data_format == 'arrow' and stage_format == 'csv':
+                logger.info("Staging Arrow batches as Parquet")
+                stage_format = 'parquet'
+            elif stage_format == 'parquet':
+                data_format = 'arrow'
+            load_options = {
+                'file_format': stage_format,
+                'target_file_size': target_file_size,
+                'upload_threads': upload_threads
+            }
+        logger.info(f"Load mode: {load_mode}, batches as {data_format}")
+
+        # Pick the extraction protocol
+        extract_mode = choose_extract_mode(teradata_conn, source_table, extract_mode, logger)
+        logger.info(f"Extract mode: {extract_mode}")
+
+        # Reuse the stored partition plan when resuming, otherwise split the table
+        plan = checkpoint_store.load_plan(source_table, target_table) if resume else None
+        if plan:
+            if [column.lower() for column in plan['sort_columns']] != [column.lower() for column in sort_columns]:
+                raise ValueError(
+                    f"Cannot resume: checkpoints were taken on {', '.join(plan['sort_columns'])}"
+                )
+            partition_method = plan['partition_method']
+            logger.info(f"Resuming from checkpoints in {checkpoint_path}")
+            partition_list = prepare_resume(
+                checkpoint_store, source_table, target_table, plan, logger, resume_delete_all
+            )
+        else:
+            if resume:
+                logger.info("No checkpoint found, starting from the beginning")
+            partition_list = build_partitions(
+                teradata_conn, source_table, sort_columns, partitions, partition_method, logger
+            )
+            checkpoint_store.start_run(
+                source_table, target_table, build_plan(sort_columns, partition_method, partition_list)
+            )
+        get_pool(get_teradata_connection).release(teradata_conn)
+        teradata_conn = None
+        logger.info(
+            f"Migrating {len(partition_list)} partition(s) by {partition_method} with {jobs} worker(s)"
+        )
+
+        # Track migration progress
+        resumed_rows = sum(partition.get('migrated_rows', 0) for partition in partition_list)
+        progress = MigrationProgress(total_rows, logger, resumed_rows, estimated=True)
+        pipeline_stats = None
+        if pipeline:
+            pipeline_stats = PipelineStats(queue_depth, convert_threads, load_threads)
+        context = MigrationContext(
+            source_table, target_table, sort_columns, batch_size, progress, logger, checkpoint_store,
+            load_mode, load_options, fetch_size, max_batch_bytes, pipeline_stats, tuning_options, data_format,
+            extract_mode, metrics, profiler
+        )
+        worker = migrate_partition_pipelined if pipeline else migrate_partition
+
+        # Every worker holds a Teradata connection and one Snowflake connection per load thread
+        get_pool(get_teradata_connection).ensure_max_size(jobs)
+        get_pool(get_snowflake_connection).ensure_max_size(jobs * (load_threads if pipeline else 1))
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = [executor.submit(worker, context, partition) for partition in partition_list]
+            for future in as_completed(futures):
+                future.result()
+
+        if pipeline_stats:
+            pipeline_stats.report(logger)
+        metrics.log_summary(logger)
+
+        if context.tuners:
+            record_batch_size_hint(context, hints_path)
+
+        migrated_rows = progress.migrated_rows - resumed_rows
+        result['rows'] = migrated_rows
+
+        # Final logging
+        end_time = time.time()
+        total_time = end_time - start_time
+        logger.info(f"Migration completed in {total_time:.2f} seconds")
+        if total_time > 0:
+            logger.info(f"Average migration speed: {migrated_rows / total_time:.2f} rows/second")
+
+        if validate:
+            source_rows, target_rows = validate_row_counts(source_table, target_table, logger)
+            result['source_rows'] = source_rows
+            result['target_rows'] = target_rows
+            if source_rows != target_rows:
+                raise ValueError(f"Row count mismatch: {source_rows} source rows, {target_rows} target rows")
+
+    except Exception as e:
+        if logger:
+            logger.error(f"Migration Error: {e}")
+            logger.error("Committed batches are checkpointed; rerun with resume=True (--resume) to continue")
+        else:
+            print(f"Migration Error: {e}")
+        result['error'] = str(e)
+    finally:
+        # Close connections safely
+        if teradata_conn:
+            get_pool(get_teradata_connection).release(teradata_conn, broken=True)
+
+        if checkpoint_store:
+            checkpoint_store.close()
+
+        if metrics:
+            metrics.close()
+
+        if profiler:
+            profiler.report(logger)
+
+        # Release the table's log file; migrate_database runs one logger per table
+        close_logger(logger)
+
+    result['seconds'] = time.time() - run_start
+    return result
+
+
+def record_batch_size_hint(context, hints_path=DEFAULT_HINTS_PATH):
+    """
+    Log the batch sizes the partitions settled on and store their median as the table's hint.
+    """
+    sizes = sorted(tuner.current() for tuner in context.tuners)
+    bytes_per_row = [tuner.bytes_per_row for tuner in context.tuners if tuner.bytes_per_row]
+    chosen = sizes[len(sizes) // 2]
+    context.logger.info(f"Batch sizes chosen per partition: {sizes}; saving {chosen} as hint")
+    save_batch_size_hint(
+        context.source_table, chosen,
+        sum(bytes_per_row) / len(bytes_per_row) if bytes_per_row else None,
+        hints_path
+    )
+
+
+def batch_size_arg(value):
+    """
+    Parse a --batch-size value: a row count or 'auto'.
+    """
+    return value if value == 'auto' else int(value)
+
+
+def parse_args():
+    """
+    Parse command line arguments for a table migration
+    """
+    parser = argparse.ArgumentParser(description="Migrate a Teradata table to Snowflake in batches")
+    parser.add_argument('--source-table', default='sample_db.customers')
+    parser.add_argument('--target-table', default='customers')
+    parser.add_argument('--batch-size', type=batch_size_arg, default=100,
+                        help="Rows per keyset query, or 'auto' to tune it from measured throughput")
+    parser.add_argument('--sort-column', default='Customer_Index',
+                        help="Unique sort key; comma separated for composite keys")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Number of partitions migrated concurrently")
+    parser.add_argument('--partitions', type=int, default=None,
+                        help="Number of partitions to split the table into (default: --jobs)")
+    parser.add_argument('--partition-method', choices=['range', 'hash'], default='range')
+    parser.add_argument('--load-mode', choices=['auto', 'insert', 'copy'], default='auto',
+                        help="'copy' stages compressed files and runs COPY INTO; 'auto' uses it for large tables")
+    parser.add_argument('--stage-format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--extract-mode', choices=['auto', 'sql', 'fastexport'], default='auto',
+                        help="'fastexport' reads with Teradata FastExport; 'auto' uses it for large tables")
+    parser.add_argument('--metrics-format', choices=['prometheus', 'jsonl'], default=None,
+                        help="Export per-batch stage metrics as a Prometheus textfile or JSON lines")
+    parser.add_argument('--metrics-path', default=None, help="Metrics file (default: logs/metrics/<job>)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile CPU and allocations per stage; profiles are written next to the log")
+    parser.add_argument('--profile-top', type=int, default=20, help="Functions and allocation sites summarized")
+    parser.add_argument('--validate', action='store_true',
+                        help="Compare exact source and target row counts after the load")
+    parser.add_argument('--data-format', choices=['rows', 'arrow'], default='rows',
+                        help="Carry batches as row tuples or as columnar Arrow record batches")
+    parser.add_argument('--target-file-size-mb', type=int, default=DEFAULT_TARGET_FILE_SIZE // (1024 * 1024))
+    parser.add_argument('--upload-threads', type=int, default=4)
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Overlap fetch, conversion and load through bounded queues")
+    parser.add_argument('--queue-depth', type=int, default=4)
+    parser.add_argument('--convert-threads', type=int, default=1)
+    parser.add_argument('--load-threads', type=int, default=1)
+    parser.add_argument('--fetch-size', type=int, default=DEFAULT_FETCH_SIZE,
+                        help="Rows per fetchmany() round trip")
+    parser.add_argument('--max-batch-mb', type=int, default=DEFAULT_MAX_BATCH_BYTES // (1024 * 1024),
+                        help="Memory budget per in-flight batch")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue from the last committed checkpoint of a previous run")
+    parser.add_argument('--resume-delete-all', action='store_true',
+                        help="Let --resume empty the target when no checkpoint bounds its rows")
+    parser.add_argument('--checkpoint-path', default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument('--target-batch-seconds', type=float, default=5.0,
+                        help="Latency per batch aimed at by --batch-size auto")
+    return parser.parse_args()
+
+
 # Main execution
 if __name__ == "__main__":
+    args = parse_args()
     migrate_table_in_batches(
-        source_table='sample_db.customers',
-        target_table='customers',
-        batch_size=100
+        source_table=args.source_table,
+        target_table=args.target_table,
+        batch_size=args.batch_size,
+        sort_column=args.sort_column,
+        jobs=args.jobs,
+        partitions=args.partitions,
+        partition_method=args.partition_method,
+        load_mode=args.load_mode,
+        stage_format=args.stage_format,
+        target_file_size=args.target_file_size_mb * 1024 * 1024,
+        upload_threads=args.upload_threads,
+        pipeline=args.pipeline,
+        queue_depth=args.queue_depth,
+        convert_threads=args.convert_threads,
+        load_threads=args.load_threads,
+        fetch_size=args.fetch_size,
+        max_batch_bytes=args.max_batch_mb * 1024 * 1024,
+        resume=args.resume,
+        resume_delete_all=args.resume_delete_all,
+        checkpoint_path=args.checkpoint_path,
+        target_batch_seconds=args.target_batch_seconds,
+        data_format=args.data_format,
+        validate=args.validate,
+        extract_mode=args.extract_mode,
+        metrics_format=args.metrics_format,
+        metrics_path=args.metrics_path,
+        profile=args.profile,
+        profile_top=args.profile_top
     )
\ No newline at end of file
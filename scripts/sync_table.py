@@ -0,0 +1,366 @@
+import os
+import time
+import argparse
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from dotenv import load_dotenv
+from config.teradata import get_teradata_connection
+from config.snowflake import get_snowflake_connection
+from config.connection_pool import get_pool
+from logs.migration_table_logs import setup_logger
+from logs.migration_checkpoints import CheckpointStore, DEFAULT_CHECKPOINT_PATH
+from operations.teradata_extract import DEFAULT_FETCH_SIZE, DEFAULT_MAX_BATCH_BYTES
+from operations.snowflake_load import create_loader
+from scripts.migration_table import extract_batches, normalize_sort_columns, migrate_table_in_batches
+
+
+def get_high_watermark(teradata_conn, source_table, watermark_column):
+    """
+    Return the current maximum of the watermark column in the source table.
+    """
+    cursor = teradata_conn.cursor()
+    try:
+        cursor.execute(f"SELECT MAX({watermark_column}) FROM {source_table}")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def get_target_watermark(snowflake_conn, target_table, watermark_column):
+    """
+    Return the row count of the target table and the maximum of its watermark column.
+    """
+    with snowflake_conn.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*), MAX({watermark_column}) FROM {target_table}")
+        return cursor.fetchone()
+
+
+def initial_load_unfinished(checkpoint_store, source_table, target_table):
+    """
+    Check whether a migration of the table has a stored plan with partitions not completed yet.
+    """
+    plan = checkpoint_store.load_plan(source_table, target_table)
+    if not plan:
+        return False
+    checkpoints = checkpoint_store.get_checkpoints(source_table, target_table)
+    return not all(checkpoints.get(partition['index'], {}).get('completed') for partition in plan['partitions'])
+
+
+def apply_lookback(watermark, lookback, logger):
+    """
+    Move a watermark back by lookback: a timedelta for timestamp and date
+    watermarks, a number for numeric ones. A lookback of the other kind is
+    ignored with a warning.
+    """
+    if watermark is None or not lookback:
+        return watermark
+    if isinstance(watermark, (datetime, date)) and isinstance(lookback, timedelta):
+        return watermark - lookback
+    if isinstance(watermark, (int, Decimal)) and isinstance(lookback, int) and not isinstance(watermark, bool):
+        return watermark - lookback
+    if isinstance(watermark, float) and isinstance(lookback, (int, float)):
+        return watermark - lookback
+    logger.warning(f"Lookback {lookback} does not apply to a {type(watermark).__name__} watermark, ignoring it")
+    return watermark
+
+
+def build_change_partition(watermark_column, low_watermark, high_watermark):
+    """
+    Build the extraction predicate for rows changed after low_watermark up to
+    high_watermark (every row up to high_watermark on the first sync).
+    """
+    if low_watermark is None:
+        return {'index': 0, 'predicate': f"{watermark_column} <= ?", 'params': [high_watermark]}
+    return {
+        'index': 0,
+        'predicate': f"{watermark_column} > ? AND {watermark_column} <= ?",
+        'params': [low_watermark, high_watermark]
+    }
+
+
+def build_merge_sql(target_table, staging_table, columns, key_columns):
+    """
+    Build the MERGE that upserts the staged changes into the target table on the key columns.
+    """
+    keys = {column.lower() for column in key_columns}
+    on_clause = ' AND '.join(f"t.{column} = s.{column}" for column in key_columns)
+    update_columns = [column for column in columns if column.lower() not in keys]
+
+    update_clause = ""
+    if update_columns:
+        update_clause = (
+            "WHEN MATCHED THEN UPDATE SET "
+            + ', '.join(f"{column} = s.{column}" for column in update_columns)
+        )
+
+    return f"""
+    MERGE INTO {target_table} t
+    USING {staging_table} s
+    ON {on_clause}
+    {update_clause}
+    WHEN NOT MATCHED THEN INSERT ({', '.join(columns)})
+    VALUES ({', '.join(f's.{column}' for column in columns)})
+    """
+
+
+def delete_missing_rows(
+        teradata_cursor,
+        snowflake_conn,
+        source_table,
+        target_table,
+        key_columns,
+        batch_size,
+        load_mode,
+        load_options,
+        logger
+):
+    """
+    Delete target rows whose key no longer exists in the source table.
+    All source keys are copied to a temporary key table, so this step reads
+    the whole key column set; it is optional for that reason.
+    Returns the number of deleted rows.
+    """
+    keys_table = f"{target_table}_SYNC_KEYS"
+    on_clause = ' AND '.join(f"t.{column} = k.{column}" for column in key_columns)
+
+    with snowflake_conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE OR REPLACE TEMPORARY TABLE {keys_table} AS "
+            f"SELECT {', '.join(key_columns)} FROM {target_table} WHERE 1 = 0"
+        )
+
+        loader = create_loader(snowflake_conn, keys_table, key_columns, load_mode, logger, **load_options)
+        try:
+            source_keys = 0
+            for _, rows, _ in extract_batches(
+                    teradata_cursor, source_table, key_columns, batch_size, select_columns=key_columns
+            ):
+                loader.load(rows)
+                source_keys += len(rows)
+            loader.close()
+        except Exception:
+            loader.discard()
+            raise
+        logger.info(f"Compared {source_keys} source key(s) for deletes")
+
+        cursor.execute(
+            f"DELETE FROM {target_table} t WHERE NOT EXISTS (SELECT 1 FROM {keys_table} k WHERE {on_clause})"
+        )
+        deleted_rows = cursor.rowcount
+        cursor.execute(f"DROP TABLE IF EXISTS {keys_table}")
+    return deleted_rows
+
+
+def sync_table_incremental(
+        source_table,
+        target_table,
+        key_column,
+        watermark_column,
+        batch_size=10000,
+        detect_deletes=False,
+        lookback=None,
+        load_mode='copy',
+        stage_format='csv',
+        fetch_size=DEFAULT_FETCH_SIZE,
+        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+        checkpoint_path=DEFAULT_CHECKPOINT_PATH
+):
+    """
+    Apply the rows of a Teradata table changed since the last sync to its Snowflake copy.
+
+    Rows whose watermark_column (a last-modified timestamp or an ever
+    increasing key) is above the stored watermark and at most the current
+    maximum are extracted with the keyset cursor, loaded into a temporary
+    staging table and applied with a single MERGE on key_column (comma
+    separated or a list for composite keys). The new watermark is stored only
+    after the MERGE, and MERGE is idempotent, so a failed sync is simply
+    rerun. lookback moves the lower bound back to catch rows committed late:
+    a timedelta for timestamp or date watermarks, a number for numeric ones.
+
+    Without a stored watermark, a target that already holds rows is synced
+    from its own maximum watermark. An empty target is loaded by
+    migrate_table_in_batches instead of through the staging table and
+    MERGE, and resumed from its checkpoints when such an initial load did
+    not finish; the source maximum read before it becomes the watermark.
+
+    detect_deletes=True also deletes target rows whose key is gone from the
+    source, by comparing all source keys.
+
+    Returns a summary dict with the changed and deleted rows, the new
+    watermark, the elapsed seconds and the error message if the sync failed.
+    """
+    key_columns = normalize_sort_columns(key_column)
+
+    # Determine the log directory
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    log_dir = os.path.normpath(os.path.join(current_dir, '../logs'))
+
+    # Setup logging
+    log_file = f'sync_{source_table}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    logger = setup_logger(os.path.join(log_dir, log_file), f'sync_{source_table}')
+
+    result = {
+        'source_table': source_table,
+        'target_table': target_table,
+        'rows': 0,
+        'deleted': 0,
+        'watermark': None,
+        'seconds': 0.0,
+        'error': None
+    }
+    start_time = time.time()
+    checkpoint_store = None
+    teradata_conn = None
+    teradata_cursor = None
+    snowflake_conn = None
+    loader = None
+    staging_table = f"{target_table}_SYNC_STAGE"
+    load_options = {'file_format': stage_format} if load_mode == 'copy' else {}
+
+    try:
+        # Load environment variables
+        load_dotenv()
+
+        checkpoint_store = CheckpointStore(checkpoint_path)
+        low_watermark = checkpoint_store.get_watermark(source_table, target_table, watermark_column)
+
+        teradata_conn = get_pool(get_teradata_connection).acquire()
+        teradata_cursor = teradata_conn.cursor()
+        snowflake_conn = get_pool(get_snowflake_connection).acquire()
+
+        high_watermark = get_high_watermark(teradata_conn, source_table, watermark_column)
+        initial_load = None
+        if low_watermark is None:
+            target_rows, target_watermark = get_target_watermark(snowflake_conn, target_table, watermark_column)
+            if initial_load_unfinished(checkpoint_store, source_table, target_table):
+                initial_load = 'resume'
+            elif not target_rows:
+                initial_load = 'full'
+            else:
+                low_watermark = target_watermark
+                logger.info(f"No stored watermark, starting from the maximum in {target_table}: {low_watermark}")
+        low_watermark = apply_lookback(low_watermark, lookback, logger)
+
+        if initial_load:
+            # Bulk load the whole table; MERGE through a staging table is only for changes
+            logger.info(f"Initial load of {source_table} up to watermark {high_watermark}")
+            migration = migrate_table_in_batches(
+                source_table, target_table, batch_size, key_columns, load_mode=load_mode,
+                stage_format=stage_format, fetch_size=fetch_size, max_batch_bytes=max_batch_bytes,
+                resume=initial_load == 'resume', checkpoint_path=checkpoint_path
+            )
+            if migration['error']:
+                raise ValueError(f"Initial load failed, rerun to resume it: {migration['error']}")
+            result['rows'] = migration['rows']
+        elif high_watermark is not None and (low_watermark is None or high_watermark > low_watermark):
+            logger.info(f"Syncing {source_table} changes after {low_watermark} up to {high_watermark}")
+            with snowflake_conn.cursor() as cursor:
+                cursor.execute(f"CREATE OR REPLACE TEMPORARY TABLE {staging_table} LIKE {target_table}")
+
+                # Land the changed rows in the staging table
+                columns = None
+                partition = build_change_partition(watermark_column, low_watermark, high_watermark)
+                for columns, rows, _ in extract_batches(
+                        teradata_cursor, source_table, key_columns, batch_size, partition,
+                        fetch_size, max_batch_bytes
+                ):
+                    if loader is None:
+                        loader = create_loader(
+                            snowflake_conn, staging_table, columns, load_mode, logger, **load_options
+                        )
+                    loader.load(rows)
+                    result['rows'] += len(rows)
+
+                if loader:
+                    loader.close()
+                    loader = None
+
+                    # Apply all changes in one set-based statement
+                    cursor.execute(build_merge_sql(target_table, staging_table, columns, key_columns))
+                    logger.info(f"Merged {result['rows']} changed row(s) into {target_table}")
+                cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+        else:
+            logger.info("No changes since the last sync")
+
+        if detect_deletes:
+            result['deleted'] = delete_missing_rows(
+                teradata_cursor, snowflake_conn, source_table, target_table, key_columns,
+                batch_size, load_mode, load_options, logger
+            )
+            logger.info(f"Deleted {result['deleted']} row(s) no longer in {source_table}")
+
+        if high_watermark is not None:
+            checkpoint_store.save_watermark(source_table, target_table, watermark_column, high_watermark)
+        result['watermark'] = high_watermark
+        logger.info(f"Sync completed in {time.time() - start_time:.2f} seconds")
+
+    except Exception as e:
+        logger.error(f"Sync Error: {e}")
+        result['error'] = str(e)
+    finally:
+        # Close connections safely
+        try:
+            if loader:
+                loader.discard()
+        except Exception:
+            pass
+
+        try:
+            if teradata_cursor:
+                teradata_cursor.close()
+        except Exception:
+            pass
+
+        # Return the connections to their pools, to be health checked first after a failure
+        if teradata_conn:
+            get_pool(get_teradata_connection).release(teradata_conn, broken=result['error'] is not None)
+        if snowflake_conn:
+            get_pool(get_snowflake_connection).release(snowflake_conn, broken=result['error'] is not None)
+
+        if checkpoint_store:
+            checkpoint_store.close()
+
+    result['seconds'] = time.time() - start_time
+    return result
+
+
+def parse_args():
+    """
+    Parse command line arguments for an incremental sync
+    """
+    parser = argparse.ArgumentParser(description="Apply Teradata changes since the last sync to Snowflake")
+    parser.add_argument('--source-table', required=True)
+    parser.add_argument('--target-table', required=True)
+    parser.add_argument('--key-column', required=True,
+                        help="Unique key used by MERGE; comma separated for composite keys")
+    parser.add_argument('--watermark-column', required=True,
+                        help="Last-modified timestamp or ever increasing key column")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--detect-deletes', action='store_true',
+                        help="Delete target rows whose key no longer exists in the source")
+    lookback = parser.add_mutually_exclusive_group()
+    lookback.add_argument('--lookback-minutes', type=int, default=0,
+                          help="Re-read timestamp watermarks this far back to catch late commits")
+    lookback.add_argument('--lookback-values', type=int, default=0,
+                          help="Re-read numeric watermarks this far back to catch late commits")
+    parser.add_argument('--load-mode', choices=['insert', 'copy'], default='copy')
+    parser.add_argument('--stage-format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--checkpoint-path', default=DEFAULT_CHECKPOINT_PATH)
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    sync_table_incremental(
+        source_table=args.source_table,
+        target_table=args.target_table,
+        key_column=args.key_column,
+        watermark_column=args.watermark_column,
+        batch_size=args.batch_size,
+        detect_deletes=args.detect_deletes,
+        lookback=timedelta(minutes=args.lookback_minutes) if args.lookback_minutes else args.lookback_values,
+        load_mode=args.load_mode,
+        stage_format=args.stage_format,
+        checkpoint_path=args.checkpoint_path
+    )
@@ -0,0 +1,485 @@
+import os
+import math
+import time
+import argparse
+from datetime import datetime, date
+from decimal import Decimal
+from dotenv import load_dotenv
+from tabulate import tabulate
+from config.teradata import get_teradata_connection
+from config.snowflake import get_snowflake_connection
+from config.connection_pool import get_pool
+from logs.migration_table_logs import setup_logger
+from scripts.migration_table import normalize_sort_columns, get_key_positions, split_key_range, build_keyset_predicate
+
+# SQL differences between the two sides of a comparison
+DIALECTS = {
+    'teradata': {
+        'placeholder': '?',
+        'day_number': "({column} - DATE '1970-01-01')",
+        'epoch_microseconds': (
+            "(((CAST(TO_CHAR({column}, 'J') AS BIGINT) - 2440588) * 86400"
+            " + CAST(TO_CHAR({column}, 'SSSSS') AS BIGINT)) * 1000000 + CAST(TO_CHAR({column}, 'FF6') AS BIGINT))"
+        ),
+        'md5': "HASH_MD5({value})",
+        'hex': "FROM_BYTES({column}, 'base16')"
+    },
+    'snowflake': {
+        'placeholder': '%s',
+        'day_number': "DATEDIFF(day, DATE '1970-01-01', {column})",
+        'epoch_microseconds': "DATE_PART('EPOCH_MICROSECOND', {column})",
+        'md5': "MD5({value})",
+        'hex': "HEX_ENCODE({column})"
+    }
+}
+
+# Per-row hash summed for strings and bytes: the last 8 hex digits of the MD5 of
+# the value (bytes as upper case hex), which both systems compute alike
+VALUE_HASH = "TO_NUMBER(UPPER(SUBSTR({md5}, 25, 8)), 'XXXXXXXX')"
+
+# Column kinds whose summary only covers MIN/MAX, so a change keeping those is
+# only found by a row comparison
+WEAK_KINDS = ('other',)
+
+
+def describe_columns(teradata_conn, source_table):
+    """
+    Return [(column name, kind, scale)] for the columns of the source table, where
+    kind is 'number', 'float', 'timestamp', 'date', 'string', 'bytes' or 'other'.
+    """
+    cursor = teradata_conn.cursor()
+    try:
+        cursor.execute(f"SELECT TOP 1 * FROM {source_table}")
+        sample = cursor.fetchone()
+        description = cursor.description
+    finally:
+        cursor.close()
+
+    columns = []
+    for position, column in enumerate(description):
+        # Fall back to the sampled value when the driver does not report a Python type
+        type_code = column[1] if isinstance(column[1], type) else None
+        if type_code is None and sample is not None and sample[position] is not None:
+            type_code = type(sample[position])
+
+        if type_code is float:
+            kind = 'float'
+        elif type_code in (int, Decimal):
+            kind = 'number'
+        elif type_code is datetime:
+            # Checked before date, which datetime derives from
+            kind = 'timestamp'
+        elif type_code is date:
+            kind = 'date'
+        elif type_code is str:
+            kind = 'string'
+        elif type_code in (bytes, bytearray):
+            kind = 'bytes'
+        else:
+            kind = 'other'
+        columns.append((column[0], kind, column[5] or 0))
+    return columns
+
+
+def build_range_predicate(key_column, lower, upper, placeholder):
+    """
+    Build the predicate of the key range [lower, upper); None leaves that end open.
+    """
+    conditions = []
+    params = []
+    if lower is not None:
+        conditions.append(f"{key_column} >= {placeholder}")
+        params.append(lower)
+    if upper is not None:
+        conditions.append(f"{key_column} < {placeholder}")
+        params.append(upper)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def weak_columns(columns):
+    """
+    Return the names of the columns only checked by MIN/MAX in a range summary.
+    """
+    return [column for column, kind, _ in columns if kind in WEAK_KINDS]
+
+
+def build_summary_query(table_name, columns, key_column, lower, upper, dialect):
+    """
+    Build the query computing the summary of a key range inside the database:
+    the row count plus, per column, aggregates that both systems compute alike
+    (non-null count, exact sums of numbers, of day numbers of dates, of epoch
+    microseconds of timestamps and of VALUE_HASH of strings and bytes, minimum
+    and maximum of other types). Only the sums see every value; see WEAK_KINDS.
+    Strings are hashed in the encoding each system stores them in, so text
+    outside ASCII in a Teradata UNICODE column makes its range mismatch and
+    compared row by row.
+    """
+    functions = DIALECTS[dialect]
+    aggregates = ["COUNT(*)"]
+    for column, kind, scale in columns:
+        aggregates.append(f"COUNT({column})")
+        if kind == 'number':
+            aggregates.append(f"SUM(CAST({column} AS DECIMAL(38, {scale})))")
+        elif kind == 'float':
+            aggregates.append(f"SUM(CAST({column} AS FLOAT))")
+        elif kind == 'timestamp':
+            aggregates.append(f"SUM(CAST({functions['epoch_microseconds'].format(column=column)} AS DECIMAL(38, 0)))")
+        elif kind == 'date':
+            aggregates.append(f"SUM(CAST({functions['day_number'].format(column=column)} AS BIGINT))")
+        elif kind in ('string', 'bytes'):
+            value = column if kind == 'string' else functions['hex'].format(column=column)
+            value_hash = VALUE_HASH.format(md5=functions['md5'].format(value=value))
+            aggregates.append(f"SUM(CAST({value_hash} AS DECIMAL(38, 0)))")
+        else:
+            aggregates.append(f"MIN({column})")
+            aggregates.append(f"MAX({column})")
+
+    where_clause, params = build_range_predicate(key_column, lower, upper, functions['placeholder'])
+    query = f"""
+    SELECT {', '.join(aggregates)}
+    FROM {table_name}
+    {where_clause}
+    """
+    return query, params
+
+
+def values_match(source_value, target_value):
+    """
+    Compare two values fetched from different systems.
+    """
+    if isinstance(source_value, float) or isinstance(target_value, float):
+        if source_value is None or target_value is None:
+            return source_value is target_value
+        return math.isclose(float(source_value), float(target_value), rel_tol=1e-9, abs_tol=1e-9)
+    if isinstance(source_value, (int, Decimal)) and isinstance(target_value, (int, Decimal)):
+        return Decimal(source_value) == Decimal(target_value)
+    if isinstance(source_value, (datetime, date)) and isinstance(target_value, (datetime, date)):
+        return str(source_value) == str(target_value)
+    return source_value == target_value
+
+
+def rows_match(source_row, target_row):
+    return len(source_row) == len(target_row) and all(
+        values_match(source_value, target_value) for source_value, target_value in zip(source_row, target_row)
+    )
+
+
+class TableValidator:
+    """
+    Compares a Teradata table with its Snowflake copy without exporting it.
+
+    The key range of the leading key column is split into ranges whose
+    summaries (see build_summary_query) are computed in both databases and
+    compared. Only ranges whose summaries differ are split again (fanout
+    ways), until a range holds at most leaf_rows source rows; the rows of such
+    a range are then fetched from both sides, leaf_rows at a time in key
+    order, and compared by key to find the offending rows.
+    """
+
+    def __init__(
+            self,
+            teradata_conn,
+            snowflake_conn,
+            source_table,
+            target_table,
+            key_columns,
+            fanout=8,
+            leaf_rows=1000,
+            max_differences=100,
+            logger=None
+    ):
+        self.teradata_conn = teradata_conn
+        self.snowflake_conn = snowflake_conn
+        self.source_table = source_table
+        self.target_table = target_table
+        self.key_columns = key_columns
+        self.key_column = key_columns[0]
+        self.fanout = fanout
+        self.leaf_rows = leaf_rows
+        self.max_differences = max_differences
+        self.logger = logger
+        self.columns = describe_columns(teradata_conn, source_table)
+        self.weak_columns = weak_columns(self.columns)
+        if logger and self.weak_columns:
+            logger.warning(
+                f"Only MIN/MAX of these columns are compared per range, so changes keeping "
+                f"them go unnoticed unless their range is compared row by row: {', '.join(self.weak_columns)}"
+            )
+        self.ranges_compared = 0
+        self.mismatched_ranges = 0
+        self.differences = []
+
+    def _query(self, side, query, params):
+        conn = self.teradata_conn if side == 'teradata' else self.snowflake_conn
+        cursor = conn.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def summary(self, side, lower, upper):
+        table_name = self.source_table if side == 'teradata' else self.target_table
+        query, params = build_summary_query(table_name, self.columns, self.key_column, lower, upper, side)
+        return self._query(side, query, params)[0]
+
+    def key_range(self, lower, upper):
+        """
+        Return the MIN and MAX of the leading key in a range over both tables.
+        """
+        values = []
+        for side, table_name in (('teradata', self.source_table), ('snowflake', self.target_table)):
+            where_clause, params = build_range_predicate(
+                self.key_column, lower, upper, DIALECTS[side]['placeholder']
+            )
+            query = f"SELECT MIN({self.key_column}), MAX({self.key_column}) FROM {table_name} {where_clause}"
+            values.extend(value for value in self._query(side, query, params)[0] if value is not None)
+        if not values:
+            return None, None
+        return min(values), max(values)
+
+    def split(self, lower, upper, ways=None):
+        """
+        Split a range into up to `ways` (default fanout) sub-ranges; returns [] when it cannot be split.
+        """
+        min_value, max_value = self.key_range(lower, upper)
+        if min_value is None or min_value == max_value:
+            return []
+
+        boundaries = []
+        for boundary in split_key_range(min_value, max_value, ways or self.fanout):
+            if min_value < boundary and (not boundaries or boundaries[-1] < boundary):
+                boundaries.append(boundary)
+        if not boundaries:
+            # Adjacent integer keys: isolate the maximum
+            boundaries = [max_value]
+
+        ranges = []
+        for boundary in boundaries:
+            ranges.append((lower, boundary))
+            lower = boundary
+        ranges.append((lower, upper))
+        return ranges
+
+    def validate(self, partitions=16):
+        """
+        Compare the whole table; returns True when no differences were found.
+        """
+        ranges = self.split(None, None, partitions) if partitions > 1 else [(None, None)]
+        if not ranges:
+            ranges = [(None, None)]
+
+        # Depth first, so offending keys are reported as soon as they are found
+        pending = list(reversed(ranges))
+        while pending and len(self.differences) < self.max_differences:
+            lower, upper = pending.pop()
+            source_summary = self.summary('teradata', lower, upper)
+            target_summary = self.summary('snowflake', lower, upper)
+            self.ranges_compared += 1
+            if rows_match(source_summary, target_summary):
+                continue
+
+            self.mismatched_ranges += 1
+            if self.logger:
+                self.logger.info(
+                    f"Range [{lower}, {upper}) differs: {source_summary[0]} source rows, {target_summary[0]} target rows"
+                )
+            sub_ranges = [] if source_summary[0] <= self.leaf_rows else self.split(lower, upper)
+            if sub_ranges and len(sub_ranges) > 1:
+                pending.extend(reversed(sub_ranges))
+            else:
+                self.compare_rows(lower, upper)
+
+        return not self.differences and self.mismatched_ranges == 0
+
+    def fetch_page(self, side, lower, upper, after, through=None):
+        """
+        Fetch at most leaf_rows rows of a range from one table in key order,
+        starting after the full key `after` (None for the first page) and, when
+        given, ending at the full key `through`.
+        Returns {key: row} in key order.
+        """
+        table_name = self.source_table if side == 'teradata' else self.target_table
+        placeholder = DIALECTS[side]['placeholder']
+        where_clause, params = build_range_predicate(self.key_column, lower, upper, placeholder)
+        conditions = []
+        predicate, after_params = build_keyset_predicate(self.key_columns, after, placeholder)
+        if predicate:
+            conditions.append(f"({predicate})")
+            params = params + after_params
+        predicate, through_params = build_keyset_predicate(self.key_columns, through, placeholder)
+        if predicate:
+            # Keys are not NULL, so "not past through" is "at most through"
+            conditions.append(f"NOT ({predicate})")
+            params = params + through_params
+        if conditions:
+            conditions = ' AND '.join(conditions)
+            where_clause = f"{where_clause} AND {conditions}" if where_clause else f"WHERE {conditions}"
+
+        column_names = [column for column, _, _ in self.columns]
+        top = f"TOP {self.leaf_rows}" if side == 'teradata' else ""
+        limit = "" if side == 'teradata' else f"LIMIT {self.leaf_rows}"
+        query = f"""
+        SELECT {top} {', '.join(column_names)} FROM {table_name}
+        {where_clause}
+        ORDER BY {', '.join(self.key_columns)}
+        {limit}
+        """
+        positions = get_key_positions(column_names, self.key_columns)
+        return {tuple(row[position] for position in positions): tuple(row) for row in self._query(side, query, params)}
+
+    def compare_rows(self, lower, upper):
+        """
+        Fetch the rows of a range from both tables page by page and record the
+        keys that differ. Paging by the full key bounds every fetch, also for a
+        range that cannot be split because all its rows share one leading key.
+        Both sides of a page end at the same key, found by the databases
+        themselves, so the pages never depend on Python ordering the keys as
+        the databases do.
+        """
+        after = None
+        while len(self.differences) < self.max_differences:
+            source_rows = self.fetch_page('teradata', lower, upper, after)
+            # Past the last key of a full page, that side has not been read yet
+            boundary = list(source_rows)[-1] if len(source_rows) >= self.leaf_rows else None
+            target_rows = self.fetch_page('snowflake', lower, upper, after, boundary)
+            if len(target_rows) >= self.leaf_rows:
+                last_target_key = list(target_rows)[-1]
+                if boundary is None or not rows_match(last_target_key, boundary):
+                    # The target page ends first: read the source up to its end again
+                    boundary = last_target_key
+                    source_rows = self.fetch_page('teradata', lower, upper, after, boundary)
+
+            keys = set(source_rows) | set(target_rows)
+            for key in sorted(keys, key=str):
+                if key not in target_rows:
+                    self.add_difference(key, 'missing in target')
+                elif key not in source_rows:
+                    self.add_difference(key, 'extra in target')
+                elif not rows_match(source_rows[key], target_rows[key]):
+                    self.add_difference(key, 'values differ')
+
+            if boundary is None:
+                break
+            after = boundary
+
+    def add_difference(self, key, kind):
+        if len(self.differences) < self.max_differences:
+            self.differences.append((key, kind))
+
+
+def validate_table(
+        source_table,
+        target_table,
+        key_column='Customer_Index',
+        partitions=16,
+        fanout=8,
+        leaf_rows=1000,
+        max_differences=100
+):
+    """
+    Validate a migrated table by comparing range summaries computed inside
+    Teradata and Snowflake, drilling into mismatching ranges down to the
+    offending keys. The leading key column must be numeric, a date or a
+    timestamp so its range can be split.
+    Returns a summary dict with the ranges compared, the differences found,
+    the columns only weakly checked per range (see WEAK_KINDS), the elapsed
+    seconds and the error message if the validation failed.
+    """
+    key_columns = normalize_sort_columns(key_column)
+
+    # Determine the log directory
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    log_dir = os.path.normpath(os.path.join(current_dir, '../logs'))
+
+    # Setup logging
+    log_file = f'validation_{source_table}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    logger = setup_logger(os.path.join(log_dir, log_file), f'validation_{source_table}')
+
+    result = {
+        'source_table': source_table,
+        'target_table': target_table,
+        'valid': False,
+        'ranges_compared': 0,
+        'differences': [],
+        'weak_columns': [],
+        'seconds': 0.0,
+        'error': None
+    }
+    start_time = time.time()
+    teradata_conn = None
+    snowflake_conn = None
+
+    try:
+        # Load environment variables
+        load_dotenv()
+
+        teradata_conn = get_pool(get_teradata_connection).acquire()
+        snowflake_conn = get_pool(get_snowflake_connection).acquire()
+
+        validator = TableValidator(
+            teradata_conn, snowflake_conn, source_table, target_table, key_columns,
+            fanout, leaf_rows, max_differences, logger
+        )
+        result['valid'] = validator.validate(partitions)
+        result['ranges_compared'] = validator.ranges_compared
+        result['differences'] = validator.differences
+        result['weak_columns'] = validator.weak_columns
+
+        logger.info(
+            f"Compared {validator.ranges_compared} range(s), {validator.mismatched_ranges} differed, "
+            f"{len(validator.differences)} offending key(s)"
+        )
+        if validator.differences:
+            logger.info("Differences:\n" + tabulate(
+                [[', '.join(str(value) for value in key), kind] for key, kind in validator.differences],
+                headers=["Key", "Difference"], tablefmt="grid"
+            ))
+        logger.info(f"{source_table} and {target_table} {'match' if result['valid'] else 'differ'}")
+
+    except Exception as e:
+        logger.error(f"Validation Error: {e}")
+        result['error'] = str(e)
+    finally:
+        # Return the connections to their pools, to be health checked first after a failure
+        if teradata_conn:
+            get_pool(get_teradata_connection).release(teradata_conn, broken=result['error'] is not None)
+        if snowflake_conn:
+            get_pool(get_snowflake_connection).release(snowflake_conn, broken=result['error'] is not None)
+
+    result['seconds'] = time.time() - start_time
+    return result
+
+
+def parse_args():
+    """
+    Parse command line arguments for a table validation
+    """
+    parser = argparse.ArgumentParser(description="Compare a Teradata table with its Snowflake copy")
+    parser.add_argument('--source-table', required=True)
+    parser.add_argument('--target-table', required=True)
+    parser.add_argument('--key-column', default='Customer_Index',
+                        help="Unique key; comma separated for composite keys, the first one is split into ranges")
+    parser.add_argument('--partitions', type=int, default=16, help="Ranges compared first")
+    parser.add_argument('--fanout', type=int, default=8, help="Sub-ranges per mismatching range")
+    parser.add_argument('--leaf-rows', type=int, default=1000,
+                        help="Ranges with at most this many rows are compared row by row")
+    parser.add_argument('--max-differences', type=int, default=100)
+    return parser.parse_args()
+
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    validate_table(
+        source_table=args.source_table,
+        target_table=args.target_table,
+        key_column=args.key_column,
+        partitions=args.partitions,
+        fanout=args.fanout,
+        leaf_rows=args.leaf_rows,
+        max_differences=args.max_differences
+    )
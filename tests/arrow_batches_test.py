@@ -0,0 +1,66 @@
+from decimal import Decimal
+from datetime import date, datetime
+import pytest
+from operations.arrow_batches import ArrowBatchBuilder, record_batch_rows
+
+pa = pytest.importorskip('pyarrow')
+
+# Cursor description as teradatasql reports it: (name, type code, ..., precision, scale, nullable)
+DESCRIPTION = [
+    ('ID', int, None, None, 10, 0, None),
+    ('PRICE', Decimal, None, None, 10, 2, None),
+    ('REGION', str, None, None, None, None, None),
+    ('CREATED', datetime, None, None, None, None, None),
+    ('SHIPPED', date, None, None, None, None, None),
+    ('AMOUNT', Decimal, None, None, None, None, None),
+]
+
+REGIONS = ('NORTH', 'SOUTH', 'EAST', 'WEST')
+
+
+def make_rows(start, count, amount=None):
+    return [
+        (
+            row_id, Decimal(row_id).scaleb(-2), REGIONS[row_id % 4], datetime(2024, 1, 1, row_id % 24),
+            date(2024, 1, 1 + row_id % 28), amount
+        )
+        for row_id in range(start, start + count)
+    ]
+
+
+def test_batches_are_typed_from_the_description():
+    builder = ArrowBatchBuilder(DESCRIPTION)
+    rows = make_rows(1, 200)
+    batch = builder.build(rows)
+
+    assert batch.num_rows == 200
+    assert batch.schema.field('ID').type == pa.int64()
+    assert batch.schema.field('PRICE').type == pa.decimal128(10, 2)
+    assert batch.schema.field('CREATED').type == pa.timestamp('us')
+    assert batch.schema.field('SHIPPED').type == pa.date32()
+    # Four distinct regions in 200 rows are dictionary encoded
+    assert pa.types.is_dictionary(batch.schema.field('REGION').type)
+    assert record_batch_rows(batch) == rows
+
+
+def test_inferred_columns_keep_one_type_across_batches():
+    builder = ArrowBatchBuilder(DESCRIPTION)
+    # AMOUNT has no declared precision and is all NULL at first
+    assert pa.types.is_null(builder.build(make_rows(1, 10)).schema.field('AMOUNT').type)
+
+    first = builder.build(make_rows(11, 10, Decimal('1.5')))
+    second = builder.build(make_rows(21, 10, Decimal('123456789.5')))
+    assert first.schema.field('AMOUNT').type == pa.decimal128(38, 1)
+    assert second.schema == first.schema
+    assert record_batch_rows(second)[0][5] == Decimal('123456789.5')
+
+
+def test_small_batches_are_not_dictionary_encoded():
+    batch = ArrowBatchBuilder(DESCRIPTION).build(make_rows(1, 10))
+    assert batch.schema.field('REGION').type == pa.string()
+
+
+def test_empty_batch_has_every_column():
+    batch = ArrowBatchBuilder(DESCRIPTION).build([])
+    assert batch.num_rows == 0
+    assert batch.schema.names == [column[0] for column in DESCRIPTION]
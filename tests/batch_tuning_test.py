@@ -0,0 +1,51 @@
+from operations.batch_tuning import BatchSizeTuner, load_batch_size_hint, save_batch_size_hint
+
+
+def test_size_moves_at_most_a_factor_of_two_per_step():
+    tuner = BatchSizeTuner(initial_size=10000, target_seconds=5.0)
+    # 1 us per row: the ideal size of 5,000,000 rows is approached in steps
+    tuner.observe_fetch(10000, 0.01, 10000 * 100)
+    assert tuner.current() == 20000
+    tuner.observe_fetch(20000, 0.02, 20000 * 100)
+    assert tuner.current() == 40000
+
+
+def test_slow_loads_shrink_the_batch():
+    tuner = BatchSizeTuner(initial_size=100000, min_size=1000, target_seconds=1.0)
+    tuner.observe_fetch(100000, 1.0, 100000 * 100)
+    tuner.observe_load(100000, 9.0)
+    assert tuner.current() == 50000
+
+
+def test_size_respects_byte_budget_and_bounds():
+    tuner = BatchSizeTuner(initial_size=10000, max_size=1000000, target_seconds=60.0, max_batch_bytes=1000 * 1000)
+    tuner.observe_fetch(10000, 0.001, 10000 * 1000)
+    assert tuner.current() == 1000
+
+    tuner = BatchSizeTuner(initial_size=10000, min_size=5000, target_seconds=0.001)
+    tuner.observe_fetch(10000, 10.0, 10000)
+    assert tuner.current() == 5000
+
+
+def test_overlapped_stages_are_sized_by_the_slower_one():
+    sequential = BatchSizeTuner(initial_size=10000, target_seconds=1.0)
+    overlapped = BatchSizeTuner(initial_size=10000, target_seconds=1.0, overlapped=True)
+    for tuner in (sequential, overlapped):
+        tuner.observe_fetch(10000, 0.6, 10000)
+        tuner.observe_load(10000, 0.6)
+    assert sequential.current() < overlapped.current()
+
+
+def test_small_adjustments_are_ignored():
+    tuner = BatchSizeTuner(initial_size=10000, target_seconds=1.0)
+    tuner.observe_fetch(10000, 1.05, 10000)
+    assert tuner.current() == 10000
+
+
+def test_hint_round_trip(tmp_path):
+    hints_path = str(tmp_path / 'hints.json')
+    assert load_batch_size_hint('db.Orders', hints_path) is None
+    save_batch_size_hint('db.Orders', 25000, 120, hints_path)
+    save_batch_size_hint('db.Items', 5000, hints_path=hints_path)
+    assert load_batch_size_hint('DB.ORDERS', hints_path) == 25000
+    assert load_batch_size_hint('db.items', hints_path) == 5000
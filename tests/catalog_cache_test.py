@@ -0,0 +1,70 @@
+import json
+import threading
+import operations.catalog_cache as catalog_cache
+from operations.catalog_cache import CatalogCache
+
+
+def test_batch_writes_the_file_once(tmp_path, monkeypatch):
+    cache = CatalogCache(str(tmp_path / 'cache.json'), ttl=60)
+    writes = []
+    write_file = cache._write_file
+    monkeypatch.setattr(cache, '_write_file', lambda entries: (writes.append(1), write_file(entries)))
+
+    with cache.batch():
+        threads = [
+            threading.Thread(target=cache.put, args=('teradata', f"tables:DB{i}", [f"T{i}"]))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert writes == []
+        assert cache.get('teradata', 'tables:DB7') == ['T7']
+
+    assert len(writes) == 1
+    assert CatalogCache(cache.path, ttl=60).get('teradata', 'tables:DB19') == ['T19']
+
+
+def test_caches_sharing_a_file_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    first = CatalogCache(path, ttl=60)
+    second = CatalogCache(path, ttl=60)
+    # Both have read the file before either writes
+    assert first.get('teradata', 'databases') is None
+    assert second.get('snowflake', 'databases') is None
+
+    first.put('teradata', 'databases', ['A'])
+    with second.batch():
+        second.put('snowflake', 'databases', ['B'])
+
+    reread = CatalogCache(path, ttl=60)
+    assert reread.get('teradata', 'databases') == ['A']
+    assert reread.get('snowflake', 'databases') == ['B']
+    assert not (tmp_path / 'cache.json.lock').exists()
+
+
+def test_put_returns_the_value_as_read_back(tmp_path):
+    cache = CatalogCache(str(tmp_path / 'cache.json'), ttl=60)
+    assert cache.get_or_load('teradata', 'columns', lambda: [('ID', 1)]) == [['ID', 1]]
+    assert cache.get_or_load('teradata', 'columns', lambda: 1 / 0) == [['ID', 1]]
+
+
+def test_invalidate_drops_written_and_pending_entries(tmp_path):
+    cache = CatalogCache(str(tmp_path / 'cache.json'), ttl=60)
+    cache.put('teradata', 'tables:A', ['T1'])
+    with cache.batch():
+        cache.put('teradata', 'tables:B', ['T2'])
+        cache.put('teradata', 'databases', ['A', 'B'])
+        assert cache.invalidate('teradata', 'tables') == 2
+
+    entries = json.loads((tmp_path / 'cache.json').read_text())
+    assert list(entries[catalog_cache.catalog_scope('teradata')]) == ['databases']
+
+
+def test_stale_lock_is_broken(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_cache, 'CACHE_LOCK_STALE_SECONDS', 0)
+    path = str(tmp_path / 'cache.json')
+    open(f"{path}.lock", 'w').close()
+    CatalogCache(path, ttl=60).put('teradata', 'databases', ['A'])
+    assert CatalogCache(path, ttl=60).get('teradata', 'databases') == ['A']
@@ -0,0 +1,108 @@
+import pytest
+from operations.catalog_snapshot import CatalogSnapshot
+from operations.catalog_diff import diff_catalogs, work_list
+
+
+@pytest.fixture
+def source():
+    """
+    Teradata catalog of database SALES.
+    """
+    snapshot = CatalogSnapshot('teradata')
+    for table in ('ORDERS', 'ITEMS', 'EMPTY', 'SAME'):
+        snapshot.add_table('SALES', None, table)
+        snapshot.add_column('SALES', None, table, 'ID', 'INTEGER', 4, None, None, False, 1)
+    snapshot.add_column('SALES', None, 'ORDERS', 'AMT', 'DECIMAL', 8, 18, 2, True, 2)
+    snapshot.add_column('SALES', None, 'ITEMS', 'NAME', 'VARCHAR', 40, None, None, True, 2)
+    snapshot.add_role('R_READ')
+    snapshot.add_role('r_write')
+    snapshot.add_user('BOB')
+    snapshot.add_grant('R_READ', 'ROLE', 'SELECT', 'TABLE', 'SALES', None, 'ORDERS')
+    snapshot.add_grant('R_READ', 'ROLE', 'SELECT', 'TABLE', 'SALES', None, 'SAME')
+    snapshot.add_grant('R_READ', 'ROLE', 'CREATE TABLE', 'DATABASE', 'SALES')
+    snapshot.add_grant('BOB', 'USER', 'USAGE', 'ROLE', object_name='R_READ')
+    return snapshot
+
+
+@pytest.fixture
+def target():
+    """
+    Snowflake catalog of database DW, where SALES was partly migrated to schema SALES.
+    """
+    snapshot = CatalogSnapshot('snowflake')
+    for table, rows in (('ITEMS', 5), ('EMPTY', 0), ('SAME', 3), ('OLD', 1)):
+        snapshot.add_table('DW', 'SALES', table)
+        snapshot.set_size('DW', 'SALES', table, 10, rows)
+        snapshot.add_column('DW', 'SALES', table, 'ID', 'NUMBER', None, 38, 0, False, 1)
+    snapshot.add_table('DW', 'OTHER', 'X')
+    snapshot.add_role('r_read')
+    snapshot.add_role('SYSADMIN')
+    snapshot.add_role('LEGACY')
+    snapshot.add_user('bob')
+    snapshot.add_grant('R_READ', 'ROLE', 'SELECT', 'TABLE', 'DW', 'SALES', 'SAME')
+    return snapshot
+
+
+def test_diff_matches_normalized_names(source, target):
+    diff = diff_catalogs(source, target, 'dw')
+
+    assert [entry['key'] for entry in diff['tables']['missing']] == [('DW', 'SALES', 'ORDERS')]
+    # Schemas no source table maps to are not searched
+    assert diff['tables']['extra'] == [('DW', 'SALES', 'OLD')]
+    assert [entry['key'] for entry in diff['tables']['changed']] == [('DW', 'SALES', 'EMPTY'), ('DW', 'SALES', 'ITEMS')]
+    assert diff['roles'] == {'missing': ['R_WRITE'], 'extra': ['LEGACY']}
+    assert diff['users'] == {'missing': [], 'extra': []}
+    assert diff['grants']['unmapped'] == 1
+
+
+def test_work_list_is_minimal_and_ordered(source, target):
+    work = diff_catalogs(source, target, 'dw')['work']
+
+    assert [item['action'] for item in work] == [
+        'create_role', 'create_table', 'add_column', 'migrate_table', 'migrate_table', 'grant', 'grant'
+    ]
+    assert work[1]['statement'] == (
+        'CREATE TABLE IF NOT EXISTS "DW"."SALES"."ORDERS" ("ID" NUMBER(38, 0) NOT NULL, "AMT" NUMBER(18, 2))'
+    )
+    assert work[2]['statement'] == 'ALTER TABLE "DW"."SALES"."ITEMS" ADD COLUMN "NAME" VARCHAR(40)'
+    assert [(item['source_table'], item['target_table']) for item in work[3:5]] == [
+        ('SALES.ORDERS', 'DW.SALES.ORDERS'), ('SALES.EMPTY', 'DW.SALES.EMPTY')
+    ]
+    assert [item['statement'] for item in work[5:]] == [
+        'GRANT ROLE "R_READ" TO USER "BOB"',
+        'GRANT SELECT ON TABLE "DW"."SALES"."ORDERS" TO ROLE "R_READ"'
+    ]
+
+
+def test_row_count_difference_is_synced(source, target):
+    source.set_size('SALES', None, 'SAME', 10, 7)
+    work = diff_catalogs(source, target, 'dw')['work']
+    assert {'action': 'sync_table', 'source_table': 'SALES.SAME', 'target_table': 'DW.SALES.SAME'} in work
+
+
+def test_matching_catalogs_need_no_work(source):
+    target = CatalogSnapshot('snowflake')
+    for table in source.tables.values():
+        target.add_table('DW', table['database'], table['name'])
+        for column in table['columns']:
+            target.add_column('DW', table['database'], table['name'], column['name'], column['type'])
+    for role in source.roles.values():
+        target.add_role(role)
+    target.add_user('BOB')
+    target.add_grant('BOB', 'USER', 'USAGE', 'ROLE', object_name='R_READ')
+    for name in ('ORDERS', 'SAME'):
+        target.add_grant('R_READ', 'ROLE', 'SELECT', 'TABLE', 'DW', 'SALES', name)
+
+    assert diff_catalogs(source, target, 'DW')['work'] == []
+
+
+def test_teradata_diff_needs_target_database(source, target, monkeypatch):
+    monkeypatch.delenv('SNOWFLAKE_DATABASE', raising=False)
+    with pytest.raises(ValueError):
+        diff_catalogs(source, target)
+
+
+def test_work_list_of_empty_diff():
+    empty = {'missing': [], 'extra': [], 'changed': []}
+    diff = {'tables': empty, 'roles': {'missing': []}, 'users': {'missing': []}, 'grants': {'missing': []}}
+    assert work_list(diff) == []
@@ -0,0 +1,204 @@
+import re
+from decimal import Decimal
+import pytest
+import operations.catalog_snapshot as catalog_snapshot
+from config.connection_pool import get_pool
+from operations.catalog_cache import CatalogCache
+from operations.catalog_snapshot import take_catalog_snapshot
+
+# Canned catalog rows by the last part of the first name after FROM in a query
+TERADATA_CATALOG = {
+    'DatabasesV': [('SALES     ',)],
+    'TablesV': [('SALES', 'ORDERS    ', 'T'), ('SALES', 'ORDERS_V', 'V')],
+    'ColumnsV': [
+        ('SALES', 'ORDERS', 'ID', 'I', 4, None, None, 'N', 1),
+        ('SALES', 'ORDERS', 'AMOUNT', 'D', 8, Decimal('12'), Decimal('2'), 'Y', 2),
+        ('SALES', 'DROPPED', 'ID', 'I', 4, None, None, 'N', 1),
+    ],
+    'TableSizeV': [('SALES', 'ORDERS', Decimal('409600'))],
+    'RolesV': [('ANALYST',), ('REPORTING',)],
+    'UsersV': [('ETL_USER',)],
+    'AllRoleRightsV': [('ANALYST', 'SALES', 'All', 'R'), ('ANALYST', 'SALES', 'ORDERS', 'U')],
+    'RoleMembersV': [('ANALYST', 'ETL_USER'), ('REPORTING', 'ANALYST')],
+}
+
+SQL_SERVER_CATALOG = {
+    'databases': [('SALES',), ('HR',)],
+    'schemas': [('SALES', 'dbo'), ('HR', 'dbo'), ('HR', 'payroll')],
+    'objects': [('SALES', 'dbo', 'Orders', 'TABLE'), ('HR', 'payroll', 'Salaries', 'TABLE')],
+    'columns': [
+        ('SALES', 'dbo', 'Orders', 'OrderId', 'int', 4, 10, 0, False, 1),
+        ('HR', 'payroll', 'Salaries', 'Amount', 'decimal', 9, 12, 2, True, 1),
+    ],
+    'partitions': [('SALES', 'dbo', 'Orders', 81920, 1200), ('HR', 'payroll', 'Salaries', 16384, 40)],
+    'database_principals': [('HR', 'payroll_readers', 'R'), ('HR', 'app_user', 'S')],
+    'database_permissions': [
+        ('HR', 'payroll_readers', 'R', 'SELECT', 'GRANT', 'OBJECT_OR_COLUMN', 'payroll', 'Salaries'),
+        ('HR', 'app_user', 'S', 'DELETE', 'DENY', 'SCHEMA', None, None),
+    ],
+    'database_role_members': [('HR', 'payroll_readers', 'app_user', 'S')],
+}
+
+SNOWFLAKE_CATALOG = {
+    'DATABASES': [('SALES',)],
+    'SCHEMATA': [('SALES', 'PUBLIC'), ('SALES', 'INFORMATION_SCHEMA')],
+    'TABLES': [('SALES', 'PUBLIC', 'ORDERS', 'BASE TABLE', 2048, 1200)],
+    'COLUMNS': [('SALES', 'PUBLIC', 'ORDERS', 'ID', 'NUMBER', None, 38, 0, 'NO', 1)],
+    'ROLES': [('ANALYST',)],
+    'USERS': [('ETL_USER',)],
+    'GRANTS_TO_ROLES': [
+        ('ANALYST', 'USAGE', 'DATABASE', None, None, 'SALES'),
+        ('ANALYST', 'USAGE', 'SCHEMA', 'SALES', None, 'PUBLIC'),
+        ('ANALYST', 'SELECT', 'TABLE', 'SALES', 'PUBLIC', 'ORDERS'),
+        ('ANALYST', 'USAGE', 'WAREHOUSE', None, None, 'LOAD_WH'),
+    ],
+    'GRANTS_TO_USERS': [('ETL_USER', 'ANALYST')],
+}
+
+
+class CatalogCursor:
+    """
+    Cursor stand-in answering each catalog query with the canned rows of the
+    catalog view it reads from, and recording the queries.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.connection.queries.append(query)
+        source = re.search(r'\bFROM\s+(\S+)', query).group(1)
+        self.rows = list(self.connection.catalog.get(source.split('.')[-1], []))
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def close(self):
+        pass
+
+
+class CatalogConnection:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.queries = []
+
+    def cursor(self):
+        return CatalogCursor(self)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def connections(monkeypatch, tmp_path):
+    """
+    Catalog stand-ins of the three systems, and a catalog cache in tmp_path.
+    """
+    connections = {
+        'teradata': CatalogConnection(TERADATA_CATALOG),
+        'sql_server': CatalogConnection(SQL_SERVER_CATALOG),
+        'snowflake': CatalogConnection(SNOWFLAKE_CATALOG)
+    }
+    factories = [
+        lambda: connections['teradata'], lambda: connections['sql_server'], lambda: connections['snowflake']
+    ]
+    monkeypatch.setattr(catalog_snapshot, 'get_teradata_connection', factories[0])
+    monkeypatch.setattr(catalog_snapshot, 'get_sql_server_connection', factories[1])
+    monkeypatch.setattr(catalog_snapshot, 'get_snowflake_connection', factories[2])
+    cache = CatalogCache(str(tmp_path / 'catalog_cache.json'))
+    monkeypatch.setattr(catalog_snapshot, 'get_catalog_cache', lambda: cache)
+    yield connections
+    for factory in factories:
+        get_pool(factory).close()
+
+
+def test_teradata_snapshot(connections):
+    snapshot = catalog_snapshot.snapshot_teradata()
+
+    assert snapshot.summary() == {
+        'databases': 1, 'schemas': 0, 'tables': 2, 'columns': 2, 'bytes': 409600,
+        'roles': 2, 'users': 1, 'grants': 4
+    }
+    orders = snapshot.table('sales', None, 'orders')
+    assert (orders['kind'], orders['size_bytes'], orders['row_count']) == ('TABLE', 409600, None)
+    assert orders['columns'][1] == {
+        'name': 'AMOUNT', 'type': 'DECIMAL', 'length': 8, 'precision': 12, 'scale': 2,
+        'nullable': True, 'position': 2
+    }
+    assert snapshot.table('SALES', None, 'ORDERS_V')['kind'] == 'VIEW'
+
+    grants = snapshot.grants_to('analyst')
+    assert [(grant['privilege'], grant['object_type'], grant['object']) for grant in grants] == [
+        ('SELECT', 'DATABASE', None), ('UPDATE', 'TABLE', 'ORDERS'), ('USAGE', 'ROLE', 'REPORTING')
+    ]
+    assert grants[2]['grantee_type'] == 'ROLE'
+    assert snapshot.grants_to('ETL_USER')[0]['grantee_type'] == 'USER'
+
+
+def test_sql_server_snapshot_reads_every_database_in_one_query(connections):
+    snapshot = catalog_snapshot.snapshot_sql_server()
+
+    assert sorted(snapshot.databases.values()) == ['HR', 'SALES']
+    salaries = snapshot.table('hr', 'payroll', 'salaries')
+    assert (salaries['size_bytes'], salaries['row_count']) == (16384, 40)
+    assert [column['name'] for column in salaries['columns']] == ['Amount']
+    assert snapshot.tables_in('HR', 'dbo') == []
+
+    assert snapshot.grants_to('payroll_readers')[0] == {
+        'grantee': 'payroll_readers', 'grantee_type': 'ROLE', 'privilege': 'SELECT', 'state': 'GRANT',
+        'object_type': 'TABLE', 'database': 'HR', 'schema': 'payroll', 'object': 'Salaries'
+    }
+    deny, membership = snapshot.grants_to('app_user')
+    assert (deny['state'], deny['object_type'], deny['object']) == ('DENY', 'SCHEMA', None)
+    assert (membership['privilege'], membership['object']) == ('USAGE', 'payroll_readers')
+
+    schemas_query = connections['sql_server'].queries[1]
+    assert '[SALES].sys.schemas' in schemas_query and '[HR].sys.schemas' in schemas_query
+    assert 'UNION ALL' in schemas_query
+
+
+def test_snowflake_snapshot_from_account_usage(connections):
+    snapshot = catalog_snapshot.snapshot_snowflake()
+
+    assert list(snapshot.schemas) == [('SALES', 'PUBLIC')]
+    orders = snapshot.table('SALES', 'PUBLIC', 'ORDERS')
+    assert (orders['size_bytes'], orders['row_count'], orders['columns'][0]['nullable']) == (2048, 1200, False)
+    grants = [
+        (grant['object_type'], grant['database'], grant['schema'], grant['object'])
+        for grant in snapshot.grants_to('ANALYST')
+    ]
+    assert grants == [
+        ('DATABASE', 'SALES', None, None),
+        ('SCHEMA', 'SALES', 'PUBLIC', None),
+        ('TABLE', 'SALES', 'PUBLIC', 'ORDERS'),
+        ('WAREHOUSE', None, None, 'LOAD_WH'),
+    ]
+    assert all('INFORMATION_SCHEMA.' not in query for query in connections['snowflake'].queries)
+
+
+def test_snowflake_snapshot_of_some_databases_reads_information_schema(connections):
+    catalog_snapshot.snapshot_snowflake(['SALES'])
+    queries = connections['snowflake'].queries
+    assert any('FROM SALES.INFORMATION_SCHEMA.TABLES' in query for query in queries)
+    assert not any('ACCOUNT_USAGE.TABLES' in query for query in queries)
+
+
+def test_snapshots_are_cached(connections):
+    queries = connections['teradata'].queries
+    snapshot = take_catalog_snapshot('teradata')
+    queries_of_first_read = len(queries)
+
+    cached = take_catalog_snapshot('teradata')
+    assert len(queries) == queries_of_first_read
+    assert cached.to_dict() == snapshot.to_dict()
+    assert cached.grants_to('ANALYST') == snapshot.grants_to('ANALYST')
+
+    take_catalog_snapshot('teradata', refresh=True)
+    assert len(queries) == 2 * queries_of_first_read
+
+
+def test_unknown_system_is_rejected():
+    with pytest.raises(ValueError):
+        take_catalog_snapshot('oracle')
@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+import pytest
+from config.connection_pool import ConnectionPool
+
+
+class ConnectionFactory:
+    """
+    Opens in-memory SQLite connections and counts them.
+    """
+
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        self.opened.append(connection)
+        return connection
+
+
+def test_checkouts_are_reentrant_per_thread():
+    pool = ConnectionPool(ConnectionFactory())
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner is outer
+
+    pool.release(inner)
+    assert pool.idle == []
+    pool.release(outer)
+    assert len(pool.idle) == 1 and pool.in_use == {}
+
+
+def test_nested_with_blocks_share_a_connection():
+    pool = ConnectionPool(ConnectionFactory())
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+        assert id(outer) in pool.in_use
+    assert pool.in_use == {}
+
+
+def test_threads_get_their_own_connection():
+    factory = ConnectionFactory()
+    pool = ConnectionPool(factory)
+    held = threading.Event()
+    done = threading.Event()
+    connections = {}
+
+    def worker():
+        with pool.connection() as connection:
+            connections['worker'] = connection
+            held.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    held.wait(5)
+    with pool.connection() as connection:
+        connections['main'] = connection
+    done.set()
+    thread.join()
+
+    assert connections['main'] is not connections['worker']
+    assert len(factory.opened) == 2
+
+
+def test_released_connections_are_reused():
+    factory = ConnectionFactory()
+    pool = ConnectionPool(factory)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(factory.opened) == 1
+
+
+def test_checkout_times_out_at_max_size():
+    pool = ConnectionPool(ConnectionFactory(), max_size=1, checkout_timeout=0.1)
+    connection = pool.acquire()
+    errors = []
+
+    def worker():
+        try:
+            pool.acquire()
+        except TimeoutError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    pool.release(connection)
+    assert len(errors) == 1
+
+
+def test_broken_connection_is_replaced_when_unhealthy():
+    factory = ConnectionFactory()
+    pool = ConnectionPool(factory)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            connection.close()
+            raise RuntimeError('query failed')
+
+    with pool.connection() as replacement:
+        assert replacement is not connection
+    assert len(factory.opened) == 2
+
+
+def test_release_from_another_thread_is_rejected():
+    pool = ConnectionPool(ConnectionFactory())
+    connection = pool.acquire()
+    errors = []
+
+    def worker():
+        try:
+            pool.release(connection)
+        except ValueError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    pool.release(connection)
+    assert len(errors) == 1
@@ -0,0 +1,43 @@
+import sys
+import pytest
+import operations.teradata_operations as teradata_operations
+from config.lazy_imports import lazy_import, driver_error, MissingModuleError
+
+
+@pytest.fixture
+def driver_module(tmp_path, monkeypatch):
+    """
+    An installed but not yet imported module defining Error.
+    """
+    (tmp_path / 'fake_driver.py').write_text("class Error(Exception):\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield 'fake_driver'
+    sys.modules.pop('fake_driver', None)
+
+
+def test_missing_module_is_none():
+    assert lazy_import('no_such_driver') is None
+    assert lazy_import('no_such_package.driver') is None
+    assert driver_error(None) is MissingModuleError
+
+
+def test_driver_error_does_not_import(driver_module):
+    module = lazy_import(driver_module)
+    assert driver_error(module) is MissingModuleError
+    assert driver_module not in sys.modules
+
+
+def test_driver_error_of_imported_module(driver_module):
+    module = lazy_import(driver_module)
+    error = module.Error
+    assert driver_error(module) is error
+
+
+def test_handler_lets_other_errors_through(monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("One or more connection parameters are missing.")
+
+    monkeypatch.setattr(teradata_operations, 'cached_catalog_query', fail)
+    monkeypatch.setattr(teradata_operations, 'teradatasql', None)
+    with pytest.raises(ValueError, match='connection parameters'):
+        teradata_operations.show_databases()
@@ -0,0 +1,66 @@
+import pytest
+import scripts.migrate_database as migrate_database
+from logs.migration_checkpoints import CheckpointStore
+from scripts.migrate_database import plan_tables, unfinished_tables
+
+PLAN = {
+    'sort_columns': ['ID'],
+    'partition_method': 'range',
+    'partitions': [
+        {'index': 0, 'predicate': 'ID < ?', 'params': [100]},
+        {'index': 1, 'predicate': 'ID >= ?', 'params': [100]}
+    ]
+}
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """
+    Teradata catalog stand-in: SALES holds ORDERS, CUSTOMERS and a view, all but the view keyed by ID.
+    """
+    monkeypatch.setattr(migrate_database, 'show_tables', lambda database_name: ['ORDERS ', 'CUSTOMERS', 'ORDERS_V'])
+    monkeypatch.setattr(migrate_database, 'get_table_sizes', lambda database_name: {'ORDERS': 4096, 'CUSTOMERS': 8192})
+    monkeypatch.setattr(
+        migrate_database, 'get_unique_key_columns', lambda database_name: {'ORDERS': ['ID'], 'CUSTOMERS': ['ID']}
+    )
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    """
+    Checkpoints of a run of SALES.ORDERS that crashed after its first partition,
+    and of a completed run of SALES.CUSTOMERS.
+    """
+    path = str(tmp_path / 'checkpoints.db')
+    store = CheckpointStore(path)
+    store.start_run('SALES.ORDERS', 'PUBLIC.ORDERS', PLAN)
+    store.mark_completed('SALES.ORDERS', 'PUBLIC.ORDERS', 0)
+    store.save_checkpoint('SALES.ORDERS', 'PUBLIC.ORDERS', 1, (150,), 50)
+    store.start_run('SALES.CUSTOMERS', 'PUBLIC.CUSTOMERS', PLAN)
+    store.mark_completed('SALES.CUSTOMERS', 'PUBLIC.CUSTOMERS', 0)
+    store.mark_completed('SALES.CUSTOMERS', 'PUBLIC.CUSTOMERS', 1)
+    store.close()
+    return path
+
+
+def test_full_plan_is_largest_first(database):
+    plan, skipped = plan_tables('SALES', 'PUBLIC')
+    assert [entry['target_table'] for entry in plan] == ['PUBLIC.CUSTOMERS', 'PUBLIC.ORDERS']
+    assert skipped == [('ORDERS_V', 'not a table')]
+
+
+def test_unfinished_runs(checkpoint_path):
+    assert unfinished_tables(checkpoint_path) == {('SALES.ORDERS', 'PUBLIC.ORDERS')}
+
+
+def test_delta_resumes_partly_loaded_tables(database, checkpoint_path):
+    # ORDERS already holds rows and Teradata snapshots carry no row counts, so the diff has no work for it
+    plan, skipped = plan_tables('SALES', 'PUBLIC', delta=[], unfinished=unfinished_tables(checkpoint_path), resume=True)
+    assert [entry['source_table'] for entry in plan] == ['SALES.ORDERS']
+    assert ('CUSTOMERS', 'already in Snowflake') in skipped
+
+
+def test_delta_without_resume_reports_partly_loaded_tables(database, checkpoint_path):
+    plan, skipped = plan_tables('SALES', 'PUBLIC', delta=[], unfinished=unfinished_tables(checkpoint_path))
+    assert plan == []
+    assert ('ORDERS', 'partly migrated by an unfinished run; rerun with --resume') in skipped
@@ -0,0 +1,128 @@
+import importlib
+import pytest
+
+
+@pytest.fixture
+def roles(tmp_path, monkeypatch):
+    """
+    scripts.migrate_roles_dynamic, imported from tmp_path so the log folder
+    it creates on import does not land in the repository.
+    """
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module('scripts.migrate_roles_dynamic')
+
+
+def test_grant_key_includes_the_database(roles):
+    assert roles.grant_key('select', 'DW.DBO.ORDERS') == ('SELECT', 'DW', 'DBO', 'ORDERS')
+    assert roles.grant_key('SELECT', 'dbo.orders', 'dw') == ('SELECT', 'DW', 'DBO', 'ORDERS')
+    assert roles.grant_key('SELECT', 'dbo.orders', 'staging') != roles.grant_key('SELECT', 'dbo.orders', 'dw')
+
+
+def test_held_grant_is_satisfied(roles):
+    existing = {('SELECT', 'DW', 'DBO', 'ORDERS')}
+    assert roles.grant_satisfied(existing, 'dbo', 'orders', 'GRANT SELECT', 'DW')
+    assert not roles.grant_satisfied(existing, 'dbo', 'orders', 'GRANT SELECT', 'STAGING')
+    assert not roles.grant_satisfied(existing, 'dbo', 'items', 'GRANT SELECT', 'DW')
+    assert not roles.grant_satisfied(existing, 'dbo', 'orders', 'GRANT INSERT', 'DW')
+
+
+def test_revoke_is_satisfied_when_nothing_is_held(roles):
+    existing = {('DELETE', 'DW', 'DBO', 'ORDERS')}
+    assert roles.grant_satisfied(existing, 'dbo', 'items', 'REVOKE DELETE', 'DW')
+    assert not roles.grant_satisfied(existing, 'dbo', 'orders', 'REVOKE DELETE', 'DW')
+
+
+def test_unknown_or_schema_wide_grants_are_never_satisfied(roles):
+    assert not roles.grant_satisfied(None, 'dbo', 'orders', 'GRANT SELECT', 'DW')
+    assert not roles.grant_satisfied(set(), 'dbo', None, 'REVOKE SELECT', 'DW')
+
+
+class RecordingCursor:
+    """
+    Cursor stand-in answering each statement with the rows of the first
+    answer whose text it contains, and recording the statements.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, statement):
+        self.connection.statements.append(' '.join(statement.split()))
+        self.rows = next((rows for text, rows in self.connection.answers if text in statement), [])
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, answers):
+        self.answers = answers
+        self.statements = []
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def close(self):
+        pass
+
+
+# GRANTEE_NAME, PRIVILEGE, TABLE_CATALOG, TABLE_SCHEMA, NAME rows of ACCOUNT_USAGE.GRANTS_TO_ROLES
+GRANTS_TO_ROLES = [('ANALYST', 'SELECT', 'DW', 'DBO', 'ORDERS'), ('ANALYST', 'SELECT', 'STAGING', 'DBO', 'ITEMS')]
+
+
+def test_grants_of_all_roles_are_read_in_one_query(roles):
+    snow_conn = RecordingConnection([('GRANTS_TO_ROLES', GRANTS_TO_ROLES)])
+    grants = roles.load_snowflake_grants(snow_conn, ['analyst', 'Reporting'])
+
+    assert grants == {
+        'ANALYST': {('SELECT', 'DW', 'DBO', 'ORDERS'), ('SELECT', 'STAGING', 'DBO', 'ITEMS')},
+        'REPORTING': set()
+    }
+    [query] = snow_conn.statements
+    assert "GRANTEE_NAME IN ('ANALYST', 'REPORTING')" in query
+    assert roles.load_snowflake_grants(snow_conn, []) == {}
+    assert len(snow_conn.statements) == 1
+
+
+def test_migration_creates_missing_roles_and_grants_missing_privileges(roles, monkeypatch):
+    sql_conn = RecordingConnection([('sys.database_principals', [
+        ('analyst', 'DATABASE_ROLE', 'dbo', 'orders', 'SELECT', 'GRANT'),
+        ('analyst', 'DATABASE_ROLE', 'dbo', 'items', 'SELECT', 'GRANT'),
+        ('auditor', 'DATABASE_ROLE', 'dbo', 'orders', 'SELECT', 'GRANT'),
+        ('loader', 'DATABASE_ROLE', None, None, None, None),
+    ])])
+    snow_conn = RecordingConnection([
+        ('SHOW ROLES', [('2024-01-01', 'ANALYST')]),
+        ('CURRENT_DATABASE', [('DW',)]),
+        ('GRANTS_TO_ROLES', GRANTS_TO_ROLES),
+    ])
+    invalidated = []
+
+    class Cache:
+        def invalidate(self, system=None, key_prefix=''):
+            invalidated.append((system, key_prefix))
+
+    monkeypatch.setattr(roles, 'sql_server_database_connection', lambda database_name: lambda: sql_conn)
+    monkeypatch.setattr(roles, 'get_snowflake_connection', lambda: snow_conn)
+    monkeypatch.setattr(roles, 'get_catalog_cache', lambda: Cache())
+    roles.migrate_roles('migration_data')
+
+    issued = [statement for statement in snow_conn.statements if statement.startswith(('CREATE', 'GRANT'))]
+    # ITEMS is only granted in STAGING, not in the current database DW
+    assert issued == [
+        'GRANT SELECT ON dbo.items TO ROLE analyst',
+        'CREATE ROLE IF NOT EXISTS auditor',
+        'GRANT SELECT ON dbo.orders TO ROLE auditor',
+        'CREATE ROLE IF NOT EXISTS loader',
+    ]
+    assert invalidated == [('snowflake', 'roles')]
@@ -0,0 +1,62 @@
+import json
+import pytest
+from logs.migration_metrics import Histogram, create_metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    for value in (0.05, 0.1, 0.5, 5, 50):
+        histogram.observe(value)
+
+    assert list(histogram.cumulative()) == [(0.1, 2), (1, 3), (10, 4), (float('inf'), 5)]
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(55.65)
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    assert histogram.quantile(0.5) == 0.0
+    for value in [0.05] * 90 + [0.5] * 9 + [50]:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.95) == 1
+    # Observations above the last bucket report its bound
+    assert histogram.quantile(1.0) == 10
+
+
+def test_jsonl_sink_writes_one_event_per_observation(tmp_path):
+    path = tmp_path / 'job.jsonl'
+    metrics = create_metrics('job', 'jsonl', str(path))
+    metrics.observe('fetch', 0.25, rows=100, bytes=4096, partition=3)
+    with pytest.raises(RuntimeError):
+        with metrics.timer('load', rows=100):
+            raise RuntimeError('load failed')
+    metrics.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event['stage'] for event in events] == ['fetch', 'load']
+    assert events[0]['rows'] == 100 and events[0]['partition'] == 3
+    assert events[1]['error'] is True
+    assert metrics.snapshot()['load']['errors'] == 1
+
+
+def test_prometheus_sink_writes_textfile_on_close(tmp_path):
+    path = tmp_path / 'job.prom'
+    metrics = create_metrics('job', 'prometheus', str(path))
+    metrics.observe('fetch', 0.02, rows=10, bytes=100, wait=0.5)
+    metrics.observe('fetch', 3, rows=20, bytes=200)
+    metrics.close()
+
+    text = path.read_text()
+    assert 'migration_stage_seconds_bucket{job="job",stage="fetch",le="0.025"} 1' in text
+    assert 'migration_stage_seconds_bucket{job="job",stage="fetch",le="+Inf"} 2' in text
+    assert 'migration_stage_seconds_count{job="job",stage="fetch"} 2' in text
+    assert 'migration_stage_wait_seconds_count{job="job",stage="fetch"} 1' in text
+    assert 'migration_stage_rows_total{job="job",stage="fetch"} 30' in text
+    assert not (tmp_path / 'job.prom.tmp').exists()
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        create_metrics('job', 'csv')
@@ -0,0 +1,140 @@
+import re
+import queue
+import logging
+import threading
+import pytest
+import scripts.migration_table as migration_table
+from logs.migration_checkpoints import CheckpointStore
+from scripts.migration_table import PipelineAborted, PipelineStats, put_with_stop, take_with_stop
+
+logger = logging.getLogger('migration_pipeline_test')
+
+# Source table of the pipeline tests
+ROWS = [(row_id, f"name {row_id}") for row_id in range(1, 101)]
+
+
+class SourceCursor:
+    """
+    Teradata cursor stand-in answering the keyset queries on ID with ROWS.
+    """
+
+    description = [('ID', int, None, None, 10, 0, None), ('NAME', str, None, None, None, None, None)]
+
+    def __init__(self):
+        self.result = []
+
+    def execute(self, query, params=None):
+        top = int(re.search(r'\bTOP (\d+)', query).group(1))
+        after = params[-1] if params else None
+        self.result = [row for row in ROWS if after is None or row[0] > after][:top]
+
+    def fetchall(self):
+        return self.fetchmany(len(self.result))
+
+    def fetchmany(self, size=None):
+        chunk, self.result = self.result[:size], self.result[size:]
+        return chunk
+
+    def close(self):
+        pass
+
+
+class StandInConnection:
+    def cursor(self):
+        return SourceCursor()
+
+    def close(self):
+        pass
+
+
+class RecordingLoader:
+    """
+    Loader shared by the load threads, failing on its fail_at-th batch when set.
+    """
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def load_prepared(self, payload, token=None):
+        with self.lock:
+            if len(self.batches) == self.fail_at:
+                raise RuntimeError('load failed')
+            self.batches.append(payload)
+
+    def close(self):
+        pass
+
+    def discard(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path):
+    checkpoint_store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    checkpoint_store.start_run('src', 'tgt', {
+        'sort_columns': ['ID'],
+        'partition_method': 'range',
+        'partitions': [{'index': 0, 'predicate': None, 'params': []}]
+    })
+    yield checkpoint_store
+    checkpoint_store.close()
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    loader = RecordingLoader()
+    monkeypatch.setattr(migration_table, 'get_teradata_connection', StandInConnection)
+    monkeypatch.setattr(migration_table, 'get_snowflake_connection', StandInConnection)
+    monkeypatch.setattr(migration_table, 'create_loader', lambda *args, **kwargs: loader)
+    return loader
+
+
+def run_pipeline(store, batch_size, stats):
+    progress = migration_table.MigrationProgress(len(ROWS), logger)
+    context = migration_table.MigrationContext(
+        'src', 'tgt', ['ID'], batch_size, progress, logger, store, load_mode='insert', pipeline_stats=stats
+    )
+    return migration_table.migrate_partition_pipelined(context, {'index': 0, 'predicate': None, 'params': []})
+
+
+def partition_completed(store):
+    return bool(store.get_checkpoints('src', 'tgt').get(0, {}).get('completed'))
+
+
+def test_put_waits_for_room_in_a_full_queue():
+    work_queue = queue.Queue(maxsize=1)
+    work_queue.put('first')
+    threading.Timer(0.2, work_queue.get).start()
+
+    waited = put_with_stop(work_queue, 'second', threading.Event())
+    assert waited >= 0.1
+    assert work_queue.get_nowait() == 'second'
+
+
+def test_put_and_take_give_up_once_stopped():
+    stop_event = threading.Event()
+    full_queue = queue.Queue(maxsize=1)
+    full_queue.put('first')
+    threading.Timer(0.2, stop_event.set).start()
+
+    with pytest.raises(PipelineAborted):
+        put_with_stop(full_queue, 'second', stop_event)
+    with pytest.raises(PipelineAborted):
+        take_with_stop(queue.Queue(), stop_event)
+
+
+def test_pipeline_loads_every_batch(loader, store):
+    migrated_rows = run_pipeline(store, 30, PipelineStats(1, 2, 2))
+    assert migrated_rows == 100
+    assert sorted(row for batch in loader.batches for row in batch) == ROWS
+    assert partition_completed(store)
+
+
+def test_pipeline_raises_the_error_of_a_load_thread(loader, store):
+    loader.fail_at = 1
+    with pytest.raises(RuntimeError, match='load failed'):
+        run_pipeline(store, 10, PipelineStats(1, 1, 2))
+    assert len(loader.batches) == 1
+    assert not partition_completed(store)
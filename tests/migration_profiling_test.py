@@ -0,0 +1,50 @@
+import logging
+import tracemalloc
+from logs.migration_profiling import MigrationProfiler
+
+
+def test_overlapping_profilers_share_tracemalloc(tmp_path):
+    """
+    A profiler finishing first must not stop tracemalloc under one still running.
+    """
+    assert not tracemalloc.is_tracing()
+    logger = logging.getLogger('migration_profiling_test')
+    first = MigrationProfiler(str(tmp_path / 'first'), snapshot_every=1)
+    second = MigrationProfiler(str(tmp_path / 'second'), snapshot_every=1)
+    first.start()
+    second.start()
+
+    with first.stage('extract'):
+        [bytes(64) for _ in range(100)]
+    first.report(logger)
+    assert tracemalloc.is_tracing()
+
+    with second.stage('extract'):
+        [bytes(64) for _ in range(100)]
+    second.report(logger)
+    assert not tracemalloc.is_tracing()
+    assert 'extract' in second.snapshots
+
+
+def test_stage_without_tracing_skips_snapshots(tmp_path):
+    """
+    Blocks run after tracemalloc stopped are profiled without allocation snapshots.
+    """
+    profiler = MigrationProfiler(str(tmp_path / 'run'), snapshot_every=1)
+    profiler.start()
+    profiler.stop()
+    with profiler.stage('load'):
+        pass
+    assert profiler.snapshots == {}
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running(tmp_path):
+    tracemalloc.start()
+    try:
+        profiler = MigrationProfiler(str(tmp_path / 'run'))
+        profiler.start()
+        profiler.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,135 @@
+import logging
+from types import SimpleNamespace
+import pytest
+import scripts.migration_table as migration_table
+from benchmarks.local_databases import local_snowflake_connection
+from logs.migration_checkpoints import CheckpointStore
+
+logger = logging.getLogger('migration_resume_test')
+
+
+@pytest.fixture
+def target(tmp_path, monkeypatch):
+    """
+    Snowflake stand-in holding target rows with ids 1..10.
+    """
+    get_snowflake_connection = local_snowflake_connection(str(tmp_path / 'snowflake.db'), str(tmp_path / 'stage'))
+    monkeypatch.setattr(migration_table, 'get_snowflake_connection', get_snowflake_connection)
+    conn = get_snowflake_connection()
+    conn.db.execute("CREATE TABLE customers (id INTEGER, name TEXT)")
+    conn.db.executemany("INSERT INTO customers VALUES (?, ?)", [(i, f"name {i}") for i in range(1, 11)])
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    checkpoint_store = CheckpointStore(str(tmp_path / 'checkpoints.db'))
+    yield checkpoint_store
+    checkpoint_store.close()
+
+
+def tracker_context(store):
+    return SimpleNamespace(checkpoint_store=store, source_table='src', target_table='customers')
+
+
+def test_checkpoint_waits_for_earlier_batches(store):
+    store.start_run('src', 'customers', single_partition_plan())
+    tracker = migration_table.CheckpointTracker(tracker_context(store), {'index': 0})
+    first = tracker.register((100,), 100)
+    second = tracker.register((200,), 100)
+    third = tracker.register((300,), 50)
+
+    tracker.commit(third)
+    tracker.commit(second)
+    assert store.get_checkpoints('src', 'customers').get(0, {}).get('last_key') is None
+
+    tracker.commit(first)
+    checkpoint = store.get_checkpoints('src', 'customers')[0]
+    assert checkpoint['last_key'] == (300,)
+    assert checkpoint['migrated_rows'] == 250
+    assert not checkpoint['completed']
+
+    tracker.complete()
+    assert store.get_checkpoints('src', 'customers')[0]['completed']
+
+
+def test_checkpoint_continues_resumed_row_count(store):
+    store.start_run('src', 'customers', single_partition_plan())
+    tracker = migration_table.CheckpointTracker(tracker_context(store), {'index': 0, 'migrated_rows': 1000})
+    tracker.commit(tracker.register((1100,), 100))
+    assert store.get_checkpoints('src', 'customers')[0]['migrated_rows'] == 1100
+
+
+def target_ids(conn):
+    return [row[0] for row in conn.db.execute("SELECT id FROM customers ORDER BY id")]
+
+
+def single_partition_plan():
+    return {
+        'sort_columns': ['id'],
+        'partition_method': 'range',
+        'partitions': [{'index': 0, 'predicate': None, 'params': []}]
+    }
+
+
+def test_resume_deletes_rows_above_checkpoint(target, store):
+    plan = single_partition_plan()
+    store.start_run('src', 'customers', plan)
+    store.save_checkpoint('src', 'customers', 0, (6,), 6)
+
+    pending = migration_table.prepare_resume(store, 'src', 'customers', plan, logger)
+
+    assert [partition['start_key'] for partition in pending] == [(6,)]
+    assert target_ids(target) == [1, 2, 3, 4, 5, 6]
+
+
+def test_resume_deletes_only_inside_partition_range(target, store):
+    plan = {
+        'sort_columns': ['id'],
+        'partition_method': 'range',
+        'partitions': [
+            {'index': 0, 'predicate': 'id < ?', 'params': [6]},
+            {'index': 1, 'predicate': 'id >= ?', 'params': [6]}
+        ]
+    }
+    store.start_run('src', 'customers', plan)
+    store.save_checkpoint('src', 'customers', 0, (5,), 5)
+    store.mark_completed('src', 'customers', 0)
+    store.save_checkpoint('src', 'customers', 1, (8,), 3)
+
+    pending = migration_table.prepare_resume(store, 'src', 'customers', plan, logger)
+
+    assert [partition['index'] for partition in pending] == [1]
+    assert target_ids(target) == [1, 2, 3, 4, 5, 6, 7, 8]
+
+
+def test_resume_without_checkpoint_keeps_target(target, store):
+    plan = single_partition_plan()
+    store.start_run('src', 'customers', plan)
+
+    with pytest.raises(ValueError, match='resume-delete-all'):
+        migration_table.prepare_resume(store, 'src', 'customers', plan, logger)
+    assert len(target_ids(target)) == 10
+
+
+def test_resume_without_checkpoint_deletes_all_when_allowed(target, store, caplog):
+    plan = single_partition_plan()
+    store.start_run('src', 'customers', plan)
+
+    with caplog.at_level(logging.WARNING):
+        pending = migration_table.prepare_resume(store, 'src', 'customers', plan, logger, delete_all=True)
+
+    assert [partition['start_key'] for partition in pending] == [None]
+    assert target_ids(target) == []
+    assert 'deleting all 10 row(s)' in caplog.text
+
+
+def test_resume_without_checkpoint_on_empty_target(target, store):
+    target.db.execute("DELETE FROM customers")
+    plan = single_partition_plan()
+    store.start_run('src', 'customers', plan)
+
+    pending = migration_table.prepare_resume(store, 'src', 'customers', plan, logger)
+
+    assert len(pending) == 1
@@ -0,0 +1,69 @@
+import re
+import logging
+from scripts.migration_table import estimate_row_count
+
+logger = logging.getLogger('migration_table_estimate_test')
+
+
+class CatalogCursor:
+    """
+    Teradata cursor stand-in answering queries on DBC views with canned rows,
+    or raising the exception given for a view.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+        self.row = None
+
+    def execute(self, query, params=None):
+        view = re.search(r'FROM (DBC\.\w+)', query).group(1)
+        self.queries.append((view, query, list(params or [])))
+        if isinstance(self.results.get(view), Exception):
+            raise self.results[view]
+        self.row = self.results.get(view)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class CatalogConnection:
+    def __init__(self, results):
+        self.catalog_cursor = CatalogCursor(results)
+
+    def cursor(self):
+        return self.catalog_cursor
+
+
+def test_collected_statistics_come_first():
+    conn = CatalogConnection({'DBC.StatsV': (5000000,)})
+    assert estimate_row_count(conn, 'sales.orders', logger) == (5000000, 'collected statistics')
+
+    [(view, query, params)] = conn.catalog_cursor.queries
+    assert 'ORDER BY LastCollectTimeStamp DESC' in query
+    assert params == ['sales', 'orders']
+
+
+def test_table_size_is_divided_by_row_width():
+    conn = CatalogConnection({'DBC.StatsV': None, 'DBC.TableSizeV': (1000000,), 'DBC.ColumnsV': (86,)})
+    # 86 declared bytes plus the per-row overhead
+    assert estimate_row_count(conn, 'orders', logger) == (10000, 'table size')
+
+    queries = conn.catalog_cursor.queries
+    assert [view for view, _, _ in queries] == ['DBC.StatsV', 'DBC.TableSizeV', 'DBC.ColumnsV']
+    assert all('DatabaseName = DATABASE' in query and params == ['orders'] for _, query, params in queries)
+
+
+def test_no_estimate_without_statistics_or_size():
+    conn = CatalogConnection({'DBC.StatsV': None, 'DBC.TableSizeV': (None,), 'DBC.ColumnsV': (86,)})
+    assert estimate_row_count(conn, 'sales.orders', logger) == (None, 'unavailable')
+
+
+def test_unreadable_catalog_is_no_estimate(caplog):
+    conn = CatalogConnection({'DBC.StatsV': PermissionError('no SELECT access on DBC.StatsV')})
+    with caplog.at_level(logging.WARNING):
+        assert estimate_row_count(conn, 'sales.orders', logger) == (None, 'unavailable')
+    assert 'no SELECT access' in caplog.text
@@ -0,0 +1,79 @@
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from scripts.migration_table import build_keyset_predicate, build_keyset_query, split_key_range
+
+
+def test_no_predicate_before_first_batch():
+    assert build_keyset_predicate(['id'], None) == ("", [])
+
+
+def test_single_column_predicate():
+    assert build_keyset_predicate(['id'], (42,)) == ("id > ?", [42])
+    assert build_keyset_predicate(['id'], (42,), placeholder='%s') == ("id > %s", [42])
+
+
+def test_composite_predicate_leads_with_range_term():
+    predicate, params = build_keyset_predicate(['a', 'b', 'c'], (1, 2, 3))
+    assert predicate == "a >= ? AND ((a > ?) OR (a = ? AND b > ?) OR (a = ? AND b = ? AND c > ?))"
+    assert params == [1, 1, 1, 2, 1, 2, 3]
+
+
+def test_keyset_query_with_partition():
+    partition = {'predicate': 'a >= ? AND a < ?', 'params': [10, 20]}
+    query, params = build_keyset_query('db.t', ['a', 'b'], 500, (12, 7), partition, ['a', 'b', 'c'])
+    assert 'SELECT TOP 500 a, b, c FROM db.t' in query
+    assert 'WHERE (a >= ? AND a < ?) AND a >= ? AND' in query
+    assert query.strip().endswith('ORDER BY a, b')
+    assert params == [10, 20, 12, 12, 12, 7]
+
+
+def test_keyset_query_without_batch_size_reads_everything():
+    query, params = build_keyset_query('t', ['id'], None)
+    assert 'TOP' not in query and 'WHERE' not in query
+    assert params == []
+
+
+def run_teradata_query(db, query, params):
+    # SQLite spells Teradata's SELECT TOP n as a LIMIT
+    top = re.search(r'SELECT TOP (\d+) ', query)
+    if top:
+        query = f"SELECT {query[top.end():].strip()} LIMIT {top.group(1)}"
+    return db.execute(query, params).fetchall()
+
+
+def test_keyset_batches_read_every_row_once():
+    db = sqlite3.connect(':memory:')
+    rows = [(a, b, f"row {a}-{b}") for a in range(7) for b in range(5)]
+    db.execute("CREATE TABLE t (a INTEGER, b INTEGER, v TEXT)")
+    db.executemany("INSERT INTO t VALUES (?, ?, ?)", reversed(rows))
+
+    fetched = []
+    last_key = None
+    while True:
+        query, params = build_keyset_query('t', ['a', 'b'], 4, last_key)
+        batch = run_teradata_query(db, query, params)
+        if not batch:
+            break
+        fetched.extend(batch)
+        last_key = batch[-1][:2]
+    db.close()
+    assert fetched == rows
+
+
+@pytest.mark.parametrize('min_value, max_value, expected', [
+    (0, 100, [25, 50, 75]),
+    (Decimal('0'), Decimal('1'), [Decimal('0.25'), Decimal('0.5'), Decimal('0.75')]),
+    (0.0, 2.0, [0.5, 1.0, 1.5]),
+    (date(2024, 1, 1), date(2024, 1, 9), [date(2024, 1, 3), date(2024, 1, 5), date(2024, 1, 7)]),
+    (datetime(2024, 1, 1), datetime(2024, 1, 1, 4), [datetime(2024, 1, 1, h) for h in (1, 2, 3)]),
+])
+def test_split_key_range(min_value, max_value, expected):
+    assert split_key_range(min_value, max_value, 4) == expected
+
+
+def test_split_key_range_rejects_strings():
+    with pytest.raises(ValueError, match="partition_method='hash'"):
+        split_key_range('a', 'z', 4)
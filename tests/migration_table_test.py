@@ -6,6 +6,8 @@ import time
 from config.teradata import get_teradata_connection
 from config.snowflake import get_snowflake_connection
 from logs.migration_table_logs import setup_logger
+from operations.snowflake_load import choose_load_mode, create_loader
+from operations.teradata_extract import iter_row_chunks, DEFAULT_FETCH_SIZE, DEFAULT_MAX_BATCH_BYTES
 
 
 def get_sample_row_count(teradata_conn, table_name, sample_size, logger):
@@ -34,10 +36,16 @@ def migrate_table_in_test_batches(
         source_table,
         target_table,
         test_rows=10,
-        sort_column='Customer_Index'
+        sort_column='Customer_Index',
+        load_mode='auto',
+        stage_format='csv',
+        fetch_size=DEFAULT_FETCH_SIZE,
+        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES
 ):
     """
-    Migrate a sample of rows from Teradata to Snowflake for testing
+    Migrate a sample of rows from Teradata to Snowflake for testing.
+    load_mode 'insert' or 'copy' forces a load path; 'auto' picks it by row count.
+    The sample is streamed in chunks of at most max_batch_bytes.
     """
     # Determine the log directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -55,7 +63,7 @@ def migrate_table_in_test_batches(
     teradata_conn = None
     snowflake_conn = None
     teradata_cursor = None
-    snowflake_cursor = None
+    loader = None
 
     try:
         # Load environment variables
@@ -69,9 +77,8 @@ def migrate_table_in_test_batches(
         total_rows = get_sample_row_count(teradata_conn, source_table, test_rows, logger)
         logger.info(f"Total sample rows to migrate: {total_rows}")
 
-        # Cursor for Teradata and Snowflake
+        # Cursor for Teradata
         teradata_cursor = teradata_conn.cursor()
-        snowflake_cursor = snowflake_conn.cursor()
 
         # Fetch sample data from Teradata
         query = f"""
@@ -79,22 +86,23 @@ def migrate_table_in_test_batches(
         ORDER BY {sort_column}
         """
         teradata_cursor.execute(query)
-        sample_data = teradata_cursor.fetchall()
 
         # Prepare sample data for Snowflake insertion
         columns = [desc[0] for desc in teradata_cursor.description]
 
-        # Use Snowflake's bulk insert for performance
-        insert_sql = f"""
-        INSERT INTO {target_table} ({','.join(columns)})
-        VALUES ({','.join(['%s'] * len(columns))})
-        """
-
-        # Execute batch insert
-        snowflake_cursor.executemany(insert_sql, sample_data)
+        # Load through INSERT or stage + COPY, streaming the sample in bounded chunks
+        load_mode = choose_load_mode(load_mode, total_rows)
+        load_options = {'file_format': stage_format} if load_mode == 'copy' else {}
+        loader = create_loader(snowflake_conn, target_table, columns, load_mode, logger, **load_options)
+        migrated_rows = 0
+        for sample_data in iter_row_chunks(teradata_cursor, fetch_size, max_batch_bytes):
+            loader.load(sample_data)
+            migrated_rows += len(sample_data)
+        loader.close()
+        loader = None
 
         # Log results
-        logger.info(f"Migrated {len(sample_data)} sample rows")
+        logger.info(f"Migrated {migrated_rows} sample rows ({load_mode})")
         logger.info(f"Sample data migration completed")
         logger.info(f"Log file saved at: {log_path}")
 
@@ -112,8 +120,8 @@ def migrate_table_in_test_batches(
             pass
 
         try:
-            if snowflake_cursor:
-                snowflake_cursor.close()
+            if loader:
+                loader.discard()
         except Exception:
             pass
 
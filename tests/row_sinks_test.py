@@ -0,0 +1,62 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+from operations.row_sinks import TableRowSink, create_row_sink
+
+COLUMNS = ['ID', 'NAME', 'CREATED', 'AMOUNT']
+ROWS = [(1, 'alpha', date(2024, 1, 1), Decimal('1.50')), (2, 'beta, "quoted"', None, Decimal('2'))]
+
+
+def write(output_format, path, rows=ROWS):
+    sink = create_row_sink(output_format, str(path))
+    count = sink.write_rows('Rows:', COLUMNS, iter(rows), 'No rows.')
+    sink.close()
+    return count
+
+
+def test_csv_sink(tmp_path):
+    path = tmp_path / 'out' / 'rows.csv'
+    assert write('csv', path) == 2
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        assert list(csv.reader(csv_file)) == [
+            COLUMNS, ['1', 'alpha', '2024-01-01', '1.50'], ['2', 'beta, "quoted"', '', '2']
+        ]
+
+
+def test_csv_sink_repeats_header_only_for_new_columns(tmp_path):
+    path = tmp_path / 'rows.csv'
+    sink = create_row_sink('csv', str(path))
+    sink.write_rows('First:', ['ID'], [(1,)])
+    sink.write_rows('Second:', ['ID'], [(2,)])
+    sink.write_rows('Third:', ['NAME'], [('x',)])
+    sink.close()
+    assert path.read_text().splitlines() == ['ID', '1', '2', 'NAME', 'x']
+
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / 'rows.jsonl'
+    assert write('jsonl', path) == 2
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [
+        {'ID': 1, 'NAME': 'alpha', 'CREATED': '2024-01-01', 'AMOUNT': '1.50'},
+        {'ID': 2, 'NAME': 'beta, "quoted"', 'CREATED': None, 'AMOUNT': '2'},
+    ]
+
+
+def test_table_sink_prints_pages(tmp_path):
+    path = tmp_path / 'rows.txt'
+    sink = TableRowSink(open(path, 'w', encoding='utf-8'), page_size=1)
+    assert sink.write_rows('Rows:', COLUMNS, iter(ROWS)) == 2
+    sink.close()
+
+    text = path.read_text()
+    assert text.startswith('Rows:\n')
+    # One grid per page, each with its own header
+    assert text.count('| NAME ') == 2
+    assert 'beta, "quoted"' in text
+
+
+def test_table_sink_reports_empty_results(tmp_path):
+    path = tmp_path / 'rows.txt'
+    assert write('table', path, rows=[]) == 0
+    assert path.read_text() == 'Rows:\nNo rows.\n'
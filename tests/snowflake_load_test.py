@@ -0,0 +1,97 @@
+import re
+import csv
+import glob
+import gzip
+import os
+from operations.snowflake_load import StageCopyLoader, table_stage
+
+
+class StageCursor:
+    """
+    Snowflake cursor stand-in recording every statement and the rows of the files each PUT uploads.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.staged_rows = []
+
+    def execute(self, query, params=None):
+        statement = ' '.join(query.split())
+        self.statements.append(statement)
+        if statement.startswith('PUT '):
+            pattern = re.match(r"PUT 'file://([^']+)'", statement).group(1)
+            for path in sorted(glob.glob(pattern)):
+                with gzip.open(path, 'rt', newline='', encoding='utf-8') as staged_file:
+                    self.staged_rows.extend(csv.reader(staged_file))
+
+    def close(self):
+        pass
+
+
+class StageConnection:
+    def __init__(self):
+        self.stage_cursor = StageCursor()
+
+    def cursor(self):
+        return self.stage_cursor
+
+
+def statement_kinds(cursor):
+    return [statement.split()[0] for statement in cursor.statements]
+
+
+def test_table_stage():
+    assert table_stage('customers') == '@%customers'
+    assert table_stage('db.sales.customers') == '@db.sales.%customers'
+
+
+def test_groups_are_put_and_copied_with_purge_and_null_marker():
+    conn = StageConnection()
+    cursor = conn.stage_cursor
+    # Every batch fills a file, and two files make a COPY group
+    loader = StageCopyLoader(conn, 'db.sales.customers', ['ID', 'NAME'], target_file_size=1, files_per_copy=2)
+
+    loader.load([(1, 'a'), (2, None)])
+    assert cursor.statements == []
+    loader.load([(3, 'c')])
+    assert statement_kinds(cursor) == ['PUT', 'COPY']
+    loader.load([(4, 'd')])
+    loader.close()
+
+    assert statement_kinds(cursor) == ['PUT', 'COPY', 'PUT', 'COPY']
+    put, copy = cursor.statements[:2]
+    assert 'AUTO_COMPRESS=FALSE' in put and ' @db.sales.%customers/' in put
+    assert copy.startswith('COPY INTO db.sales.customers (ID,NAME) FROM @db.sales.%customers/')
+    assert "NULL_IF = ('\\\\N')" in copy
+    assert copy.endswith('PURGE = TRUE')
+    assert cursor.staged_rows == [['1', 'a'], ['2', '\\N'], ['3', 'c'], ['4', 'd']]
+    assert not os.path.exists(loader.work_dir)
+
+
+def test_discard_drops_files_that_were_not_copied():
+    conn = StageConnection()
+    loader = StageCopyLoader(conn, 'customers', ['ID'], files_per_copy=2)
+    loader.load([(1,), (2,)])
+    loader.discard()
+    assert conn.stage_cursor.statements == []
+    assert not os.path.exists(loader.work_dir)
+
+
+def test_batches_are_committed_after_the_copy_of_their_group():
+    conn = StageConnection()
+    cursor = conn.stage_cursor
+    committed = []
+    loader = StageCopyLoader(
+        conn, 'customers', ['ID'], target_file_size=1, files_per_copy=2,
+        on_commit=lambda token: committed.append((token, statement_kinds(cursor)[-1:]))
+    )
+
+    loader.load([(1,)], token='first')
+    assert committed == []
+    loader.load([(2,)], token='second')
+    loader.load([(3,)], token='third')
+    assert committed == [('first', ['COPY']), ('second', ['COPY'])]
+
+    loader.close()
+    assert committed[2:] == [('third', ['COPY'])]
+    assert statement_kinds(cursor) == ['PUT', 'COPY', 'PUT', 'COPY']
@@ -0,0 +1,62 @@
+from unittest import mock
+import pytest
+import config.snowflake as snowflake
+from config.connection_pool import get_pool
+
+snowpark_session = pytest.importorskip('snowflake.snowpark.session')
+
+
+def stand_in_connection():
+    connection = mock.MagicMock()
+    connection._session_parameters = {}
+    connection.is_closed.return_value = False
+    return connection
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """
+    Pool of stand-in connector connections behind get_snowflake_connection.
+    """
+    def get_snowflake_connection():
+        return stand_in_connection()
+
+    monkeypatch.setattr(snowflake, 'get_snowflake_connection', get_snowflake_connection)
+    pool = get_pool(get_snowflake_connection)
+    yield pool
+    pool.close()
+
+
+def test_session_holds_its_pooled_connection_until_closed(pool):
+    session = snowflake.create_snowflake_session()
+    connection = session.connection
+    assert id(connection) in pool.in_use
+    assert session in snowpark_session._active_sessions
+
+    snowflake.close_snowflake_session(session)
+    assert connection.close.called
+    assert session not in snowpark_session._active_sessions
+    assert pool.in_use == {}
+    # Closed along with the session, so it is health checked before its next checkout
+    [pooled] = pool.idle
+    assert pooled.connection is connection and pooled.suspect
+
+
+def test_closing_a_session_twice_releases_its_connection_once(pool):
+    session = snowflake.create_snowflake_session()
+    snowflake.close_snowflake_session(session)
+    connection = pool.acquire()
+    snowflake.close_snowflake_session(session)
+    assert id(connection) in pool.in_use
+    pool.release(connection)
+
+
+def test_session_on_an_explicit_connection_leaves_the_pool_alone(pool):
+    connection = stand_in_connection()
+    session = snowflake.create_snowflake_session(connection)
+    assert session.connection is connection
+
+    snowflake.close_snowflake_session(session)
+    assert connection.close.called
+    assert session not in snowpark_session._active_sessions
+    assert pool.size == 0
@@ -0,0 +1,192 @@
+import pytest
+import operations.catalog_cache as catalog_cache
+import config.connection_pool as connection_pool
+import operations.sql_server_operations as sql_server_operations
+from config.connection_pool import get_pool
+from operations.catalog_cache import CatalogCache
+
+# sys.server_principals rows of the logins query
+LOGINS = [('app_user', 'SQL_LOGIN', False), ('CORP\\etl', 'WINDOWS_LOGIN', False), ('old_user', 'SQL_LOGIN', True)]
+
+
+class ServerCursor:
+    """
+    pyodbc cursor stand-in answering every query with rows, recording the fetch sizes.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query):
+        self.connection.queries.append(query)
+        self.rows = list(self.connection.rows)
+
+    def fetchmany(self, size):
+        self.connection.fetch_sizes.append(size)
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ServerConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.fetch_sizes = []
+
+    def cursor(self):
+        return ServerCursor(self)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """
+    SQL Server stand-in answering with LOGINS, fetched two rows at a time.
+    """
+    conn = ServerConnection(LOGINS)
+
+    def get_sql_server_connection():
+        return conn
+
+    monkeypatch.setattr(sql_server_operations, 'get_sql_server_connection', get_sql_server_connection)
+    monkeypatch.setattr(sql_server_operations, 'SQL_SERVER_FETCH_SIZE', 2)
+    yield conn
+    get_pool(get_sql_server_connection).close()
+
+
+def test_iterators_yield_typed_rows(server):
+    logins = list(sql_server_operations.iter_logins_sql_server())
+
+    assert logins == LOGINS
+    assert [login.LoginName for login in logins if login.IsDisabled] == ['old_user']
+    assert logins[1]._fields == ('LoginName', 'LoginType', 'IsDisabled')
+    assert server.fetch_sizes == [2, 2, 2]
+
+
+def test_show_functions_write_to_a_sink(server):
+    written = []
+
+    class ListSink:
+        def write_rows(self, title, columns, rows, empty_message=None):
+            written.append((title, tuple(columns), list(rows)))
+            return len(written[-1][2])
+
+    assert sql_server_operations.show_logins_sql_server(sink=ListSink()) is None
+    [(title, columns, rows)] = written
+    assert columns == ('LoginName', 'LoginType', 'IsDisabled')
+    assert rows == LOGINS
+
+
+class DatabaseCursor(ServerCursor):
+    """
+    Cursor of a database stand-in answering the schema and table queries of the inventory.
+    """
+
+    @property
+    def description(self):
+        return [('TABLE_SCHEMA',), ('TABLE_NAME',)]
+
+    def execute(self, query):
+        self.connection.queries.append(query)
+        name = self.connection.database_name
+        if 'sys.schemas' in query:
+            self.rows = [('dbo',), (f"{name}_schema",)]
+        else:
+            self.rows = [('dbo', f"{name}_table")]
+
+
+class DatabaseConnection(ServerConnection):
+    def __init__(self, database_name):
+        super().__init__([])
+        self.database_name = database_name
+
+    def cursor(self):
+        return DatabaseCursor(self)
+
+
+class Databases:
+    """
+    Per-database connection functions of database stand-ins, as
+    sql_server_database_connection() returns them. Connecting to BROKEN
+    raises error.
+    """
+
+    def __init__(self):
+        self.factories = {}
+        self.error = RuntimeError
+
+    def connection(self, database_name):
+        if database_name not in self.factories:
+            def connect():
+                if database_name == 'BROKEN':
+                    raise self.error(f"Cannot open database {database_name}")
+                return DatabaseConnection(database_name)
+            self.factories[database_name] = connect
+        return self.factories[database_name]
+
+    def pools_closed(self):
+        # get_pool() would replace a closed pool, so look the pools up directly
+        return all(connection_pool._pools[factory].closed for factory in self.factories.values())
+
+
+@pytest.fixture
+def databases(server, monkeypatch, tmp_path):
+    """
+    Database stand-ins; the server lists HR and SALES.
+    """
+    server.rows = [('HR',), ('SALES',)]
+    databases = Databases()
+    monkeypatch.setattr(sql_server_operations, 'sql_server_database_connection', databases.connection)
+    monkeypatch.setattr(catalog_cache, '_catalog_cache', CatalogCache(str(tmp_path / 'catalog_cache.json')))
+    return databases
+
+
+def test_inventory_merges_every_database(databases):
+    result = sql_server_operations.inventory_sql_server(kinds=['schemas', 'tables'], jobs=2)
+
+    assert result['errors'] == {}
+    assert sorted(result['databases']) == ['HR', 'SALES']
+    sales = result['databases']['SALES']
+    assert [row.SchemaName for row in sales['schemas']] == ['dbo', 'SALES_schema']
+    assert [(row.TABLE_SCHEMA, row.TABLE_NAME) for row in sales['tables']] == [('dbo', 'SALES_table')]
+    assert sorted(databases.factories) == ['HR', 'SALES']
+    assert databases.pools_closed()
+
+
+def test_inventory_closes_every_pool_when_a_database_raises(databases):
+    with pytest.raises(RuntimeError, match='Cannot open database BROKEN'):
+        sql_server_operations.inventory_sql_server(['HR', 'BROKEN', 'SALES'], ['schemas'], jobs=3)
+    assert sorted(databases.factories) == ['BROKEN', 'HR', 'SALES']
+    assert databases.pools_closed()
+
+
+def test_inventory_reports_driver_errors_and_finishes_the_others(databases):
+    pyodbc = pytest.importorskip('pyodbc', exc_type=ImportError)
+    databases.error = pyodbc.Error
+    result = sql_server_operations.inventory_sql_server(['HR', 'BROKEN', 'SALES'], ['schemas'], jobs=3)
+
+    assert sorted(result['databases']) == ['HR', 'SALES']
+    assert list(result['errors']) == ['BROKEN']
+    assert 'Cannot open database BROKEN' in result['errors']['BROKEN']
+    assert databases.pools_closed()
+
+
+def test_unknown_inventory_kind_is_rejected(databases):
+    with pytest.raises(ValueError):
+        sql_server_operations.inventory_sql_server(['HR'], ['indexes'])
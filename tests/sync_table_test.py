@@ -0,0 +1,98 @@
+import os
+import logging
+import shutil
+import sqlite3
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+import scripts.migration_table as migration_table
+import scripts.sync_table as sync_table
+from benchmarks.local_databases import create_synthetic_table, local_teradata_connection, local_snowflake_connection
+from logs.migration_table_logs import setup_logger
+
+logger = logging.getLogger('sync_table_test')
+
+
+@pytest.mark.parametrize('watermark, lookback, expected', [
+    (datetime(2024, 1, 1, 12), timedelta(minutes=30), datetime(2024, 1, 1, 11, 30)),
+    (date(2024, 1, 2), timedelta(days=1), date(2024, 1, 1)),
+    (1000, 50, 950),
+    (Decimal('1000'), 50, Decimal('950')),
+    (None, timedelta(minutes=5), None),
+    (datetime(2024, 1, 1), None, datetime(2024, 1, 1)),
+])
+def test_lookback_follows_watermark_type(watermark, lookback, expected):
+    assert sync_table.apply_lookback(watermark, lookback, logger) == expected
+
+
+def test_mismatched_lookback_is_ignored(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert sync_table.apply_lookback(1000, timedelta(minutes=5), logger) == 1000
+        assert sync_table.apply_lookback(datetime(2024, 1, 1), 5, logger) == datetime(2024, 1, 1)
+    assert 'ignoring it' in caplog.text
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """
+    SQLite stand-ins of a 500 row source table and its empty target copy,
+    wired into the sync and migration scripts, which log to tmp_path.
+    Returns the target path.
+    """
+    source_path = str(tmp_path / 'source.db')
+    target_path = str(tmp_path / 'target.db')
+    create_synthetic_table(source_path, target_path, 'ORDERS', 500, 2, 'int')
+    get_teradata_connection = local_teradata_connection(source_path)
+    get_snowflake_connection = local_snowflake_connection(target_path, str(tmp_path / 'stage'))
+    for module in (migration_table, sync_table):
+        monkeypatch.setattr(module, 'get_teradata_connection', get_teradata_connection)
+        monkeypatch.setattr(module, 'get_snowflake_connection', get_snowflake_connection)
+        monkeypatch.setattr(
+            module, 'setup_logger', lambda path, name: setup_logger(str(tmp_path / os.path.basename(path)), name)
+        )
+    return target_path
+
+
+def sync(tmp_path):
+    return sync_table.sync_table_incremental(
+        'ORDERS', 'ORDERS', 'ID', 'ID', batch_size=100, load_mode='insert',
+        checkpoint_path=str(tmp_path / 'checkpoints.db')
+    )
+
+
+def target_count(target_path):
+    with sqlite3.connect(target_path) as db:
+        return db.execute("SELECT COUNT(*) FROM ORDERS").fetchone()[0]
+
+
+def test_table_migration_closes_its_log_file(databases, tmp_path):
+    result = migration_table.migrate_table_in_batches(
+        'ORDERS', 'ORDERS', batch_size=100, sort_column='ID', load_mode='insert',
+        checkpoint_path=str(tmp_path / 'checkpoints.db'), hints_path=str(tmp_path / 'hints.json')
+    )
+    assert result['error'] is None
+    assert logging.getLogger('migration_ORDERS').handlers == []
+    assert target_count(databases) == 500
+
+
+def test_first_sync_of_empty_target_is_a_bulk_load(databases, tmp_path):
+    result = sync(tmp_path)
+    assert result['error'] is None
+    assert (result['rows'], result['watermark']) == (500, 500)
+    assert target_count(databases) == 500
+
+    result = sync(tmp_path)
+    assert result['error'] is None
+    assert result['rows'] == 0
+
+
+def test_first_sync_of_loaded_target_starts_from_its_maximum(databases, tmp_path, monkeypatch):
+    shutil.copy(str(tmp_path / 'source.db'), databases)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a loaded target must not be bulk loaded again")
+
+    monkeypatch.setattr(sync_table, 'migrate_table_in_batches', fail)
+    result = sync(tmp_path)
+    assert result['error'] is None
+    assert (result['rows'], result['watermark']) == (0, 500)
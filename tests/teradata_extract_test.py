@@ -0,0 +1,162 @@
+import re
+import logging
+import sqlite3
+import pytest
+from operations.teradata_extract import (
+    iter_row_chunks, estimate_row_bytes, choose_extract_mode, FASTEXPORT_ESCAPE, FASTEXPORT_THRESHOLD_BYTES
+)
+from scripts.migration_table import extract_batches
+
+logger = logging.getLogger('teradata_extract_test')
+
+
+class RecordingCursor:
+    """
+    sqlite3 cursor recording the size of every fetchmany() call.
+    """
+
+    def __init__(self, rows):
+        self.db = sqlite3.connect(':memory:')
+        self.db.execute("CREATE TABLE t (id INTEGER, payload TEXT)")
+        self.db.executemany("INSERT INTO t VALUES (?, ?)", rows)
+        self.cursor = self.db.execute("SELECT id, payload FROM t ORDER BY id")
+        self.fetch_sizes = []
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        return self.cursor.fetchmany(size)
+
+
+@pytest.fixture
+def narrow_rows():
+    return [(i, 'x' * 10) for i in range(1000)]
+
+
+def test_chunks_stay_within_byte_budget(narrow_rows):
+    budget = 20 * estimate_row_bytes((0, 'x' * 10))
+    cursor = RecordingCursor(narrow_rows)
+    chunks = list(iter_row_chunks(cursor, fetch_size=100, max_batch_bytes=budget))
+
+    assert [row for chunk in chunks for row in chunk] == narrow_rows
+    assert all(sum(estimate_row_bytes(row) for row in chunk) <= budget for chunk in chunks)
+    assert len(chunks) > 1
+
+
+def test_fetch_size_shrinks_for_wide_rows():
+    rows = [(i, 'x' * 10000) for i in range(50)]
+    budget = 5 * estimate_row_bytes(rows[0])
+    cursor = RecordingCursor(rows)
+    chunks = list(iter_row_chunks(cursor, fetch_size=100, max_batch_bytes=budget))
+
+    assert sum(len(chunk) for chunk in chunks) == 50
+    assert cursor.fetch_sizes[0] == 100
+    assert max(cursor.fetch_sizes[1:]) <= 5
+
+
+def test_row_larger_than_budget_is_yielded_alone():
+    rows = [(1, 'small'), (2, 'x' * 100000), (3, 'small')]
+    chunks = list(iter_row_chunks(RecordingCursor(rows), fetch_size=10, max_batch_bytes=1000))
+    assert [[row[0] for row in chunk] for chunk in chunks] == [[1], [2], [3]]
+
+
+def test_empty_result_yields_nothing():
+    assert list(iter_row_chunks(RecordingCursor([]))) == []
+
+
+class CatalogCursor:
+    """
+    Teradata cursor stand-in answering queries on DBC views with canned rows,
+    or raising the exception given for a view.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.result = None
+
+    def execute(self, query, params=None):
+        view = re.search(r'FROM (DBC\.\w+)', query).group(1)
+        if isinstance(self.results.get(view), Exception):
+            raise self.results[view]
+        self.result = self.results.get(view)
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class CatalogConnection:
+    def __init__(self, results):
+        self.results = results
+
+    def cursor(self):
+        return CatalogCursor(self.results)
+
+
+def catalog(table_bytes, unsupported=()):
+    return CatalogConnection({'DBC.ColumnsV': list(unsupported), 'DBC.TableSizeV': [(table_bytes,)]})
+
+
+@pytest.mark.parametrize('conn, extract_mode, expected', [
+    (catalog(FASTEXPORT_THRESHOLD_BYTES), 'auto', 'fastexport'),
+    (catalog(FASTEXPORT_THRESHOLD_BYTES - 1), 'auto', 'sql'),
+    (catalog(None), 'auto', 'sql'),
+    (catalog(1), 'fastexport', 'fastexport'),
+    (catalog(FASTEXPORT_THRESHOLD_BYTES, [('Payload  ', 'BO')]), 'auto', 'sql'),
+    (catalog(1, [('Payload  ', 'BO')]), 'fastexport', 'sql'),
+    (catalog(FASTEXPORT_THRESHOLD_BYTES), 'sql', 'sql'),
+])
+def test_extract_mode(conn, extract_mode, expected):
+    assert choose_extract_mode(conn, 'sales.orders', extract_mode, logger) == expected
+
+
+def test_unreadable_catalog_only_blocks_automatic_fastexport():
+    conn = CatalogConnection({'DBC.ColumnsV': PermissionError('no SELECT access')})
+    assert choose_extract_mode(conn, 'sales.orders', 'auto', logger) == 'sql'
+    assert choose_extract_mode(conn, 'sales.orders', 'fastexport', logger) == 'fastexport'
+
+
+def test_unknown_extract_mode_is_rejected():
+    with pytest.raises(ValueError):
+        choose_extract_mode(catalog(1), 'sales.orders', 'bulk', logger)
+
+
+class QueryCursor(RecordingCursor):
+    """
+    RecordingCursor that also records the queries it runs, answering each
+    with every row of the table (enough for one query per extraction).
+    """
+
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.queries = []
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        self.cursor = self.db.execute("SELECT id, payload FROM t ORDER BY id")
+
+
+def test_fastexport_reads_everything_in_one_escaped_query(narrow_rows):
+    cursor = QueryCursor(narrow_rows)
+    batches = list(extract_batches(cursor, 'sales.t', ['id'], 10, fetch_size=100, fastexport=True))
+
+    assert [row for _, rows, _ in batches for row in rows] == narrow_rows
+    assert batches[-1][2] == (999,)
+    [query] = cursor.queries
+    assert query.startswith(FASTEXPORT_ESCAPE)
+    assert 'TOP' not in query and 'ORDER BY id' in query
+
+
+def test_sql_extraction_is_not_escaped(narrow_rows):
+    cursor = QueryCursor(narrow_rows[:5])
+    list(extract_batches(cursor, 'sales.t', ['id'], 10))
+    assert cursor.queries and not any(FASTEXPORT_ESCAPE in query for query in cursor.queries)
+    assert 'TOP 10' in cursor.queries[0]
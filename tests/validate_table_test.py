@@ -0,0 +1,84 @@
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from benchmarks.local_databases import LocalConnection
+from scripts.validate_table import TableValidator, build_summary_query, describe_columns
+
+CREATE_SQL = "CREATE TABLE ORDERS (ID INTEGER NOT NULL PRIMARY KEY, CODE VARCHAR(8), PAYLOAD BLOB, UPDATED TIMESTAMP)"
+
+
+@pytest.fixture
+def connections(tmp_path):
+    """
+    Teradata and Snowflake stand-ins holding the same 40 row ORDERS table.
+    """
+    rows = [
+        (row_id, f"C{row_id:04d}", bytes([row_id, 255 - row_id]), datetime(2024, 1, 1) + timedelta(hours=row_id))
+        for row_id in range(1, 41)
+    ]
+    paths = {'teradata': str(tmp_path / 'source.db'), 'snowflake': str(tmp_path / 'target.db')}
+    for path in paths.values():
+        with sqlite3.connect(path) as db:
+            db.execute(CREATE_SQL)
+            db.executemany(
+                "INSERT INTO ORDERS VALUES (?, ?, ?, ?)",
+                [(row_id, code, payload, updated.isoformat(' ')) for row_id, code, payload, updated in rows]
+            )
+    teradata_conn = LocalConnection(paths['teradata'], 'teradata')
+    snowflake_conn = LocalConnection(paths['snowflake'], 'snowflake', stage_dir=str(tmp_path / 'stage'))
+    yield teradata_conn, snowflake_conn
+    teradata_conn.close()
+    snowflake_conn.close()
+
+
+def validator(connections):
+    return TableValidator(*connections, 'ORDERS', 'ORDERS', ['ID'], fanout=2, leaf_rows=4)
+
+
+def test_columns_are_classified_by_type(connections):
+    assert describe_columns(connections[0], 'ORDERS') == [
+        ('ID', 'number', 0), ('CODE', 'string', 0), ('PAYLOAD', 'bytes', 0), ('UPDATED', 'timestamp', 0)
+    ]
+
+
+def test_strings_bytes_and_timestamps_are_summed_not_bounded():
+    columns = [('CODE', 'string', 0), ('PAYLOAD', 'bytes', 0), ('UPDATED', 'timestamp', 0)]
+    for dialect in ('teradata', 'snowflake'):
+        query, _ = build_summary_query('ORDERS', columns, 'ID', None, None, dialect)
+        assert 'MIN(' not in query and 'LENGTH' not in query
+        assert query.count('SUM(') == 3
+
+
+def test_identical_tables_match(connections):
+    table_validator = validator(connections)
+    assert table_validator.validate(partitions=4)
+    assert table_validator.weak_columns == []
+
+
+@pytest.mark.parametrize('update, params', [
+    # Same length string
+    ("UPDATE ORDERS SET CODE = ? WHERE ID = ?", ['X0017', 17]),
+    # Same length bytes
+    ("UPDATE ORDERS SET PAYLOAD = ? WHERE ID = ?", [bytes([238, 17]), 17]),
+    # One second later
+    ("UPDATE ORDERS SET UPDATED = ? WHERE ID = ?", ['2024-01-01 17:00:01', 17]),
+])
+def test_changes_keeping_lengths_and_bounds_are_found(connections, update, params):
+    connections[1].db.execute(update, params)
+    table_validator = validator(connections)
+    assert not table_validator.validate(partitions=4)
+    assert table_validator.differences == [((17,), 'values differ')]
+
+
+@pytest.mark.parametrize('side, differences', [
+    # The target page of four rows ends after the source page
+    (1, [((3,), 'missing in target'), ((5,), 'missing in target'), ((41,), 'extra in target')]),
+    # The target page ends first, so the source is read again up to its end
+    (0, [((3,), 'extra in target'), ((5,), 'extra in target'), ((41,), 'missing in target')]),
+])
+def test_row_comparison_pages_end_at_the_same_key(connections, side, differences):
+    connections[side].db.execute("DELETE FROM ORDERS WHERE ID IN (3, 5)")
+    connections[side].db.execute("INSERT INTO ORDERS (ID, CODE) VALUES (41, 'EXTRA')")
+    table_validator = validator(connections)
+    table_validator.compare_rows(None, None)
+    assert table_validator.differences == differences